@@ -4,7 +4,8 @@ from utils.azure_clients import AzureClientManager
 from utils.search_utils_local import SearchManagerLocal
 from utils.ui_components_local import UIComponentsLocal
 from utils.query_processor_local import QueryProcessorLocal
-from utils.logging_middleware import apply_logging_to_query_processor, set_client_ip
+from utils.logging_middleware import apply_logging_to_query_processor, init_client_ip, get_client_key
+from utils.admission_control import get_admission_controller, format_rejection_message
 
 # 엑셀 다운로드를 위한 추가 import
 try:
@@ -43,6 +44,12 @@ def show_query_length_error(current_length):
         st.warning(error_msg)
     st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
+def show_admission_rejection(decision):
+    rejection_message = format_rejection_message(decision)
+    with st.chat_message("assistant"):
+        st.warning(rejection_message)
+    st.session_state.messages.append({"role": "assistant", "content": rejection_message})
+
 def get_quality_config(level):
     return SETTINGS['thresholds'].get(level, SETTINGS['thresholds']['medium'])
 
@@ -91,6 +98,7 @@ def apply_page_style():
 
 def main():
     st.set_page_config(page_title="트러블 체이서 챗봇", page_icon="🚀", layout="wide")
+    init_client_ip()
     
     if not EXCEL_AVAILABLE:
         st.sidebar.warning("📊 엑셀 다운로드 기능이 비활성화되었습니다. pandas와 openpyxl을 설치해주세요.")
@@ -170,15 +178,27 @@ def main():
         query_processor.debug_mode = SETTINGS['debug_mode']
         query_processor.search_manager.debug_mode = SETTINGS['debug_mode']
         
-        try:
-            query_processor.process_query(user_query)
-        except Exception as e:
-            st.error(f"오류가 발생했습니다: {str(e)}")
-            st.info("잠시 후 다시 시도해주세요.")
-            if SETTINGS['debug_mode']:
-                import traceback
-                st.error("상세 오류 정보:")
-                st.code(traceback.format_exc())
+        # IP별 허용 제어 - 전체 동시 실행 수 초과 시 대기 순번 안내, 대기열이 가득 차면 거절
+        queue_placeholder = st.empty()
+        
+        def show_queue_position(position):
+            queue_placeholder.info(f"⏳ 요청이 많아 대기 중입니다 (대기 순번: {position}번)")
+        
+        with get_admission_controller().admit(get_client_key(), on_wait=show_queue_position) as admission:
+            queue_placeholder.empty()
+            if not admission['admitted']:
+                show_admission_rejection(admission)
+                return
+            
+            try:
+                query_processor.process_query(user_query)
+            except Exception as e:
+                st.error(f"오류가 발생했습니다: {str(e)}")
+                st.info("잠시 후 다시 시도해주세요.")
+                if SETTINGS['debug_mode']:
+                    import traceback
+                    st.error("상세 오류 정보:")
+                    st.code(traceback.format_exc())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
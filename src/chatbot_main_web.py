@@ -3,6 +3,8 @@ from config.settings_web import AppConfig
 from utils.azure_clients_web import AzureClientManager
 from utils.ui_components_web import UIComponents
 from utils.query_processor_web import QueryProcessor
+from utils.logging_middleware import init_client_ip, get_client_key
+from utils.admission_control import get_admission_controller, format_rejection_message
 
 # =================================================================
 # DEBUG 모드 설정 - 개발자용 내부 로깅만 (사용자에게는 보이지 않음)
@@ -48,6 +50,15 @@ def show_query_length_error(current_length):
     # 웹 버전 전용 세션에 메시지 추가
     st.session_state[WEB_MESSAGES_KEY].append({"role": "assistant", "content": error_msg})
 
+def show_admission_rejection(decision):
+    """허용 제어로 거절된 질문 안내 메시지 표시"""
+    rejection_message = format_rejection_message(decision)
+    
+    with st.chat_message("assistant"):
+        st.warning(rejection_message)
+    
+    st.session_state[WEB_MESSAGES_KEY].append({"role": "assistant", "content": rejection_message})
+
 def initialize_web_session():
     """웹 버전 전용 세션 상태 초기화"""
     if WEB_MESSAGES_KEY not in st.session_state:
@@ -80,6 +91,7 @@ def main():
         page_icon="🌐",
         layout="wide"
     )
+    init_client_ip()
     
     # 메인 페이지 제목
     st.title("🌐 트러블 체이서 WEB검색")
@@ -163,15 +175,27 @@ def main():
             """
             st.info(improvements_status)
         
-        try:
-            query_processor.process_query(user_query)
-        except Exception as e:
-            error_message = f"오류가 발생했습니다: {str(e)}"
-            st.error(error_message)
-            st.info("잠시 후 다시 시도해주세요.")
+        # IP별 허용 제어 - 전체 동시 실행 수 초과 시 대기 순번 안내, 대기열이 가득 차면 거절
+        queue_placeholder = st.empty()
+        
+        def show_queue_position(position):
+            queue_placeholder.info(f"⏳ 요청이 많아 대기 중입니다 (대기 순번: {position}번)")
+        
+        with get_admission_controller().admit(get_client_key(), on_wait=show_queue_position) as admission:
+            queue_placeholder.empty()
+            if not admission['admitted']:
+                show_admission_rejection(admission)
+                return
             
-            # 오류 메시지도 웹 버전 세션에 저장
-            st.session_state[WEB_MESSAGES_KEY].append({"role": "assistant", "content": error_message})
+            try:
+                query_processor.process_query(user_query)
+            except Exception as e:
+                error_message = f"오류가 발생했습니다: {str(e)}"
+                st.error(error_message)
+                st.info("잠시 후 다시 시도해주세요.")
+                
+                # 오류 메시지도 웹 버전 세션에 저장
+                st.session_state[WEB_MESSAGES_KEY].append({"role": "assistant", "content": error_message})
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,6 @@
+import hashlib
+
+
 class SystemPrompts:
     """시스템 프롬프트 관리 클래스"""
 
@@ -765,6 +768,18 @@ class SystemPrompts:
         "default": DEFAULT
     }
     
+    # 프롬프트 문구를 수정하면 함께 올려주세요 (답변 캐시 범위 구분용)
+    PROMPT_VERSION = "2025.10"
+    
+    @classmethod
+    def get_prompt_version(cls):
+        """프롬프트 버전 식별자 - 명시 버전 + 프롬프트 본문 해시"""
+        digest = hashlib.sha256()
+        for name in sorted(cls._PROMPT_MAP):
+            digest.update(name.encode('utf-8'))
+            digest.update(cls._PROMPT_MAP[name].encode('utf-8'))
+        return f"{cls.PROMPT_VERSION}-{digest.hexdigest()[:12]}"
+    
     @classmethod
     def get_prompt(cls, query_type):
         prompt_name = query_type if query_type in cls._PROMPT_MAP else 'default'
@@ -38,6 +38,12 @@ class AppConfigLocal:
         self.enable_embedding_cache = os.getenv("ENABLE_EMBEDDING_CACHE", "true").lower() == "true"
         self.embedding_cache_ttl = int(os.getenv("EMBEDDING_CACHE_TTL", "3600"))
         
+        # 답변 캐시 설정 (유사 질문 재사용)
+        self.enable_answer_cache = os.getenv("ENABLE_ANSWER_CACHE", "true").lower() == "true"
+        self.answer_cache_similarity_threshold = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+        self.answer_cache_ttl = int(os.getenv("ANSWER_CACHE_TTL", "86400"))
+        self.answer_cache_max_entries = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+        
         # 기본 임계값들 (장애내역용)
         self.search_score_threshold = 0.20
         self.reranker_score_threshold = 1.8
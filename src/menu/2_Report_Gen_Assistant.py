@@ -5,19 +5,33 @@ import sqlite3
 import email
 from email import policy
 from email.message import EmailMessage
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from email.parser import BytesFeedParser
 import datetime
 import pytz
 from io import StringIO
 import tempfile
+import zipfile
 import pandas as pd
 from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from openai import AzureOpenAI
+from utils.llm_gateway import get_llm_gateway
+from utils.report_batch_processor import ReportBatchProcessor, iter_eml_sources
+from utils.docx_template_engine import get_compiled_template
+from utils.blob_upload_queue import get_blob_upload_queue, resolve_storage_backend_name
 import json
 import re
 import base64  # 추가된 import
+import hashlib
+import shutil
+import threading
+import zlib
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
 
 # 환경 변수 로드
 load_dotenv()
@@ -52,6 +66,13 @@ else:
     # DB_BASE_PATH가 없으면 현재 디렉토리에 생성
     EML_DB_PATH = "eml_reports.db"
 
+# 첨부파일 저장 경로 (원본 메일 해시별 디렉토리)
+EML_ATTACHMENT_DIR = os.path.join(DB_BASE_PATH or ".", "eml_attachments")
+
+# 본문 압축 기준 (bytes) 및 스트리밍 파싱 청크 크기
+EML_BODY_COMPRESS_THRESHOLD = int(os.getenv("EML_BODY_COMPRESS_THRESHOLD", "4096"))
+EML_READ_CHUNK_SIZE = 64 * 1024
+
 # OpenAI 설정
 openai_endpoint = os.getenv("OPENAI_ENDPOINT")
 openai_api_key = os.getenv("OPENAI_KEY")
@@ -88,32 +109,19 @@ def validate_connection_string(connection_string):
     return True, "유효한 연결 문자열입니다."
 
 def test_azure_connection():
-    """Azure Storage 연결 테스트"""
-    if not STORAGE_CONN_STR:
-        return False, "연결 문자열이 설정되지 않았습니다."
-    
-    try:
+    """Blob 저장소 연결 테스트 (업로드 큐와 같은 기준으로 백엔드 선택 - BLOB_STORAGE_BACKEND=local 이면 로컬 저장소)"""
+    if resolve_storage_backend_name() == "azure":
+        if not STORAGE_CONN_STR:
+            return False, "연결 문자열이 설정되지 않았습니다."
+        
         # 연결 문자열 유효성 검사
         is_valid, message = validate_connection_string(STORAGE_CONN_STR)
         if not is_valid:
             return False, message
-        
-        # 실제 연결 테스트
-        blob_service_client = BlobServiceClient.from_connection_string(STORAGE_CONN_STR)
-        
-        # 컨테이너 존재 확인 (없으면 생성)
-        try:
-            container_client = blob_service_client.get_container_client(EML_CONTAINER_NAME)
-            container_client.get_container_properties()
-        except Exception as e:
-            if "ContainerNotFound" in str(e):
-                # 컨테이너가 없으면 생성
-                container_client.create_container()
-                return True, "연결 성공 및 컨테이너 생성 완료"
-            else:
-                return False, f"컨테이너 접근 오류: {str(e)}"
-        
-        return True, "연결 성공"
+    
+    try:
+        # 실제 연결 테스트 (컨테이너가 없으면 생성) - 업로드 큐의 공용 클라이언트 사용
+        return get_blob_upload_queue().backend.test_connection(EML_CONTAINER_NAME)
     except Exception as e:
         return False, f"연결 테스트 실패: {str(e)}"
 
@@ -138,18 +146,75 @@ def init_database():
                 attachments TEXT,
                 file_size INTEGER,
                 upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                content_hash TEXT,
+                body_codec TEXT,
+                body_text_z BLOB,
+                body_html_z BLOB
             )
         ''')
         
+        # 기존 테이블 마이그레이션 (중복 제거 해시 / 압축 본문 컬럼)
+        cursor.execute("PRAGMA table_info(eml_reports)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        for column_name, column_type in [('content_hash', 'TEXT'), ('body_codec', 'TEXT'),
+                                         ('body_text_z', 'BLOB'), ('body_html_z', 'BLOB')]:
+            if column_name not in existing_columns:
+                cursor.execute(f"ALTER TABLE eml_reports ADD COLUMN {column_name} {column_type}")
+        
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_eml_reports_content_hash
+            ON eml_reports(content_hash)
+        ''')
+        
         conn.commit()
         conn.close()
         return True, f"데이터베이스 초기화 성공 (경로: {EML_DB_PATH})"
     except Exception as e:
         return False, f"데이터베이스 초기화 실패: {str(e)}"
 
+def compress_body(text):
+    """본문 압축 (기준 크기 미만이면 압축하지 않음)
+    
+    Returns:
+        tuple: (평문 또는 None, 압축 데이터 또는 None, 코덱)
+    """
+    if not text:
+        return text, None, None
+    
+    raw = text.encode('utf-8')
+    if len(raw) < EML_BODY_COMPRESS_THRESHOLD:
+        return text, None, None
+    
+    if ZSTD_AVAILABLE:
+        return None, zstandard.ZstdCompressor(level=10).compress(raw), 'zstd'
+    return None, zlib.compress(raw, 6), 'zlib'
+
+def decompress_body(plain_text, compressed, codec):
+    """압축 본문 복원 (조회 시점에만 호출)"""
+    if compressed is None:
+        return plain_text
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(compressed).decode('utf-8')
+    return zlib.decompress(compressed).decode('utf-8')
+
+def find_eml_by_hash(content_hash):
+    """원본 메일 해시로 기존 레코드 ID 조회 (없으면 None)"""
+    if not content_hash:
+        return None
+    try:
+        conn = sqlite3.connect(EML_DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM eml_reports WHERE content_hash = ?', (content_hash,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"EML 해시 조회 실패: {str(e)}")
+        return None
+
 def insert_eml_data(parsed_data, original_filename, blob_name, file_size):
-    """EML 데이터를 데이터베이스에 삽입"""
+    """EML 데이터를 데이터베이스에 삽입 (같은 원본 메일은 기존 레코드 ID 반환)"""
     try:
         conn = sqlite3.connect(EML_DB_PATH)
         cursor = conn.cursor()
@@ -157,12 +222,17 @@ def insert_eml_data(parsed_data, original_filename, blob_name, file_size):
         # 첨부파일 리스트를 문자열로 변환
         attachments_str = ', '.join(parsed_data['attachments']) if parsed_data['attachments'] else ''
         
-        # 데이터 삽입
+        # 큰 본문은 압축 저장 (텍스트/HTML 중 하나라도 압축되면 같은 코덱 사용)
+        body_text, body_text_z, text_codec = compress_body(parsed_data['body_text'])
+        body_html, body_html_z, html_codec = compress_body(parsed_data['body_html'])
+        
+        # 데이터 삽입 (content_hash 중복 시 무시)
         cursor.execute('''
-            INSERT INTO eml_reports (
+            INSERT OR IGNORE INTO eml_reports (
                 original_filename, blob_name, subject, sender, recipient, 
-                date_sent, body_text, body_html, attachments, file_size
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                date_sent, body_text, body_html, attachments, file_size,
+                content_hash, body_codec, body_text_z, body_html_z
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             original_filename,
             blob_name,
@@ -170,13 +240,21 @@ def insert_eml_data(parsed_data, original_filename, blob_name, file_size):
             parsed_data['from'],
             parsed_data['to'],
             parsed_data['date'],
-            parsed_data['body_text'],
-            parsed_data['body_html'],
+            body_text,
+            body_html,
             attachments_str,
-            file_size
+            file_size,
+            parsed_data.get('content_hash'),
+            text_codec or html_codec,
+            body_text_z,
+            body_html_z
         ))
         
-        record_id = cursor.lastrowid
+        if cursor.rowcount == 0:
+            cursor.execute('SELECT id FROM eml_reports WHERE content_hash = ?', (parsed_data.get('content_hash'),))
+            record_id = cursor.fetchone()[0]
+        else:
+            record_id = cursor.lastrowid
         conn.commit()
         conn.close()
         
@@ -198,9 +276,12 @@ def get_eml_record(record_id):
         conn.close()
         
         if record:
-            # 컬럼명과 함께 딕셔너리로 반환
+            # 컬럼명과 함께 딕셔너리로 반환 (압축 본문은 이 시점에 복원)
             columns = [desc[0] for desc in cursor.description]
-            return dict(zip(columns, record))
+            record = dict(zip(columns, record))
+            record['body_text'] = decompress_body(record['body_text'], record.pop('body_text_z', None), record['body_codec'])
+            record['body_html'] = decompress_body(record['body_html'], record.pop('body_html_z', None), record['body_codec'])
+            return record
         else:
             return None
     except Exception as e:
@@ -208,14 +289,14 @@ def get_eml_record(record_id):
         return None
 
 def get_eml_records():
-    """EML 레코드 조회"""
+    """EML 레코드 목록 조회 (본문 제외 경량 조회 - 본문은 get_eml_record로 조회)"""
     try:
         conn = sqlite3.connect(EML_DB_PATH)
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT id, original_filename, subject, body_text
+            SELECT id, original_filename, subject, upload_time, file_size
             FROM eml_reports 
-            WHERE body_text IS NOT NULL AND body_text != ''
+            WHERE (body_text IS NOT NULL AND body_text != '') OR body_text_z IS NOT NULL
             ORDER BY upload_time DESC
         ''')
         records = cursor.fetchall()
@@ -261,12 +342,60 @@ def display_db_record(record):
     # 등록 시간
     st.write(f"**🕐 등록 시간**: {record['upload_time']}")
 
+def read_eml_message(eml_source):
+    """EML 원본을 청크 단위로 읽으면서 파싱, (메시지, SHA-256 해시) 반환
+    
+    Args:
+        eml_source: bytes 또는 바이너리 파일 객체
+    """
+    digest = hashlib.sha256()
+    parser = BytesFeedParser(policy=policy.default)
+    
+    if isinstance(eml_source, (bytes, bytearray)):
+        digest.update(eml_source)
+        parser.feed(bytes(eml_source))
+    else:
+        if hasattr(eml_source, 'seek'):
+            eml_source.seek(0)
+        for chunk in iter(lambda: eml_source.read(EML_READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            parser.feed(chunk)
+    
+    return parser.close(), digest.hexdigest()
+
+def save_eml_attachment(part, content_hash, part_index):
+    """파싱된 첨부파일을 디스크에 기록하고 메시지에서 본문을 비움, 저장 경로 반환
+    
+    파서가 이미 첨부파일 전체를 메모리에 읽은 뒤 호출되므로, 이후 메시지 객체가 첨부 내용을 계속 들고 있지 않도록 하는 용도.
+    같은 이름의 첨부파일(예: image001.png)이 여러 개여도 덮어쓰지 않도록 파트 번호를 파일명 앞에 붙인다.
+    """
+    filename = f"{part_index:03d}_{os.path.basename(part.get_filename())}"
+    attachment_dir = os.path.join(EML_ATTACHMENT_DIR, content_hash)
+    os.makedirs(attachment_dir, exist_ok=True)
+    attachment_path = os.path.join(attachment_dir, filename)
+    
+    # 같은 원본 메일이면 이미 저장되어 있음 (같은 메일의 같은 파트 번호 → 같은 내용)
+    if not os.path.exists(attachment_path):
+        payload = part.get_payload(decode=True) or b''
+        with open(attachment_path, 'wb') as f:
+            f.write(payload)
+    
+    part.set_payload('')
+    return attachment_path
+
 # parse_eml_file 함수의 HTML 처리 부분 수정 (기존 라인 270-290 부근)
-def parse_eml_file(eml_content):
-    """EML 파일 내용을 파싱하여 구조화된 데이터로 반환 (HTML 줄바꿈 보존 개선)"""
+def parse_eml_file(eml_source, save_attachments=False):
+    """EML 파일 내용을 파싱하여 구조화된 데이터로 반환 (HTML 줄바꿈 보존 개선)
+    
+    Args:
+        eml_source: bytes 또는 바이너리 파일 객체 (문자열도 허용)
+        save_attachments: True면 첨부파일을 EML_ATTACHMENT_DIR에 저장 (업로드 확정 시에만 사용)
+    """
     try:
-        # EML 파일 파싱
-        msg = email.message_from_string(eml_content, policy=policy.default)
+        # EML 파일 파싱 (바이트 스트림 + 원본 해시) - 문자열도 바이트로 변환해 같은 해시를 사용
+        if isinstance(eml_source, str):
+            eml_source = eml_source.encode('utf-8')
+        msg, content_hash = read_eml_message(eml_source)
         
         # 기본 헤더 정보 추출
         parsed_data = {
@@ -276,14 +405,16 @@ def parse_eml_file(eml_content):
             'subject': msg.get('Subject', ''),
             'date': msg.get('Date', ''),
             'message_id': msg.get('Message-ID', ''),
+            'content_hash': content_hash,
             'body_text': '',
             'body_html': '',
-            'attachments': []
+            'attachments': [],
+            'attachment_paths': []
         }
         
         # 본문 내용 추출
         if msg.is_multipart():
-            for part in msg.walk():
+            for part_index, part in enumerate(msg.walk()):
                 content_type = part.get_content_type()
                 content_disposition = str(part.get("Content-Disposition", ""))
                 
@@ -304,10 +435,15 @@ def parse_eml_file(eml_content):
                             if payload:
                                 parsed_data['body_html'] = payload.decode('utf-8', errors='ignore')
                 else:
-                    # 첨부파일 정보
+                    # 첨부파일 정보 (업로드 확정 시에만 디스크에 저장 후 메모리에서 해제)
                     filename = part.get_filename()
                     if filename:
                         parsed_data['attachments'].append(filename)
+                        if save_attachments:
+                            try:
+                                parsed_data['attachment_paths'].append(save_eml_attachment(part, content_hash, part_index))
+                            except Exception as attachment_error:
+                                print(f"첨부파일 저장 오류 ({filename}): {attachment_error}")
         else:
             # 단일 파트 메시지 (Base64 UTF-8 처리 개선)
             content_type = msg.get_content_type()
@@ -409,42 +545,22 @@ def parse_eml_file(eml_content):
         return None, str(e)
 
 def upload_to_azure_eml_blob(file_content, filename):
-    """Azure Blob Storage에 파일 업로드"""
+    """Blob 업로드 대기열에 EML 원본 등록 (업로드는 백그라운드에서 진행)
+    
+    Returns:
+        tuple: (성공 여부, blob 이름, 오류 메시지)
+    """
     try:
-        if not STORAGE_CONN_STR:
-            return False, None, "Azure Storage 연결 문자열이 설정되지 않았습니다."
-        
-        # 연결 문자열 유효성 검사
-        is_valid, message = validate_connection_string(STORAGE_CONN_STR)
-        if not is_valid:
-            return False, None, f"연결 문자열 오류: {message}"
-        
-        # Blob Service Client 생성
-        blob_service_client = BlobServiceClient.from_connection_string(STORAGE_CONN_STR)
-        
         # 타임스탬프를 포함한 고유한 파일명 생성
         timestamp = datetime.datetime.now(korea_tz).strftime("%Y%m%d_%H%M%S")
         blob_name = f"{timestamp}_{filename}"
         
-        # 컨테이너 존재 확인 및 생성
-        try:
-            container_client = blob_service_client.get_container_client(EML_CONTAINER_NAME)
-            container_client.get_container_properties()
-        except Exception as e:
-            if "ContainerNotFound" in str(e):
-                container_client.create_container()
-        
-        # Blob 업로드
-        blob_client = blob_service_client.get_blob_client(
-            container=EML_CONTAINER_NAME, 
-            blob=blob_name
-        )
-        
-        # 파일 내용이 bytes가 아닌 경우 변환
+        # 파일 내용이 bytes가 아닌 경우 변환 (파일 객체는 스트림 그대로 스풀에 기록)
         if isinstance(file_content, str):
             file_content = file_content.encode('utf-8')
         
-        blob_client.upload_blob(file_content, overwrite=True)
+        job_id = get_blob_upload_queue().enqueue_stream(file_content, EML_CONTAINER_NAME, blob_name)
+        st.session_state.eml_upload_job_id = job_id
         
         return True, blob_name, None
     except Exception as e:
@@ -487,7 +603,7 @@ current_year = datetime.datetime.now(korea_tz).year
 def extract_precise_data(body_text: str) -> dict:
     """EML에서 정확한 정보만 추출 (줄별 처리로 장애 조치 결과 추출 강화)"""
     try:
-        client = AzureOpenAI(
+        client = get_llm_gateway().get_client(
             azure_endpoint=openai_endpoint,
             api_key=openai_api_key,
             api_version="2024-02-15-preview"
@@ -566,7 +682,9 @@ JSON 응답:
 불확실하면 "정보없음"으로 응답하세요.
 """
         
-        response = client.chat.completions.create(
+        response = get_llm_gateway().chat_completion(
+            client,
+            caller="report_extract",
             model=chat_model,
             messages=[
                 {"role": "system", "content": "정확한 정보만 추출하는 전문가. 특히 '장애 조치 결과' 부분에서 시간순으로 나열된 모든 항목을 빠뜨리지 않고 추출하며, 동일 시간대의 여러 항목도 모두 포함함. '대상서비스', '상황반장', '복구반장', '장애현상' 등 키워드 뒤의 정보를 정확히 찾아서 추출함."},
@@ -770,51 +888,16 @@ def extract_duration_patterns(body_text: str) -> str:
         print(f"이장시간 추출 오류: {e}")
         return ""
 
-def find_action_progress_table(doc):
-    """장애 조치 경과 표 찾기"""
-    try:
-        # 로그 저장을 위한 session_state 초기화
-        if 'template_logs' not in st.session_state:
-            st.session_state.template_logs = []
-        
-        for table_idx, table in enumerate(doc.tables):
-            # 첫 번째 행에서 "일시", "작업 내용", "비고" 같은 헤더 찾기
-            if len(table.rows) > 0:
-                header_row = table.rows[0]
-                header_text = " ".join([cell.text.strip() for cell in header_row.cells])
-                
-                # 조치 경과 관련 헤더 키워드들
-                progress_keywords = ["일시", "시간", "작업", "내용", "현상", "비고", "경과"]
-                matched_count = sum(1 for keyword in progress_keywords if keyword in header_text)
-                
-                if matched_count >= 2:  # 최소 2개 키워드 매칭되면 조치 경과 표로 판단
-                    st.session_state.template_logs.append(f"🎯 조치 경과 표 발견: 테이블 {table_idx} (헤더: {header_text})")
-                    return table_idx, table
-                    
-        # 키워드로 찾지 못했다면 "조치" 키워드가 포함된 표 찾기
-        for table_idx, table in enumerate(doc.tables):
-            for row in table.rows:
-                for cell in row.cells:
-                    if "조치" in cell.text and ("경과" in cell.text or "결과" in cell.text):
-                        st.session_state.template_logs.append(f"🎯 조치 경과 표 발견 (키워드 매칭): 테이블 {table_idx}")
-                        return table_idx, table
-                        
-        return None, None
-        
-    except Exception as e:
-        if 'template_logs' not in st.session_state:
-            st.session_state.template_logs = []
-        st.session_state.template_logs.append(f"⚠️ 조치 경과 표 찾기 오류: {e}")
-        return None, None
-
-def fill_action_progress_table(table, action_list):
-    """조치 경과 표에 데이터 입력"""
+def fill_action_progress_table(table, action_list, logs=None):
+    """조치 경과 표에 데이터 입력 (logs 미지정 시 session_state 로그에 기록)"""
     if not action_list or not table:
         return 0
     
     # 로그 저장을 위한 session_state 초기화
-    if 'template_logs' not in st.session_state:
-        st.session_state.template_logs = []
+    if logs is None:
+        if 'template_logs' not in st.session_state:
+            st.session_state.template_logs = []
+        logs = st.session_state.template_logs
     
     filled_count = 0
     
@@ -829,7 +912,7 @@ def fill_action_progress_table(table, action_list):
         # 행이 부족하면 추가
         if current_rows < needed_rows + start_row:
             rows_to_add = needed_rows + start_row - current_rows
-            st.session_state.template_logs.append(f"🔍 조치 경과 표에 {rows_to_add}개 행 추가")
+            logs.append(f"🔍 조치 경과 표에 {rows_to_add}개 행 추가")
             
             for _ in range(rows_to_add):
                 # 새 행 추가 (첫 번째 행의 셀 수만큼)
@@ -851,58 +934,35 @@ def fill_action_progress_table(table, action_list):
                     row.cells[2].text = action_item.get("비고", "")
                 
                 filled_count += 1
-                st.session_state.template_logs.append(f"✅ {action_item.get('시간')} - {action_item.get('내용')}")
+                logs.append(f"✅ {action_item.get('시간')} - {action_item.get('내용')}")
         
         return filled_count
         
     except Exception as e:
-        st.session_state.template_logs.append(f"❌ 조치 경과 표 입력 오류: {e}")
+        logs.append(f"❌ 조치 경과 표 입력 오류: {e}")
         return 0
 
-def replace_placeholder_text(doc, placeholder, replacement):
-    """문서 전체에서 플레이스홀더를 찾아서 교체"""
-    replaced_count = 0
-    
-    # 문단에서 교체
-    for paragraph in doc.paragraphs:
-        if placeholder in paragraph.text:
-            paragraph.text = paragraph.text.replace(placeholder, replacement)
-            replaced_count += 1
+def fill_template_safely(template_path: str, data: dict, record_id: int, logs: list = None) -> str:
+    """안전한 템플릿 채우기 (개선된 키워드 기반 방식)
     
-    # 표에서 교체
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                if placeholder in cell.text:
-                    cell.text = cell.text.replace(placeholder, replacement)
-                    replaced_count += 1
+    logs를 넘기면 처리 로그를 해당 리스트에 기록 (일괄 처리 워커용, 세션 상태 미사용).
+    미지정 시 st.session_state.template_logs를 초기화하고 기록.
+    """
+    if logs is None:
+        st.session_state.template_logs = []  # 로그 초기화
+        logs = st.session_state.template_logs
     
-    return replaced_count
-
-def fill_template_safely(template_path: str, data: dict, record_id: int) -> str:
-    """안전한 템플릿 채우기 (개선된 키워드 기반 방식)"""
     try:
-        # 로그 저장을 위한 session_state 초기화
-        if 'template_logs' not in st.session_state:
-            st.session_state.template_logs = []
-        
-        st.session_state.template_logs = []  # 로그 초기화
-        
-        doc = Document(template_path)
+        # 컴파일된 템플릿 (템플릿 파일 해시 기준 캐시) 에서 새 문서 생성
+        compiled = get_compiled_template(template_path)
+        doc = compiled.new_document()
         filled_count = 0
         
-        # 1. 시스템명 플레이스홀더 교체 (#서비스명 → KOS-오더(KOS-Internet))
+        # 1~3. 플레이스홀더 일괄 교체 (시스템명, 상황반장, 운영부서 포함 - 색인된 위치만 한 번 방문)
         system_name = data.get("시스템명", "")
-        if system_name and system_name != "정보없음":
-            replaced = replace_placeholder_text(doc, "(#서비스명)", system_name)
-            if replaced > 0:
-                filled_count += replaced
-                st.session_state.template_logs.append(f"🎯 시스템명 교체 완료: (#서비스명) → {system_name} ({replaced}곳)")
-            else:
-                st.session_state.template_logs.append("⚠️ (#서비스명) 플레이스홀더를 찾을 수 없습니다")
-        
-        # 2. 기타 플레이스홀더들 교체 (상황반장 포함)
+        recovery_dept = data.get("복구반장_소속", "")
         placeholder_mappings = {
+            "(#서비스명)": system_name,
             "(#장애등급)": data.get("장애_등급", ""),
             "(#발생시간)": data.get("발생_시간", ""),
             "(#인지시간)": data.get("인지_시간", ""),
@@ -911,53 +971,45 @@ def fill_template_safely(template_path: str, data: dict, record_id: int) -> str:
             "(#소속본부)": data.get("소속_본부", ""),
             "(#소속팀)": data.get("소속_팀", ""),
             "(#상황반장)": data.get("상황반장", ""),
-            "(#복구반장 소속)": data.get("복구반장_소속", ""),
+            "(#복구반장 소속)": recovery_dept,
             "(#보고자 소속)": data.get("본부이하_소속", ""),
             "(#복구반장)": data.get("복구반장", ""),
             "(#장애현상)": data.get("장애_현상", ""),
             "(#장애파급영향)": data.get("파급_영향", ""),
             "(#장애근본원인)": data.get("근본_원인", ""),
+            # 운영부서에도 복구반장 소속 정보 입력
+            "(#운영부서)": recovery_dept,
         }
-        
-        for placeholder, value in placeholder_mappings.items():
-            if value and value != "정보없음":
-                replaced = replace_placeholder_text(doc, placeholder, value)
-                if replaced > 0:
-                    filled_count += replaced
-                    st.session_state.template_logs.append(f"✅ {placeholder} → {value} ({replaced}곳)")
-        
-        # 상황반장 별도 처리 (플레이스홀더와 키워드 매칭 모두 시도)
-        situation_leader = data.get("상황반장", "")
-        if situation_leader and situation_leader != "정보없음":
-            # 1. 플레이스홀더 교체 시도
-            replaced = replace_placeholder_text(doc, "(#상황반장)", situation_leader)
-            if replaced > 0:
-                filled_count += replaced
-                st.session_state.template_logs.append(f"🎯 상황반장 플레이스홀더 교체: {situation_leader} ({replaced}곳)")
-                    
-        # 3. 운영부서에도 복구반장 소속 정보 입력 (추가 보장)
-        recovery_dept = data.get("복구반장_소속", "")
-        if recovery_dept and recovery_dept != "정보없음":
-            # 운영부서 플레이스홀더도 같은 값으로 교체
-            replaced = replace_placeholder_text(doc, "(#운영부서)", recovery_dept)
-            if replaced > 0:
-                filled_count += replaced
-                st.session_state.template_logs.append(f"✅ (#운영부서) → {recovery_dept} ({replaced}곳)")
+        replacements = {
+            placeholder: str(value) for placeholder, value in placeholder_mappings.items()
+            if value and value != "정보없음"
+        }
+        replaced_counts = compiled.replace_placeholders(doc, replacements)
+        
+        for placeholder, replaced in replaced_counts.items():
+            filled_count += replaced
+            if placeholder == "(#서비스명)":
+                logs.append(f"🎯 시스템명 교체 완료: (#서비스명) → {system_name} ({replaced}곳)" if replaced > 0
+                            else "⚠️ (#서비스명) 플레이스홀더를 찾을 수 없습니다")
+            elif replaced > 0:
+                logs.append(f"✅ {placeholder} → {replacements[placeholder]} ({replaced}곳)")
 
         # 4. 제목 입력 (첫 번째 문단에 강제 입력)
         title = data.get("장애_제목", "")
+        title_filled = False
         if title and title != "정보없음":
             # 첫 번째 문단에 제목 입력 (기존 내용 덮어쓰기)
-            if len(doc.paragraphs) > 0:
+            if compiled.paragraph_count > 0:
                 doc.paragraphs[0].text = title
+                title_filled = True
                 filled_count += 1
-                st.session_state.template_logs.append(f"🎯 제목 입력: {title}")
+                logs.append(f"🎯 제목 입력: {title}")
             else:
                 # 문단이 없으면 새로 추가
                 new_para = doc.add_paragraph(title)
                 doc._body._element.insert(0, new_para._element)
                 filled_count += 1
-                st.session_state.template_logs.append(f"🎯 제목 추가: {title}")
+                logs.append(f"🎯 제목 추가: {title}")
         
         # 5. 소속 정보 입력 (두 번째 문단) - 수정된 부분
         dept_text = ""
@@ -965,11 +1017,11 @@ def fill_template_safely(template_path: str, data: dict, record_id: int) -> str:
             dept_text = data.get("본부이하_소속")  # 공백 제거
         dept_text += f" ({current_time.strftime('%Y.%m.%d')})"
         
-        # 두 번째 내용이 있는 문단에 입력 (서식 유지)
-        content_paras = [p for p in doc.paragraphs if p.text.strip()]
-        if len(content_paras) >= 2:
+        # 두 번째 내용이 있는 문단에 입력 (서식 유지) - 위치는 컴파일 시 색인
+        content_indices = compiled.get_content_paragraph_indices(title_filled)
+        if len(content_indices) >= 2:
             # 기존 서식을 유지하면서 텍스트만 교체
-            paragraph = content_paras[1]
+            paragraph = doc.paragraphs[content_indices[1]]
             
             # 기존 run들을 모두 제거하고 새로운 run 추가
             for run in paragraph.runs:
@@ -983,18 +1035,19 @@ def fill_template_safely(template_path: str, data: dict, record_id: int) -> str:
             new_run.font.bold = False   # 굵기 제거
             
             filled_count += 1
-            st.session_state.template_logs.append(f"🎯 소속 정보 입력: {dept_text} (서식 적용)")
+            logs.append(f"🎯 소속 정보 입력: {dept_text} (서식 적용)")
         
-        # 6. 장애 조치 경과 표에 데이터 입력
+        # 6. 장애 조치 경과 표에 데이터 입력 (표 위치는 컴파일 시 색인)
         action_list = data.get("장애_조치_경과_리스트", [])
         if action_list and action_list != "정보없음":
-            table_idx, action_table = find_action_progress_table(doc)
+            action_table = compiled.get_action_table(doc)
             if action_table:
-                action_filled = fill_action_progress_table(action_table, action_list)
+                logs.append(f"🎯 조치 경과 표 발견: 테이블 {compiled.action_table_index} ({compiled.action_table_reason})")
+                action_filled = fill_action_progress_table(action_table, action_list, logs)
                 filled_count += action_filled
-                st.session_state.template_logs.append(f"🎯 조치 경과 표 입력 완료: {len(action_list)}개 항목, {action_filled}개 행 처리")
+                logs.append(f"🎯 조치 경과 표 입력 완료: {len(action_list)}개 항목, {action_filled}개 행 처리")
             else:
-                st.session_state.template_logs.append("⚠️ 조치 경과 표를 찾을 수 없습니다")
+                logs.append("⚠️ 조치 경과 표를 찾을 수 없습니다")
             
         # 7. 생성 정보 추가
         # doc.add_paragraph(f"\n[AI 생성: {current_time.strftime('%Y-%m-%d %H:%M:%S')} | 레코드: {record_id} | 입력: {filled_count}개]")
@@ -1003,44 +1056,127 @@ def fill_template_safely(template_path: str, data: dict, record_id: int) -> str:
         temp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".docx").name
         doc.save(temp_path)
         
-        st.session_state.template_logs.append(f"✅ 총 {filled_count}개 필드 입력 완료")
+        logs.append(f"✅ 총 {filled_count}개 필드 입력 완료")
         return temp_path
         
     except Exception as e:
-        if 'template_logs' not in st.session_state:
-            st.session_state.template_logs = []
-        st.session_state.template_logs.append(f"❌ 템플릿 처리 오류: {e}")
+        logs.append(f"❌ 템플릿 처리 오류: {e}")
         raise Exception(f"템플릿 채우기 실패: {e}")
 
 def upload_to_azure_word(file_path: str, filename: str):
-    """24시간 유효 Azure 업로드"""
+    """24시간 유효 다운로드 링크 발급 후 업로드 대기열에 등록 (파일은 스풀로 복사되므로 호출 후 삭제 가능)
+    
+    Returns:
+        tuple: (성공 여부, URL, 오류 메시지)
+    """
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(STORAGE_CONN_STR)
         timestamp = datetime.datetime.now(korea_tz).strftime("%Y%m%d_%H%M%S")
         blob_name = f"{timestamp}_{filename}"
         
-        # 업로드
-        blob_client = blob_service_client.get_blob_client(container=WORD_CONTAINER_NAME, blob=blob_name)
-        with open(file_path, "rb") as data:
-            blob_client.upload_blob(data, overwrite=True)
-        
-        # 24시간 SAS 토큰
-        account_key = STORAGE_CONN_STR.split('AccountKey=')[1].split(';')[0]
-        sas_token = generate_blob_sas(
-            account_name=STORAGE_ACCOUNT_NAME,
-            container_name=WORD_CONTAINER_NAME,
-            blob_name=blob_name,
-            account_key=account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.datetime.now(korea_tz) + datetime.timedelta(hours=24)
-        )
+        upload_queue = get_blob_upload_queue()
+        job_id = upload_queue.enqueue_file(file_path, WORD_CONTAINER_NAME, blob_name)
+        st.session_state.report_upload_job_id = job_id
         
-        url = f"https://{STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{WORD_CONTAINER_NAME}/{blob_name}?{sas_token}"
+        # 링크는 업로드 완료 전에 미리 발급 (업로드가 끝나면 바로 유효)
+        url = upload_queue.backend.get_download_url(WORD_CONTAINER_NAME, blob_name, expiry_hours=24)
         return True, url, None
         
     except Exception as e:
         return False, None, str(e)
     
+def process_eml_for_batch(filename, content):
+    """일괄 처리용 단건 보고서 생성 (파싱 → 정보 추출 → 템플릿 채우기), (DOCX 임시 경로, 부가 정보) 반환"""
+    parsed_data, parse_error = parse_eml_file(content)
+    if parse_error:
+        raise ValueError(f"EML 파싱 실패: {parse_error}")
+    if not parsed_data['body_text']:
+        raise ValueError("본문이 비어있습니다.")
+    
+    extracted = extract_precise_data(parsed_data['body_text'])
+    if "error" in extracted:
+        raise ValueError(f"정보 추출 실패: {extracted['error']}")
+    
+    record_id = find_eml_by_hash(parsed_data['content_hash'])
+    # 워커 스레드끼리 세션 로그를 덮어쓰지 않도록 보고서마다 별도 로그 사용
+    template_logs = []
+    report_path = fill_template_safely(template_path, extracted, record_id, logs=template_logs)
+    
+    return report_path, {
+        'subject': parsed_data['subject'],
+        'system_name': extracted.get("시스템명", ""),
+        'title': extracted.get("장애_제목", ""),
+        'record_id': record_id or '',
+        'template_logs': "\n".join(template_logs)
+    }
+
+def run_batch_report_generation(source, upload_enabled, max_workers):
+    """zip/디렉토리의 EML 일괄 보고서 생성, (매니페스트, 결과 zip 경로) 반환"""
+    # 워커 스레드에서도 세션 상태(업로드 작업 ID)에 접근할 수 있도록 실행 컨텍스트 연결
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    script_ctx = get_script_run_ctx()
+    
+    processor = ReportBatchProcessor(
+        process_eml_for_batch,
+        upload_fn=upload_to_azure_word if upload_enabled else None,
+        max_workers=max_workers,
+        thread_initializer=lambda: add_script_run_ctx(threading.current_thread(), script_ctx)
+    )
+    
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def update_progress(done, total, message):
+        progress_bar.progress(done / total if total else 1.0)
+        status_text.text(f"처리 중: {done}/{total} - {message}")
+    
+    output_dir = tempfile.mkdtemp(prefix="report_batch_")
+    manifest = processor.run(iter_eml_sources(source), output_dir, progress_callback=update_progress)
+    status_text.text("완료!")
+    
+    archive_path = shutil.make_archive(output_dir, 'zip', output_dir)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return manifest, archive_path
+
+def show_batch_mode():
+    """일괄 생성 화면 (zip 업로드 또는 서버 디렉토리)"""
+    with st.expander("📦 일괄 보고서 생성 (zip / 폴더)"):
+        batch_zip = st.file_uploader("복구보고 EML 묶음(zip)", type=['zip'], key="batch_zip")
+        batch_dir = st.text_input("또는 서버 폴더 경로", value="", placeholder="data/eml")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            max_workers = st.slider("동시 처리 수", min_value=1, max_value=16, value=4)
+        with col2:
+            upload_enabled = st.checkbox("생성 보고서 Azure 업로드 (백그라운드)", value=connection_test_result and bool(WORD_CONTAINER_NAME))
+        
+        source = batch_zip if batch_zip is not None else (batch_dir.strip() or None)
+        if st.button("🚀 일괄 생성", disabled=(source is None or not template_exists)):
+            if isinstance(source, str) and not os.path.exists(source):
+                st.error(f"❌ 경로를 찾을 수 없습니다: {source}")
+                return
+            
+            try:
+                manifest, archive_path = run_batch_report_generation(source, upload_enabled, max_workers)
+            except zipfile.BadZipFile:
+                st.error("❌ 올바른 zip 파일이 아닙니다.")
+                return
+            
+            summary = manifest['summary']
+            st.success(f"✅ 총 {summary['total_files']}건 중 {summary['generated']}건 생성 "
+                       f"(업로드 등록 {summary['uploaded']}건, 실패 {summary['failed']}건, 중복 {summary['duplicates']}건, "
+                       f"{summary['elapsed_seconds']}초)")
+            if manifest['items']:
+                st.dataframe(pd.DataFrame(manifest['items']), use_container_width=True)
+            
+            with open(archive_path, "rb") as f:
+                st.download_button(
+                    label="📥 보고서 일괄 다운로드 (zip)",
+                    data=f.read(),
+                    file_name=f"장애보고서_일괄_{datetime.datetime.now(korea_tz).strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime="application/zip"
+                )
+            os.unlink(archive_path)
+
 ##보고서(초안) 활용 가이드
 def show_completion_guide_simple():
     """간단한 완료 가이드 표시"""
@@ -1113,13 +1249,9 @@ if st.session_state.stage == 'upload':
     )
     
     if uploaded_file is not None:
-        # 파일 내용 읽기
-        file_content = uploaded_file.read()
-        file_content_str = file_content.decode('utf-8', errors='ignore')
-        
-        # EML 파일 파싱
+        # EML 파일 파싱 (바이트 스트림)
         with st.spinner('EML 파일을 분석 중입니다...'):
-            parsed_data, parse_error = parse_eml_file(file_content_str)
+            parsed_data, parse_error = parse_eml_file(uploaded_file)
         
         if parse_error:
             st.error(f"❌ EML 파일 파싱 중 오류가 발생했습니다: {parse_error}")
@@ -1129,8 +1261,19 @@ if st.session_state.stage == 'upload':
             
             st.divider()
             
+            # 이미 등록된 메일이면 재업로드 없이 기존 레코드 사용
+            existing_record_id = find_eml_by_hash(parsed_data['content_hash']) if db_success else None
+            
             # 업로드 확인
-            if not connection_test_result:
+            if existing_record_id:
+                st.info(f"ℹ️ 이미 등록된 메일입니다. (ID: {existing_record_id})")
+                if st.button("✅ 기존 등록 정보로 다음 단계", type="primary"):
+                    st.session_state.current_record_id = existing_record_id
+                    st.session_state.current_filename = uploaded_file.name
+                    st.session_state.current_body_text = parsed_data['body_text']
+                    st.session_state.stage = 'processing'
+                    st.rerun()
+            elif not connection_test_result:
                 st.error("❌ Azure Storage 연결이 설정되지 않아 업로드할 수 없습니다.")
             elif not db_success:
                 st.error("❌ 데이터베이스 연결이 설정되지 않아 업로드할 수 없습니다.")
@@ -1138,20 +1281,25 @@ if st.session_state.stage == 'upload':
                 if st.button("✅ 업로드 및 다음 단계", type="primary"):
                     with st.spinner('Azure Storage에 업로드 중입니다...'):
                         success, blob_name, upload_error = upload_to_azure_eml_blob(
-                            file_content, 
+                            uploaded_file, 
                             uploaded_file.name
                         )
                     
                     if success:
                         st.success(f"✅ 파일이 성공적으로 업로드되었습니다!")
                         
+                        # 업로드가 확정된 메일만 첨부파일 저장
+                        saved_data, _ = parse_eml_file(uploaded_file, save_attachments=True)
+                        if saved_data:
+                            parsed_data['attachment_paths'] = saved_data['attachment_paths']
+                        
                         # 데이터베이스에 정보 저장
                         with st.spinner('데이터베이스에 정보를 저장 중입니다...'):
                             db_success_insert, record_id, db_error = insert_eml_data(
                                 parsed_data, 
                                 uploaded_file.name, 
                                 blob_name, 
-                                len(file_content)
+                                uploaded_file.size
                             )
                         
                         if db_success_insert:
@@ -1167,6 +1315,9 @@ if st.session_state.stage == 'upload':
                             st.error(f"❌ 데이터베이스 등록 중 오류가 발생했습니다: {db_error}")
                     else:
                         st.error(f"❌ 업로드 중 오류가 발생했습니다: {upload_error}")
+    
+    st.divider()
+    show_batch_mode()
 
 # 2단계: AI 분석 및 보고서 생성
 elif st.session_state.stage == 'processing':
@@ -1233,7 +1384,9 @@ elif st.session_state.stage == 'processing':
                                 for log in st.session_state.template_logs:
                                     st.write(log)
                         
-                        # Azure 업로드
+                        # 생성된 보고서는 바로 내려받을 수 있도록 보관하고, Azure 업로드는 백그라운드 대기열로 처리
+                        with open(report_path, "rb") as report_file:
+                            st.session_state.report_bytes = report_file.read()
                         success, url, error = upload_to_azure_word(report_path, f"보고서_{st.session_state.current_record_id}.docx")
                         os.unlink(report_path)
                         
@@ -1262,10 +1415,29 @@ elif st.session_state.stage == 'completed':
     
     st.success(f"장애분석보고서가 성공적으로 생성되었습니다!")
     
+    # 바로 다운로드 (업로드 완료를 기다리지 않음)
+    if st.session_state.get('report_bytes'):
+        st.download_button(
+            label="📥 보고서 바로 다운로드",
+            data=st.session_state.report_bytes,
+            file_name=f"보고서_{st.session_state.current_record_id}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+    
     # 다운로드 링크
     if hasattr(st.session_state, 'report_url'):
         st.markdown(f"### [📥 다운로드 - AI 생성 보고서]({st.session_state.report_url})")
         st.info("💡 다운로드 링크는 24시간 동안 유효합니다.")
+        
+        # 백그라운드 업로드 상태
+        upload_job = get_blob_upload_queue().get_job(st.session_state.get('report_upload_job_id'))
+        if upload_job:
+            upload_status_labels = {
+                'queued': "⏳ 업로드 대기 중", 'uploading': "⏳ 업로드 중",
+                'done': "✅ 업로드 완료", 'failed': "❌ 업로드 실패"
+            }
+            st.caption(f"{upload_status_labels.get(upload_job['status'], upload_job['status'])} (시도 {upload_job['attempts']}회)"
+                       + (f" - {upload_job['last_error']}" if upload_job['status'] == 'failed' and upload_job['last_error'] else ""))
     
     st.divider()
     
@@ -1283,6 +1455,7 @@ elif st.session_state.stage == 'completed':
             st.session_state.extracted = None
             if hasattr(st.session_state, 'report_url'):
                 delattr(st.session_state, 'report_url')
+            st.session_state.report_bytes = None
             st.rerun()
     
     with col2:
@@ -1,15 +1,16 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import seaborn as sns
 import numpy as np
-import platform
 import os
 import urllib.request
 import hashlib
 import ssl
 from datetime import datetime, timedelta
+from utils.font_utils import get_cached_korean_font, resolve_korean_font
+from utils.seasonality_data import SEASONALITY_CSV_PATH, WEEKDAY_LABELS, SeasonalityDataStore, SeasonalityCube
+from utils.seasonality_forecast import forecast_risk_rankings
 
 # -----------------------------
 # 🔧 페이지 레이아웃 설정
@@ -92,7 +93,11 @@ def secure_download_font(url, file_path, expected_hash):
         return False
 
 def setup_korean_font():
-    """한글 폰트 설정 함수 - Azure 웹앱 환경 최적화 및 보안 강화"""
+    """한글 폰트 설정 함수 - 탐색 결과는 프로세스/디스크에 캐시되어 재실행 시 다운로드/검색 생략"""
+    cached_font = get_cached_korean_font()
+    if cached_font:
+        return cached_font
+    
     try:
         # 1. 프로젝트 내 fonts 디렉토리 생성
         fonts_dir = "./fonts"
@@ -120,81 +125,8 @@ def setup_korean_font():
             except Exception as e:
                 st.warning(f"폰트 다운로드 실패: {e}")
         
-        # 3. 폰트 파일이 존재하는 경우 설정
-        if os.path.exists(font_file_path):
-            try:
-                # matplotlib 폰트 매니저에 폰트 추가
-                fm.fontManager.addfont(font_file_path)
-                font_prop = fm.FontProperties(fname=font_file_path)
-                font_name = font_prop.get_name()
-                
-                # matplotlib 설정
-                plt.rcParams['font.family'] = font_name
-                plt.rcParams['axes.unicode_minus'] = False
-                
-                return font_name
-            except Exception as e:
-                st.warning(f"다운로드된 폰트 설정 실패: {e}")
-        
-        # 4. 기존 시스템 폰트 시도
-        if platform.system() == 'Windows':
-            font_paths = [
-                "C:/Windows/Fonts/malgun.ttf",
-                "C:/Windows/Fonts/gulim.ttc",
-                "C:/Windows/Fonts/batang.ttc"
-            ]
-        elif platform.system() == 'Darwin':  # macOS
-            font_paths = [
-                "/System/Library/Fonts/AppleGothic.ttf",
-                "/Library/Fonts/AppleGothic.ttf"
-            ]
-        else:  # Linux (Azure 웹앱 포함)
-            font_paths = [
-                "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                font_file_path  # 다운로드된 폰트 경로 추가
-            ]
-        
-        # 사용 가능한 폰트 찾기
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    if font_path.endswith('.ttf') or font_path.endswith('.ttc'):
-                        fm.fontManager.addfont(font_path)
-                    font_prop = fm.FontProperties(fname=font_path)
-                    font_name = font_prop.get_name()
-                    plt.rcParams['font.family'] = font_name
-                    plt.rcParams['axes.unicode_minus'] = False
-                    return font_name
-                except Exception:
-                    continue
-        
-        # 5. 설치된 한글 폰트 검색
-        korean_fonts = []
-        for font in fm.fontManager.ttflist:
-            if any(keyword in font.name.lower() for keyword in ['nanum', 'malgun', 'gothic', 'batang', 'gulim']):
-                korean_fonts.append(font.name)
-        
-        if korean_fonts:
-            font_name = korean_fonts[0]
-            plt.rcParams['font.family'] = font_name
-            plt.rcParams['axes.unicode_minus'] = False
-            return font_name
-        
-        # 6. 최종 fallback - unicode 지원 폰트
-        fallback_fonts = ['DejaVu Sans', 'Arial Unicode MS', 'Lucida Grande']
-        for font in fallback_fonts:
-            try:
-                plt.rcParams['font.family'] = font
-                plt.rcParams['axes.unicode_minus'] = False
-                return font
-            except:
-                continue
-                
-        # 7. 기본 설정
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['axes.unicode_minus'] = False
-        return 'DejaVu Sans'
+        # 3. 다운로드된 폰트 → 시스템 폰트 → 설치된 한글 폰트 → 기본 폰트 순으로 설정
+        return resolve_korean_font([font_file_path])
         
     except Exception as e:
         # 모든 폰트 설정 실패시 기본 설정
@@ -224,17 +156,19 @@ def get_sorted_services(services_list, default_service=None):
 # -----------------------------
 # 📊 분석 함수들
 # -----------------------------
-def calculate_trend_metrics(df, current_month, current_mmdd):
-    """트렌드 및 메트릭 계산 함수"""
+def calculate_trend_metrics(cube, current_month, current_mmdd):
+    """트렌드 및 메트릭 계산 함수 (시즌성 큐브 기반)"""
+    monthly = cube.monthly_counts()
+    
     # 전체 오류 수
-    total_errors = len(df)
+    total_errors = cube.total
     
     # 이번 달 오류 수
-    current_month_errors = len(df[df['month'] == current_month])
+    current_month_errors = int(monthly[current_month - 1])
     
     # 지난 달 오류 수 (비교용)
     last_month = current_month - 1 if current_month > 1 else 12
-    last_month_errors = len(df[df['month'] == last_month])
+    last_month_errors = int(monthly[last_month - 1])
     
     # 증가율 계산
     if last_month_errors > 0:
@@ -243,13 +177,15 @@ def calculate_trend_metrics(df, current_month, current_mmdd):
         month_change = 0
     
     # 오늘 날짜 기준 오류 수
-    today_errors = len(df[df['month_day'] == current_mmdd])
+    month, day = (int(part) for part in current_mmdd.split("-"))
+    today_errors = int(cube.month_day_counts()[month - 1, day - 1])
     
     # 가장 위험한 서비스 (이번 달 기준)
-    current_month_df = df[df['month'] == current_month]
-    if not current_month_df.empty:
-        risk_service = current_month_df['service'].value_counts().index[0]
-        risk_count = current_month_df['service'].value_counts().iloc[0]
+    service_counts = cube.service_month_counts(current_month)
+    if current_month_errors > 0:
+        risk_idx = int(np.argmax(service_counts))
+        risk_service = cube.services[risk_idx]
+        risk_count = int(service_counts[risk_idx])
     else:
         risk_service = "N/A"
         risk_count = 0
@@ -263,26 +199,19 @@ def calculate_trend_metrics(df, current_month, current_mmdd):
         'risk_count': risk_count
     }
 
-def create_heatmap_data(df, selected_service=None):
-    """히트맵 데이터 생성 함수"""
-    if selected_service:
-        df_filtered = df[df['service'] == selected_service]
-    else:
-        df_filtered = df
-    
-    # 월-일 조합으로 집계
-    heatmap_data = df_filtered.groupby(['month', 'day']).size().reset_index(name='count')
-    
-    # 피벗 테이블 생성 (월 x 일)
-    pivot_data = heatmap_data.pivot(index='month', columns='day', values='count').fillna(0)
-    
-    # 1-12월, 1-31일 전체 범위로 확장
-    full_months = range(1, 13)
-    full_days = range(1, 32)
-    
-    pivot_data = pivot_data.reindex(index=full_months, columns=full_days, fill_value=0)
-    
-    return pivot_data
+def create_heatmap_data(cube, selected_service=None):
+    """히트맵 데이터 생성 함수 (월 x 일, 1-12월/1-31일 전체 범위)"""
+    return pd.DataFrame(cube.month_day_counts(selected_service), index=range(1, 13), columns=range(1, 32))
+
+def build_service_ranking(cube, service_counts, **key_columns):
+    """서비스별 건수 배열을 건수 내림차순 표로 변환 (0건 서비스 제외)"""
+    order = np.argsort(-service_counts, kind='stable')
+    order = order[service_counts[order] > 0]
+    ranking = pd.DataFrame({'service': [cube.services[idx] for idx in order]})
+    for column, value in key_columns.items():
+        ranking[column] = value
+    ranking['count'] = service_counts[order].astype(int)
+    return ranking
 
 def calculate_moving_average(data, window=3):
     """이동평균 계산 함수 - 수정된 버전"""
@@ -320,10 +249,24 @@ st.title("📊 서비스별 오류 시즌성 분석기")
 st.write("서비스별 오류 발생 데이터를 분석해 현재 월/일 기준 시즌드리티 정보를 제공합니다.")
 
 # 업로드 대신 정해진 경로의 파일을 자동 로드
-csv_path = "./data/csv/seasonality.csv"
+csv_path = SEASONALITY_CSV_PATH
+
+@st.cache_resource(show_spinner=False)
+def load_seasonality_cube(csv_path, mtime_ns, size):
+    """컬럼형 캐시에서 시즌성 큐브 생성 (원본 파일이 바뀌면 캐시 키가 바뀜, 읽기 전용으로 공유)"""
+    return SeasonalityCube.from_store(SeasonalityDataStore(csv_path))
 
+@st.cache_data(show_spinner=False)
+def load_seasonality_forecast(csv_path, mtime_ns, size, as_of):
+    """전체 서비스 시즌성 예측 (원본 파일/기준일별로 한 번만 계산)"""
+    return forecast_risk_rankings(SeasonalityDataStore(csv_path).load_columns(), as_of)
+
+# -----------------------------
+# 🧹 2. 데이터 전처리 (서비스 × 월 × 일 집계 큐브는 원본 변경 시에만 생성)
+# -----------------------------
 try:
-    df = pd.read_csv(csv_path, parse_dates=["error_date"])
+    source_signature = SeasonalityDataStore(csv_path).get_source_signature()
+    cube = load_seasonality_cube(csv_path, source_signature['mtime_ns'], source_signature['size'])
 except FileNotFoundError:
     st.error(f"⚠️ 파일을 찾을 수 없습니다: {csv_path}")
     st.stop()
@@ -331,24 +274,18 @@ except Exception as e:
     st.error(f"⚠️ CSV 파일을 여는 중 오류 발생: {e}")
     st.stop()
 
-# -----------------------------
-# 🧹 2. 데이터 전처리
-# -----------------------------
-df["year"] = df["error_date"].dt.year
-df["month"] = df["error_date"].dt.month
-df["day"] = df["error_date"].dt.day
-df["month_day"] = df["error_date"].dt.strftime("%m-%d")
+if not cube.years:
+    st.error(f"⚠️ 분석할 데이터가 없습니다: {csv_path}")
+    st.stop()
 
-# 요일 정보 추가 (0=월요일, 6=일요일)
-df["weekday"] = df["error_date"].dt.weekday
-weekday_map = {0: "월", 1: "화", 2: "수", 3: "목", 4: "금", 5: "토", 6: "일"}
-df["week"] = df["weekday"].map(weekday_map)
+# 요일 정보 (0=월요일, 6=일요일)
+weekday_map = dict(enumerate(WEEKDAY_LABELS))
 
 # -----------------------------
 # 📅 년도 선택 기능 추가
 # -----------------------------
 # 데이터에서 사용 가능한 년도 추출
-available_years = sorted(df['year'].unique(), reverse=True)  # 최신년도부터 정렬
+available_years = sorted(cube.years, reverse=True)  # 최신년도부터 정렬
 default_year = available_years[0]  # 가장 최근 년도를 기본값으로
 
 # st.subheader("📅 분석 기간 설정")
@@ -364,13 +301,11 @@ with col_year1:
 
 with col_year2:
     st.write(f"**선택된 년도: {selected_year}년**")
-    year_data_count = len(df[df['year'] == selected_year])
+    year_monthly_counts = cube.monthly_counts(year=selected_year)
+    year_data_count = int(year_monthly_counts.sum())
     st.write(f"해당 년도 총 장애 건수: **{year_data_count:,}건**")
 
-# 선택된 년도로 데이터 필터링
-df_filtered_year = df[df['year'] == selected_year].copy()
-
-if df_filtered_year.empty:
+if year_data_count == 0:
     st.error(f"⚠️ {selected_year}년에 해당하는 데이터가 없습니다.")
     st.stop()
 
@@ -379,13 +314,8 @@ if df_filtered_year.empty:
 # -----------------------------
 st.subheader(f"📈 {selected_year}년 월별 장애 발생 현황")
 
-# 월별 집계
-monthly_total = df_filtered_year.groupby('month').size().reset_index(name='count')
-
-# 1-12월 전체 범위로 확장 (없는 월은 0으로)
-full_months_df = pd.DataFrame({'month': range(1, 13)})
-monthly_total_full = pd.merge(full_months_df, monthly_total, on='month', how='left').fillna(0)
-monthly_total_full['count'] = monthly_total_full['count'].astype(int)
+# 월별 집계 (1-12월 전체 범위, 없는 월은 0)
+monthly_total_full = pd.DataFrame({'month': range(1, 13), 'count': year_monthly_counts.astype(int)})
 
 # 차트 생성
 fig_monthly, ax_monthly = plt.subplots(figsize=(8.4, 6))
@@ -451,7 +381,14 @@ current_month = today.month
 current_mmdd = today.strftime("%m-%d")
 
 # 메트릭 계산
-metrics = calculate_trend_metrics(df, current_month, current_mmdd)
+metrics = calculate_trend_metrics(cube, current_month, current_mmdd)
+
+# 서비스별 시즌성 예측 (이번 달 / 다음 달 / 다음 주)
+try:
+    forecasts = load_seasonality_forecast(csv_path, source_signature['mtime_ns'], source_signature['size'], today.date())
+except Exception as e:
+    print(f"[SEASONALITY] 예측 실패: {e}")
+    forecasts = None
 
 # 메트릭 카드를 4개 컬럼으로 배치
 col1, col2, col3, col4 = st.columns(4)
@@ -479,29 +416,30 @@ with col3:
     )
 
 with col4:
-    st.metric(
-        label="🚨 위험 서비스",
-        value=f"{metrics['risk_service']}",
-        delta=f"{metrics['risk_count']}건",
-        help="이번 달 가장 많은 오류가 발생한 서비스"
-    )
-
-# -----------------------------
-# 📊 5. 집계 처리
-# -----------------------------
-monthly_counts = df.groupby(["service", "month"]).size().reset_index(name="count")
-day_counts = df.groupby(["service", "month_day"]).size().reset_index(name="count")
+    this_month_forecast = forecasts['this_month']['ranking'] if forecasts else None
+    if this_month_forecast is not None and not this_month_forecast.empty:
+        top_forecast = this_month_forecast.iloc[0]
+        st.metric(
+            label="🚨 위험 서비스 (예측)",
+            value=f"{top_forecast['service']}",
+            delta=f"{top_forecast['forecast']:.1f}건 ({top_forecast['lower']:.0f}~{top_forecast['upper']:.0f})",
+            delta_color="inverse",
+            help="시즌성 모델로 예측한 이번 달 오류 수가 가장 많은 서비스 (90% 예측구간)"
+        )
+    else:
+        st.metric(
+            label="🚨 위험 서비스",
+            value=f"{metrics['risk_service']}",
+            delta=f"{metrics['risk_count']}건",
+            help="이번 달 가장 많은 오류가 발생한 서비스"
+        )
 
 # -----------------------------
 # 📅 6. 현재 기준 예측 (기존)
 # -----------------------------
 st.subheader(f"📅 현재 월({current_month}월) 기준 위험 서비스")
 
-top_services_month = (
-    monthly_counts[monthly_counts["month"] == current_month]
-    .sort_values(by="count", ascending=False)
-    .reset_index(drop=True)
-)
+top_services_month = build_service_ranking(cube, cube.service_month_counts(current_month), month=current_month)
 
 if not top_services_month.empty:
     st.dataframe(top_services_month, use_container_width=True)
@@ -510,17 +448,44 @@ else:
 
 st.subheader(f"📆 오늘({current_mmdd}) 기준 위험 서비스")
 
-top_services_day = (
-    day_counts[day_counts["month_day"] == current_mmdd]
-    .sort_values(by="count", ascending=False)
-    .reset_index(drop=True)
-)
+top_services_day = build_service_ranking(cube, cube.service_day_counts(today.month, today.day), month_day=current_mmdd)
 
 if not top_services_day.empty:
     st.dataframe(top_services_day, use_container_width=True)
 else:
     st.info("오늘 날짜에 해당하는 과거 데이터가 없습니다.")
 
+# -----------------------------
+# 🔮 6-1. 시즌성 모델 기반 위험 서비스 예측
+# -----------------------------
+if forecasts:
+    st.subheader("🔮 시즌성 예측 기반 위험 서비스")
+    forecast_columns = {
+        'service': '서비스',
+        'forecast': '예측 건수',
+        'lower': '하한(90%)',
+        'upper': '상한(90%)',
+        'last_season': '작년 동기',
+        'model': '선택 모델'
+    }
+    col_forecast1, col_forecast2 = st.columns(2)
+    for column, key, title in ((col_forecast1, 'next_month', "다음 달"), (col_forecast2, 'next_week', "다음 주")):
+        with column:
+            forecast = forecasts[key]
+            st.write(f"**{title} ({forecast['label']})**")
+            if forecast['ranking'].empty:
+                st.info("예측된 오류가 없습니다.")
+            else:
+                st.dataframe(forecast['ranking'].head(20).rename(columns=forecast_columns), use_container_width=True)
+    
+    with st.expander("🔢 예측 방법"):
+        st.write("""
+        - **모델**: 계절 나이브(작년 동기), 고전적 계절 분해(추세 + 계절 지수), Holt-Winters 지수평활을 모든 서비스에 동시에 적합
+        - **모델 선택**: 마지막 한 주기(월별 12개월 / 주별 최대 52주)를 떼어 낸 백테스트 오차가 가장 작은 모델을 서비스별로 선택
+        - **예측구간**: 선택 모델의 오차(RMSE) 기준 90% 구간, 예측 시점이 멀수록 넓어짐
+        - 월별은 12개월, 주별은 52주 주기를 사용하며 데이터가 두 주기보다 짧으면 계절성 없이 예측합니다
+        """)
+
 # -----------------------------
 # 기본 서비스 선택을 위한 설정
 # -----------------------------
@@ -529,29 +494,21 @@ if not top_services_month.empty:
     default_service = top_services_month.iloc[0]["service"]
 else:
     # 현재 월에 데이터가 없으면 전체 서비스 중 첫 번째
-    default_service = df["service"].unique().tolist()[0]
+    default_service = cube.services[0]
 
 # -----------------------------
 # 📉 7. 특정 서비스 시각화 - 월별 (수정된 이동평균)
 # -----------------------------
 st.subheader("📊 서비스별 월별 오류 시즌성 그래프")
 
-unique_services = df["service"].unique().tolist()
+unique_services = list(cube.services)
 # 정렬된 서비스 목록 사용
 unique_services = get_sorted_services(unique_services, default_service)
 
 selected_service = st.selectbox("서비스 선택", unique_services)
 
-service_monthly = monthly_counts[monthly_counts["service"] == selected_service]
-
-# 1-12월 전체 데이터로 확장 (없는 월은 0으로)
-full_months = pd.DataFrame({'month': range(1, 13)})
-service_monthly_full = pd.merge(full_months, service_monthly[['month', 'count']], on='month', how='left')
-
-# fillna 전에 디버깅 정보 출력 (개발용)
-if service_monthly_full['count'].isna().any():
-    service_monthly_full['count'] = service_monthly_full['count'].fillna(0)
-service_monthly_full['count'] = service_monthly_full['count'].astype(int)
+# 1-12월 전체 데이터 (없는 월은 0)
+service_monthly_full = pd.DataFrame({'month': range(1, 13), 'count': cube.monthly_counts(selected_service).astype(int)})
 
 # 트렌드 라인 계산 (3개월 이동평균) - 수정된 버전
 window_months = 3
@@ -607,7 +564,7 @@ with st.expander("📈 트렌드 분석 해석"):
 st.subheader("📊 서비스별 일별 오류 시즌성 그래프")
 
 # 정렬된 서비스 목록 사용
-unique_services_day = df["service"].unique().tolist()
+unique_services_day = list(cube.services)
 unique_services_day = get_sorted_services(unique_services_day, default_service)
 
 selected_service_day = st.selectbox("서비스 선택 (일별 시즌성)", unique_services_day, key="day_select")
@@ -617,29 +574,13 @@ selected_month_option = st.selectbox(
     key="month_select"
 )
 
-# 월 선택에 따라 데이터 필터링
+# 월 선택에 따라 일별 집계 (1일부터 31일까지, 없는 날짜는 0)
 if selected_month_option == "전체":
-    filtered_df = df[df["service"] == selected_service_day]
+    selected_month = None
 else:
     selected_month = int(selected_month_option.replace("월", ""))
-    filtered_df = df[(df["service"] == selected_service_day) & (df["month"] == selected_month)]
-
-# 1일부터 31일까지 초기화된 DataFrame 생성
-all_days = pd.DataFrame({'day': list(range(1, 32))})
-
-# 실제 데이터 집계
-if not filtered_df.empty:
-    actual_daily_counts = (
-        filtered_df.groupby("day")
-        .size()
-        .reset_index(name="count")
-    )
-    # 1~31일과 병합하여 누락된 날짜는 count=0으로 채움
-    daily_counts = pd.merge(all_days, actual_daily_counts, on="day", how="left").fillna(0)
-    daily_counts["count"] = daily_counts["count"].astype(int)
-else:
-    daily_counts = all_days.copy()
-    daily_counts["count"] = 0
+daily_counts = pd.DataFrame({'day': list(range(1, 32)),
+                             'count': cube.daily_counts(selected_service_day, selected_month).astype(int)})
 
 # 트렌드 라인 계산 (7일 이동평균) - 수정된 버전
 window_days = 7
@@ -690,20 +631,12 @@ with col_chart[1]:
 st.subheader("📆 서비스별 요일별 오류 발생 패턴")
 
 # 정렬된 서비스 목록 사용
-unique_services_week = df["service"].unique().tolist()
+unique_services_week = list(cube.services)
 unique_services_week = get_sorted_services(unique_services_week, default_service)
 
 selected_service_week = st.selectbox("서비스 선택 (요일)", unique_services_week, key="weekday_select")
 
-weekday_order_kr = ["월", "화", "수", "목", "금", "토", "일"]
-
-weekday_df = df[df["service"] == selected_service_week]
-weekday_counts = (
-    weekday_df.groupby("week")
-    .size()
-    .reindex(weekday_order_kr, fill_value=0)
-    .reset_index(name="count")
-)
+weekday_counts = pd.DataFrame({'week': WEEKDAY_LABELS, 'count': cube.weekday_counts(selected_service_week).astype(int)})
 
 fig3, ax3 = plt.subplots(figsize=(7, 6))
 bars3 = ax3.bar(weekday_counts["week"], weekday_counts["count"])
@@ -725,23 +658,18 @@ with col_chart[1]:
     st.pyplot(fig3)
 
 # 🌙 10. 서비스별 주간/야간 오류 그래프
-if 'daynight' in df.columns:
+if cube.has_daynight:
     st.subheader("🌙 서비스별 주간/야간 오류 발생 패턴")
 
     # 정렬된 서비스 목록 사용
-    unique_services_daynight = df["service"].unique().tolist()
+    unique_services_daynight = list(cube.services)
     unique_services_daynight = get_sorted_services(unique_services_daynight, default_service)
 
     selected_service_daynight = st.selectbox("서비스 선택 (주간/야간)", unique_services_daynight, key="daynight_select")
 
-    time_df = df[df["service"] == selected_service_daynight]
-    time_counts = (
-        time_df["daynight"]
-        .value_counts()
-        .reindex(["주간", "야간"], fill_value=0)
-        .reset_index()
-    )
-    time_counts.columns = ["daynight", "count"]
+    daynight_counts = cube.daynight_counts(selected_service_daynight)
+    time_counts = pd.DataFrame({'daynight': ["주간", "야간"],
+                                'count': [daynight_counts.get(label, 0) for label in ["주간", "야간"]]})
 
     fig4, ax4 = plt.subplots(figsize=(5.6, 6))
     ax4.bar(time_counts["daynight"], time_counts["count"])
@@ -765,20 +693,21 @@ st.subheader("💡 주요 인사이트")
 insights = []
 
 # 가장 활발한 월 찾기
-most_active_month = df.groupby('month').size().idxmax()
+all_monthly_counts = cube.monthly_counts()
+most_active_month = int(np.argmax(all_monthly_counts)) + 1
 insights.append(f"🔥 **{most_active_month}월**이 가장 오류가 많이 발생하는 월입니다.")
 
 # 가장 활발한 요일 찾기
-most_active_weekday = df.groupby('week').size().idxmax()
+most_active_weekday = WEEKDAY_LABELS[int(np.argmax(cube.weekday_counts()))]
 insights.append(f"📅 **{most_active_weekday}요일**에 오류가 가장 많이 발생합니다.")
 
 # 가장 문제가 많은 서비스
-most_problematic_service = df['service'].value_counts().index[0]
+most_problematic_service = cube.services[int(np.argmax(cube.service_totals()))]
 insights.append(f"⚠️ **{most_problematic_service}** 서비스가 전체적으로 가장 많은 오류를 발생시킵니다.")
 
 # 계절성 패턴
-winter_months = df[df['month'].isin([12, 1, 2])].shape[0]
-summer_months = df[df['month'].isin([6, 7, 8])].shape[0]
+winter_months = int(all_monthly_counts[[11, 0, 1]].sum())
+summer_months = int(all_monthly_counts[[5, 6, 7]].sum())
 if winter_months > summer_months * 1.2:
     insights.append("❄️ 겨울철 (12-2월)에 오류가 집중되는 경향을 보입니다.")
 elif summer_months > winter_months * 1.2:
@@ -793,7 +722,7 @@ for insight in insights:
 st.subheader("🔥 월-일별 오류 발생 히트맵")
 
 # 히트맵 서비스 목록 정렬 (전체 옵션 포함)
-heatmap_services_raw = df["service"].unique().tolist()
+heatmap_services_raw = list(cube.services)
 heatmap_services_sorted = get_sorted_services(heatmap_services_raw)
 heatmap_services = ["전체"] + heatmap_services_sorted
 
@@ -801,10 +730,10 @@ selected_heatmap_service = st.selectbox("히트맵 서비스 선택", heatmap_se
 
 # 히트맵 데이터 생성
 if selected_heatmap_service == "전체":
-    heatmap_data = create_heatmap_data(df)
+    heatmap_data = create_heatmap_data(cube)
     title_suffix = "전체 서비스"
 else:
-    heatmap_data = create_heatmap_data(df, selected_heatmap_service)
+    heatmap_data = create_heatmap_data(cube, selected_heatmap_service)
     title_suffix = selected_heatmap_service
 
 # 히트맵 그리기
@@ -882,9 +811,9 @@ with st.expander("🔢 이동평균 계산 방법"):
     - 중앙값 기준으로 정렬하여 정확한 시점 표현
     
     **전체 데이터 특성:**
-    - 총 데이터 건수: {len(df):,}건
-    - 분석 기간: {df['year'].min()}년 ~ {df['year'].max()}년
-    - 서비스 수: {len(df['service'].unique())}개
+    - 총 데이터 건수: {cube.total:,}건
+    - 분석 기간: {cube.years[0]}년 ~ {cube.years[-1]}년
+    - 서비스 수: {len(cube.services)}개
     
     **⚠️ 보안 개선 사항:**
     - 폰트 다운로드 시 SHA256 해시 무결성 검증 적용
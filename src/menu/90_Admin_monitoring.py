@@ -10,6 +10,8 @@ from collections import defaultdict, Counter
 from utils.auth_manager import AuthManager
 from utils.monitoring_manager import MonitoringManager
 from utils.chart_utils import ChartManager
+from utils.llm_gateway import get_llm_gateway
+from utils.admission_control import get_admission_controller
 
 def main():
     """관리자 모니터링 메인 화면"""
@@ -144,6 +146,49 @@ def show_dashboard_overview(monitoring_manager, logs_data, chart_manager):
             delta="최다 사용"
         )
     
+    # 답변 캐시 적중 지표
+    cache_stats = monitoring_manager.get_cache_hit_statistics(logs_data)
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(label="답변 캐시 적중률", value=f"{cache_stats['hit_rate']:.1f}%",
+                  delta=f"{cache_stats['cache_hits']:,}건 적중")
+    
+    with col2:
+        st.metric(label="캐시 적중 평균 응답시간", value=f"{cache_stats['avg_hit_response_time']:.2f}초")
+    
+    with col3:
+        st.metric(label="캐시 미적중 평균 응답시간", value=f"{cache_stats['avg_miss_response_time']:.2f}초")
+    
+    # LLM 게이트웨이 호출자별 지표 (현재 서버 프로세스 기준)
+    llm_metrics = get_llm_gateway().get_metrics()
+    with st.expander("🤖 LLM 호출 지표 (현재 프로세스)"):
+        if llm_metrics:
+            df_llm = pd.DataFrame([
+                {
+                    '호출자': caller, '호출 수': m['calls'], '병합된 호출': m['coalesced'],
+                    '재시도': m['retries'], '오류': m['errors'],
+                    '평균 지연(초)': round(m['avg_latency'], 2), '최대 지연(초)': round(m['max_latency'], 2),
+                    '제한 대기(초)': round(m['throttle_wait'], 2),
+                    '입력 토큰': m['prompt_tokens'], '출력 토큰': m['completion_tokens']
+                }
+                for caller, m in sorted(llm_metrics.items())
+            ])
+            st.dataframe(df_llm, use_container_width=True, hide_index=True)
+        else:
+            st.info("아직 LLM 호출 기록이 없습니다.")
+    
+    # 요청 허용 제어 현황 (현재 서버 프로세스 기준)
+    admission_stats = get_admission_controller().get_stats()
+    with st.expander("🚦 요청 허용 제어 (현재 프로세스)"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("실행 중", f"{admission_stats['in_flight']} / {admission_stats['max_concurrent']}")
+        col2.metric("대기 중", f"{admission_stats['waiting']} / {admission_stats['max_queue']}")
+        col3.metric("허용", f"{admission_stats['admitted']:,}", delta=f"대기 후 허용 포함 {admission_stats['queued']:,}건", delta_color="off")
+        col4.metric("거절", f"{admission_stats['rate_limited'] + admission_stats['shed'] + admission_stats['timed_out']:,}")
+        st.caption(f"IP별 제한 {admission_stats['rate_limited']:,}건 · 과부하 차단 {admission_stats['shed']:,}건 · "
+                   f"대기 시간 초과 {admission_stats['timed_out']:,}건 · 추적 중인 IP {admission_stats['tracked_ips']:,}개")
+    
     st.markdown("---")
     
     # 시간대별 활동 패턴
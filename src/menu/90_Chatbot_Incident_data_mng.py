@@ -7,6 +7,7 @@ import chardet
 import io
 import re
 from dotenv import load_dotenv
+from utils.answer_cache_manager import AnswerCacheManager
 
 # 환경변수 로드
 load_dotenv()
@@ -82,6 +83,21 @@ def normalize_incident_grade(value):
     normalized = re.sub(r'등급$', '', str_value)
     return normalized
 
+# 벡터화 정규화 대상 컬럼: 컬럼명 → 제거할 접미사 패턴
+NORMALIZE_SUFFIX_PATTERNS = {
+    'year': r'년$',
+    'month': r'월$',
+    'week': r'요일$',
+    'incident_grade': r'등급$'
+}
+
+def normalize_dataframe(df):
+    """데이터프레임 컬럼 단위 정규화 (normalize_data_row와 동일 결과, 대량 업로드용)"""
+    for col, pattern in NORMALIZE_SUFFIX_PATTERNS.items():
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str).str.strip().str.replace(pattern, '', regex=True)
+    return df
+
 def normalize_data_row(data_dict):
     """데이터 행 전체 정규화"""
     normalized = data_dict.copy()
@@ -129,9 +145,75 @@ def init_database():
         )
     ''')
     
+    # incident_id 기준 upsert 조회용 인덱스
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incidents_incident_id ON incidents(incident_id)')
+    # 최신순 키셋 페이지네이션용 인덱스
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incidents_created_id ON incidents(created_at, id)')
+    
+    init_search_index(cursor)
+    
     conn.commit()
     conn.close()
 
+# 전문 검색 인덱스 (FTS5 trigram - 한글 부분 문자열 검색)
+FTS_COLUMNS = ['incident_id', 'service_name', 'effect']
+FTS_MIN_TERM_LENGTH = 3  # trigram 토크나이저는 3글자 이상 검색어만 인덱스 조회 가능
+fts_available = False
+
+def init_search_index(cursor):
+    """incidents 테이블의 FTS5 섀도 인덱스와 동기화 트리거 생성 (미지원 환경은 LIKE 검색 사용)"""
+    global fts_available
+    columns_sql = ", ".join(FTS_COLUMNS)
+    new_values_sql = ", ".join(f"new.{col}" for col in FTS_COLUMNS)
+    old_values_sql = ", ".join(f"old.{col}" for col in FTS_COLUMNS)
+    
+    try:
+        cursor.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incidents_fts'
+        ''')
+        is_new_index = cursor.fetchone() is None
+        
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS incidents_fts USING fts5(
+                {columns_sql}, content='incidents', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS incidents_fts_insert AFTER INSERT ON incidents BEGIN
+                INSERT INTO incidents_fts(rowid, {columns_sql}) VALUES (new.id, {new_values_sql});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS incidents_fts_delete AFTER DELETE ON incidents BEGIN
+                INSERT INTO incidents_fts(incidents_fts, rowid, {columns_sql}) VALUES ('delete', old.id, {old_values_sql});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS incidents_fts_update AFTER UPDATE OF {columns_sql} ON incidents BEGIN
+                INSERT INTO incidents_fts(incidents_fts, rowid, {columns_sql}) VALUES ('delete', old.id, {old_values_sql});
+                INSERT INTO incidents_fts(rowid, {columns_sql}) VALUES (new.id, {new_values_sql});
+            END
+        ''')
+        
+        # 기존 데이터가 있는 상태에서 인덱스를 처음 만든 경우 1회 전체 색인
+        if is_new_index:
+            cursor.execute("INSERT INTO incidents_fts(incidents_fts) VALUES ('rebuild')")
+        
+        fts_available = True
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 검색 인덱스 생성 실패 (LIKE 검색 사용): {str(e)}")
+        fts_available = False
+
+def build_fts_query(search_term):
+    """검색어를 FTS5 MATCH 구문으로 변환 (공백 구분 단어 AND, 각 단어는 부분 문자열 일치)
+    
+    3글자 미만 단어가 있으면 None 반환 (LIKE 검색으로 대체)
+    """
+    terms = search_term.split()
+    if not terms or any(len(term) < FTS_MIN_TERM_LENGTH for term in terms):
+        return None
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
 # UTF-8 인코딩 체크 함수
 def check_encoding(file_content):
     """파일 인코딩 체크"""
@@ -147,58 +229,219 @@ def check_encoding(file_content):
     except Exception as e:
         return False, None, 0
 
-# CSV 파일 업로드 함수
-def upload_csv_data(df):
-    """CSV 데이터를 데이터베이스에 저장 (데이터 정규화 포함)"""
-    conn = sqlite3.connect(DB_PATH)
+# CSV 업로드 컬럼 및 청크 크기
+CSV_COLUMNS = [
+    'incident_id', 'service_name', 'error_time', 'effect', 'symptom',
+    'repair_notice', 'error_date', 'week', 'daynight', 'root_cause',
+    'incident_repair', 'incident_plan', 'cause_type', 'done_type',
+    'incident_grade', 'owner_depart', 'year', 'month'
+]
+CSV_CHUNK_SIZE = int(os.getenv('CSV_UPLOAD_CHUNK_SIZE', '50000'))
+
+def create_upload_staging_table(cursor):
+    """청크 병합용 임시 스테이징 테이블 (incident_id 중복은 마지막 행 기준)"""
+    cursor.execute('DROP TABLE IF EXISTS temp.incident_staging')
+    cursor.execute('''
+        CREATE TEMP TABLE incident_staging (
+            incident_id TEXT PRIMARY KEY,
+            service_name TEXT,
+            error_time INTEGER,
+            effect TEXT,
+            symptom TEXT,
+            repair_notice TEXT,
+            error_date DATE,
+            week TEXT,
+            daynight TEXT,
+            root_cause TEXT,
+            incident_repair TEXT,
+            incident_plan TEXT,
+            cause_type TEXT,
+            done_type TEXT,
+            incident_grade TEXT,
+            owner_depart TEXT,
+            year TEXT,
+            month TEXT
+        )
+    ''')
+
+def merge_staging_chunk(cursor):
+    """스테이징 데이터를 incidents에 병합, (신규, 변경된 incident_id 목록) 반환"""
+    data_columns = CSV_COLUMNS[1:]
+    columns_sql = ", ".join(CSV_COLUMNS)
+    changed_condition = " OR ".join(f"i.{col} IS NOT s.{col}" for col in data_columns)
+    
+    # 내용이 달라진 기존 인시던트만 갱신 (동일 내용은 건너뜀)
+    cursor.execute(f'''
+        SELECT DISTINCT s.incident_id FROM incident_staging s
+        JOIN incidents i ON i.incident_id = s.incident_id
+        WHERE {changed_condition}
+    ''')
+    changed_ids = [row[0] for row in cursor.fetchall()]
+    
+    if changed_ids:
+        cursor.execute(f'''
+            UPDATE incidents SET ({", ".join(data_columns)}) = (
+                SELECT {", ".join(data_columns)} FROM incident_staging s
+                WHERE s.incident_id = incidents.incident_id
+            ), updated_at = CURRENT_TIMESTAMP
+            WHERE incident_id IN (
+                SELECT s.incident_id FROM incident_staging s
+                JOIN incidents i ON i.incident_id = s.incident_id
+                WHERE {changed_condition}
+            )
+        ''')
+    
+    cursor.execute(f'''
+        INSERT INTO incidents ({columns_sql})
+        SELECT {columns_sql} FROM incident_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM incidents i WHERE i.incident_id = s.incident_id)
+    ''')
+    inserted = cursor.rowcount
+    
+    cursor.execute('DELETE FROM incident_staging')
+    return inserted, changed_ids
+
+def upload_csv_data(source, chunk_size=CSV_CHUNK_SIZE):
+    """CSV 데이터를 데이터베이스에 저장 (데이터 정규화 포함)
+    
+    청크 단위로 읽어 incident_id 기준 upsert 하며, 전체 업로드는 하나의 트랜잭션으로 처리된다.
+    
+    Args:
+        source: CSV 파일 내용(bytes) 또는 파일 객체
+        chunk_size: 청크당 행 수
+    
+    Returns:
+        tuple: (성공 여부, 메시지)
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    cursor = conn.cursor()
+    total_rows = inserted = 0
+    updated_ids = []
+    deferred_indexes = []
     
     try:
-        # 컬럼명 매핑 (필요시)
-        expected_columns = [
-            'incident_id', 'service_name', 'error_time', 'effect', 'symptom',
-            'repair_notice', 'error_date', 'week', 'daynight', 'root_cause',
-            'incident_repair', 'incident_plan', 'cause_type', 'done_type',
-            'incident_grade', 'owner_depart', 'year', 'month'
-        ]
+        reader = pd.read_csv(source, dtype=str, encoding='utf-8-sig', chunksize=chunk_size)
         
-        # 컬럼 체크
-        if not all(col in df.columns for col in expected_columns):
-            missing_cols = [col for col in expected_columns if col not in df.columns]
-            return False, f"누락된 컬럼: {', '.join(missing_cols)}"
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.execute('PRAGMA cache_size = -65536')
+        cursor.execute('BEGIN IMMEDIATE')
         
-        # 데이터 정규화
-        df_normalized = df.copy()
-        df_normalized['year'] = df_normalized['year'].apply(normalize_year)
-        df_normalized['month'] = df_normalized['month'].apply(normalize_month)
-        df_normalized['week'] = df_normalized['week'].apply(normalize_week)
-        df_normalized['incident_grade'] = df_normalized['incident_grade'].apply(normalize_incident_grade)
+        # 조회용 인덱스 외 보조 인덱스는 적재 후 재생성
+        cursor.execute('''
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = 'incidents' AND sql IS NOT NULL
+              AND name != 'idx_incidents_incident_id'
+        ''')
+        deferred_indexes = cursor.fetchall()
+        for index_name, _ in deferred_indexes:
+            cursor.execute(f'DROP INDEX "{index_name}"')
+        
+        create_upload_staging_table(cursor)
+        placeholders = ", ".join("?" * len(CSV_COLUMNS))
+        
+        for chunk in reader:
+            # 컬럼 체크 (첫 청크 기준)
+            if total_rows == 0:
+                missing_cols = [col for col in CSV_COLUMNS if col not in chunk.columns]
+                if missing_cols:
+                    cursor.execute('ROLLBACK')
+                    return False, f"누락된 컬럼: {', '.join(missing_cols)}"
+            
+            total_rows += len(chunk)
+            chunk = normalize_dataframe(chunk[CSV_COLUMNS].copy())
+            chunk['incident_id'] = chunk['incident_id'].str.strip()
+            chunk = chunk[chunk['incident_id'].fillna('') != '']
+            
+            records = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+            cursor.executemany(f'INSERT OR REPLACE INTO incident_staging VALUES ({placeholders})', records)
+            
+            chunk_inserted, chunk_updated_ids = merge_staging_chunk(cursor)
+            inserted += chunk_inserted
+            updated_ids.extend(chunk_updated_ids)
         
-        # 데이터 삽입
-        df_normalized.to_sql('incidents', conn, if_exists='append', index=False)
-        return True, f"{len(df_normalized)}개의 레코드가 성공적으로 업로드되었습니다."
+        for _, index_sql in deferred_indexes:
+            cursor.execute(index_sql)
+        cursor.execute('COMMIT')
+        
+        if updated_ids:
+            invalidate_answer_cache(updated_ids)
+        
+        updated = len(updated_ids)
+        skipped = total_rows - inserted - updated
+        return True, (f"총 {total_rows}개 레코드 처리 완료 - 신규 {inserted}건, 갱신 {updated}건, "
+                      f"건너뜀 {skipped}건 (변경 없음/중복/ID 누락)")
         
     except Exception as e:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
         return False, f"데이터 업로드 중 오류 발생: {str(e)}"
     finally:
         conn.close()
 
 # 데이터 조회 함수
-def get_incidents(limit=100, search_term=""):
-    """인시던트 데이터 조회"""
+def get_incidents_page(limit=100, search_term="", cursor=None):
+    """인시던트 데이터 페이지 조회 (키셋 페이지네이션)
+    
+    - 검색어 없음: 최신순 (created_at, id) 기준
+    - 검색어 있음: FTS5 관련도(bm25) 순, 짧은 검색어는 LIKE 검색 후 최신순
+    
+    Args:
+        limit: 페이지 크기
+        search_term: 검색어 (인시던트 ID, 서비스명, 영향도)
+        cursor: 이전 페이지 마지막 행의 정렬 키 (첫 페이지는 None)
+    
+    Returns:
+        tuple: (데이터프레임, 다음 페이지 cursor 또는 None)
+    """
     conn = sqlite3.connect(DB_PATH)
+    search_term = search_term.strip()
+    fts_query = build_fts_query(search_term) if search_term and fts_available else None
     
-    if search_term:
-        query = """
-        SELECT * FROM incidents 
-        WHERE incident_id LIKE ? OR service_name LIKE ? OR effect LIKE ?
-        ORDER BY created_at DESC LIMIT ?
+    if fts_query:
+        # 관련도 순 (score 오름차순 = 관련도 높은 순)
+        keyset_sql = "WHERE (h.score, i.id) > (?, ?)" if cursor else ""
+        query = f"""
+        WITH hits AS (
+            SELECT rowid, bm25(incidents_fts) AS score
+            FROM incidents_fts WHERE incidents_fts MATCH ?
+        )
+        SELECT i.*, h.score AS _sort_key FROM hits h
+        JOIN incidents i ON i.id = h.rowid
+        {keyset_sql}
+        ORDER BY h.score, i.id LIMIT ?
         """
-        df = pd.read_sql_query(query, conn, params=[f'%{search_term}%', f'%{search_term}%', f'%{search_term}%', limit])
+        params = [fts_query] + (list(cursor) if cursor else []) + [limit]
     else:
-        query = "SELECT * FROM incidents ORDER BY created_at DESC LIMIT ?"
-        df = pd.read_sql_query(query, conn, params=[limit])
+        conditions, params = [], []
+        if search_term:
+            conditions.append("(incident_id LIKE ? OR service_name LIKE ? OR effect LIKE ?)")
+            params.extend([f'%{search_term}%'] * 3)
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+        SELECT *, created_at AS _sort_key FROM incidents
+        {where_sql}
+        ORDER BY created_at DESC, id DESC LIMIT ?
+        """
+        params.append(limit)
     
+    df = pd.read_sql_query(query, conn, params=params)
     conn.close()
+    
+    next_cursor = None
+    if len(df) == limit:
+        last_row = df.iloc[-1]
+        next_cursor = (last_row['_sort_key'], int(last_row['id']))
+    return df.drop(columns=['_sort_key']), next_cursor
+
+def get_incidents(limit=100, search_term=""):
+    """인시던트 데이터 조회 (첫 페이지)"""
+    df, _ = get_incidents_page(limit, search_term)
     return df
 
 # 개별 레코드 추가 함수
@@ -236,6 +479,14 @@ def add_incident(data):
     finally:
         conn.close()
 
+# 챗봇 답변 캐시 무효화 함수
+def invalidate_answer_cache(incident_ids):
+    """변경된 인시던트를 참조하는 챗봇 답변 캐시 삭제"""
+    try:
+        AnswerCacheManager().invalidate_incidents(incident_ids)
+    except Exception as e:
+        print(f"답변 캐시 무효화 실패: {str(e)}")
+
 # 레코드 업데이트 함수
 def update_incident(incident_id, data):
     """인시던트 업데이트 (데이터 정규화 포함)"""
@@ -255,6 +506,10 @@ def update_incident(incident_id, data):
         normalized_data = normalize_data_row(data_dict)
         normalized_values = [normalized_data[field] for field in field_names]
         
+        # 장애 ID가 바뀌는 경우 이전 ID의 캐시도 무효화
+        cursor.execute('SELECT incident_id FROM incidents WHERE id=?', (incident_id,))
+        row = cursor.fetchone()
+        
         cursor.execute('''
             UPDATE incidents SET
                 incident_id=?, service_name=?, error_time=?, effect=?, symptom=?,
@@ -266,6 +521,10 @@ def update_incident(incident_id, data):
         ''', normalized_values + [incident_id])
         
         conn.commit()
+        changed_ids = {normalized_data['incident_id']}
+        if row:
+            changed_ids.add(row[0])
+        invalidate_answer_cache(list(changed_ids))
         return True, "인시던트가 성공적으로 업데이트되었습니다."
     except Exception as e:
         return False, f"업데이트 중 오류 발생: {str(e)}"
@@ -279,10 +538,15 @@ def delete_incident(incident_id):
     cursor = conn.cursor()
     
     try:
+        cursor.execute('SELECT incident_id FROM incidents WHERE id=?', (incident_id,))
+        row = cursor.fetchone()
+        
         cursor.execute('DELETE FROM incidents WHERE id=?', (incident_id,))
         conn.commit()
         
         if cursor.rowcount > 0:
+            if row:
+                invalidate_answer_cache([row[0]])
             return True, "인시던트가 성공적으로 삭제되었습니다."
         else:
             return False, "삭제할 인시던트를 찾을 수 없습니다."
@@ -322,11 +586,29 @@ def main():
             limit = st.number_input("조회 건수", min_value=10, max_value=1000, value=100, step=10)
         
         if st.button("조회"):
-            df = get_incidents(limit, search_term)
+            # 새 조회 조건이면 첫 페이지부터
+            st.session_state.incident_grid_query = (search_term, int(limit))
+            st.session_state.incident_grid_cursors = [None]
+        
+        if 'incident_grid_query' in st.session_state:
+            grid_search_term, grid_limit = st.session_state.incident_grid_query
+            page_cursors = st.session_state.incident_grid_cursors
+            df, next_cursor = get_incidents_page(grid_limit, grid_search_term, page_cursors[-1])
             if not df.empty:
-                st.success(f"{len(df)}건의 데이터를 조회했습니다.")
+                st.success(f"{len(page_cursors)}페이지 - {len(df)}건의 데이터를 조회했습니다.")
                 st.dataframe(df, use_container_width=True)
                 
+                # 페이지 이동
+                prev_col, next_col, _ = st.columns([1, 1, 4])
+                with prev_col:
+                    if st.button("◀ 이전", disabled=len(page_cursors) <= 1):
+                        page_cursors.pop()
+                        st.rerun()
+                with next_col:
+                    if st.button("다음 ▶", disabled=next_cursor is None):
+                        page_cursors.append(next_cursor)
+                        st.rerun()
+                
                 # 다운로드 기능
                 csv = df.to_csv(index=False)
                 st.download_button(
@@ -367,12 +649,11 @@ def main():
             st.success("✅ UTF-8 인코딩이 확인되었습니다.")
             
             try:
-                # CSV 파일 읽기
-                df = pd.read_csv(io.StringIO(file_content.decode('utf-8')))
+                # CSV 파일 미리보기 (전체 적재는 업로드 시 청크 단위로 처리)
+                df = pd.read_csv(io.BytesIO(file_content), dtype=str, encoding='utf-8-sig', nrows=10)
                 
                 st.write("**파일 미리보기:**")
-                st.dataframe(df.head(10))
-                st.write(f"총 {len(df)}개의 레코드")
+                st.dataframe(df)
                 
                 # 정규화 미리보기 (처음 5행만)
                 if len(df) > 0:
@@ -405,7 +686,8 @@ def main():
                             st.dataframe(preview_df[display_columns])
                 
                 if st.button("업로드 실행"):
-                    success, message = upload_csv_data(df)
+                    with st.spinner("업로드 중입니다..."):
+                        success, message = upload_csv_data(file_content)
                     if success:
                         st.success(message)
                     else:
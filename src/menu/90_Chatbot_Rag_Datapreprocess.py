@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-from openai import AzureOpenAI
+from utils.llm_gateway import get_llm_gateway
+from utils.summary_batch_engine import SummaryBatchEngine
 from io import StringIO
+import hashlib
 import re
 import os
 from dotenv import load_dotenv
@@ -30,7 +32,7 @@ client = None
 
 if azure_openai_endpoint and azure_openai_key:
     try:
-        client = AzureOpenAI(
+        client = get_llm_gateway().get_client(
             azure_endpoint=azure_openai_endpoint,
             api_key=azure_openai_key,
             api_version=azure_openai_api_version
@@ -51,7 +53,7 @@ else:
             
             if manual_endpoint and manual_key:
                 try:
-                    client = AzureOpenAI(
+                    client = get_llm_gateway().get_client(
                         azure_endpoint=manual_endpoint,
                         api_key=manual_key,
                         api_version=manual_api_version
@@ -62,7 +64,7 @@ else:
                     st.error(f"❌ Azure OpenAI 클라이언트 초기화 실패: {str(e)}")
 
 # 요약 함수
-def summarize_text(text, summary_type, max_tokens=150):
+def summarize_text(text, summary_type, max_tokens=150, raise_on_error=False):
     """
     Azure OpenAI API를 사용하여 텍스트를 요약합니다.
     
@@ -70,6 +72,7 @@ def summarize_text(text, summary_type, max_tokens=150):
         text (str): 요약할 텍스트
         summary_type (str): 요약 유형 (장애원인, 복구방법, 후속과제)
         max_tokens (int): 최대 토큰 수
+        raise_on_error (bool): True면 실패 시 예외 발생 (배치 워커 스레드용, 화면 출력 없음)
     
     Returns:
         str: 요약된 텍스트
@@ -78,6 +81,8 @@ def summarize_text(text, summary_type, max_tokens=150):
         return "정보 없음"
     
     if not client:
+        if raise_on_error:
+            raise RuntimeError("Azure OpenAI 클라이언트가 초기화되지 않았습니다.")
         return "Azure OpenAI 클라이언트가 초기화되지 않았습니다."
     
     # 텍스트 전처리 (불필요한 공백, 개행 문자 정리)
@@ -188,7 +193,9 @@ def summarize_text(text, summary_type, max_tokens=150):
 원문: {cleaned_text}"""
         }
         
-        response = client.chat.completions.create(
+        response = get_llm_gateway().chat_completion(
+            client,
+            caller="preprocess_summarize",
             model=azure_openai_model,
             messages=[
                 {"role": "system", "content": "당신은 IT 인시던트 분석 전문가입니다. 제공된 텍스트를 간결하고 명확하게 요약해주세요."},
@@ -200,22 +207,43 @@ def summarize_text(text, summary_type, max_tokens=150):
         
         # None 체크 추가
         if response.choices[0].message.content is None:
+            if raise_on_error:
+                raise ValueError("API 응답이 비어있습니다.")
             return "요약 생성 실패: API 응답이 비어있습니다."
         
         summary = response.choices[0].message.content.strip()
         return summary
         
     except Exception as e:
+        if raise_on_error:
+            raise
         st.error(f"요약 생성 중 오류가 발생했습니다: {str(e)}")
         return f"요약 실패: {str(e)}"
 
-def process_excel_file(uploaded_file, max_tokens=150):
+# 요약 프롬프트 버전 (prompt_templates 수정 시 올려서 이전 체크포인트를 재사용하지 않도록 함)
+SUMMARY_PROMPT_VERSION = "1"
+
+# 요약 대상 컬럼: (원본 컬럼, 요약 유형, 결과 컬럼)
+SUMMARY_FIELDS = [
+    ('root_cause', "장애원인", '장애원인요약'),
+    ('incident_repair', "복구방법", '복구방법요약'),
+    ('incident_plan', "후속과제", '후속과제요약')
+]
+
+def get_summary_run_id(uploaded_file, max_tokens):
+    """업로드 파일 내용 + 옵션 기준 실행 ID (같으면 이전 실행을 이어서 처리)"""
+    digest = hashlib.sha256(uploaded_file.getvalue())
+    digest.update(f"|{max_tokens}|{azure_openai_model}|{SUMMARY_PROMPT_VERSION}".encode('utf-8'))
+    return digest.hexdigest()
+
+def process_excel_file(uploaded_file, max_tokens=150, max_workers=8):
     """
     업로드된 Excel 파일을 처리하고 요약을 생성합니다.
     
     Args:
         uploaded_file: Streamlit의 업로드된 파일 객체
         max_tokens (int): 요약의 최대 토큰 수
+        max_workers (int): 동시 요약 요청 수
     
     Returns:
         pandas.DataFrame: 요약이 포함된 데이터프레임
@@ -240,32 +268,29 @@ def process_excel_file(uploaded_file, max_tokens=150):
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        total_rows = len(df)
-        summaries = {
-            '장애원인요약': [],
-            '복구방법요약': [],
-            '후속과제요약': []
-        }
+        def update_progress(done, total, message):
+            progress_bar.progress(done / total if total else 1.0)
+            status_text.text(f'처리 중: {done}/{total} - {message}')
         
-        # 각 행에 대해 요약 생성
-        for idx, row in df.iterrows():
-            status_text.text(f'처리 중: {idx + 1}/{total_rows} - {row["incident_id"]}')
-            
-            # 각 필드별 요약 생성
-            root_cause_summary = summarize_text(row['root_cause'], "장애원인", max_tokens)
-            repair_summary = summarize_text(row['incident_repair'], "복구방법", max_tokens)
-            plan_summary = summarize_text(row['incident_plan'], "후속과제", max_tokens)
-            
-            summaries['장애원인요약'].append(root_cause_summary)
-            summaries['복구방법요약'].append(repair_summary)
-            summaries['후속과제요약'].append(plan_summary)
-            
-            # 진행률 업데이트
-            progress_bar.progress((idx + 1) / total_rows)
+        # 워커 풀 + 중복 제거 + 체크포인트 기반 요약 생성
+        engine = SummaryBatchEngine(
+            lambda text, summary_type, tokens: summarize_text(text, summary_type, tokens, raise_on_error=True),
+            max_workers=max_workers,
+            model_name=azure_openai_model,
+            prompt_version=SUMMARY_PROMPT_VERSION
+        )
+        row_summaries = engine.run(
+            df[[source_col for source_col, _, _ in SUMMARY_FIELDS]].to_dict('records'),
+            SUMMARY_FIELDS,
+            max_tokens,
+            run_id=get_summary_run_id(uploaded_file, max_tokens),
+            file_name=getattr(uploaded_file, 'name', None),
+            progress_callback=update_progress
+        )
         
         # 결과 데이터프레임에 요약 추가
-        for key, value in summaries.items():
-            result_df[key] = value
+        for _, _, result_col in SUMMARY_FIELDS:
+            result_df[result_col] = [summary.get(result_col, "정보 없음") for summary in row_summaries]
         
         status_text.text('완료!')
         progress_bar.progress(1.0)
@@ -379,6 +404,20 @@ def main():
             help="요약의 최대 길이를 설정합니다. 값이 클수록 더 상세한 요약이 생성됩니다."
         )
         
+        max_workers = st.slider(
+            "동시 요청 수",
+            min_value=1,
+            max_value=32,
+            value=8,
+            help="동시에 처리할 요약 요청 수입니다. 실제 처리량은 Azure OpenAI 할당량(RPM/TPM)에 맞춰 자동 제한됩니다."
+        )
+        
+        # 이전 실행 재개 안내
+        if uploaded_file is not None:
+            previous_run = SummaryBatchEngine(None).get_run(get_summary_run_id(uploaded_file, max_tokens))
+            if previous_run and previous_run['status'] != 'completed':
+                st.info(f"🔁 이전 실행 기록이 있습니다 ({previous_run['completed_jobs']}/{previous_run['total_jobs']}건 완료). 완료된 요약은 건너뛰고 이어서 처리합니다.")
+        
         st.markdown("---")
         
         # Azure OpenAI 클라이언트 확인
@@ -393,7 +432,7 @@ def main():
     if st.button("🚀 요약 생성", type="primary", disabled=(not client or not uploaded_file)):
         if client and uploaded_file:
             with st.spinner("요약을 생성하는 중입니다. 잠시만 기다려주세요..."):
-                result_df = process_excel_file(uploaded_file, max_tokens)
+                result_df = process_excel_file(uploaded_file, max_tokens, max_workers)
                 
                 if result_df is not None:
                     st.success("✅ 요약이 완료되었습니다!")
@@ -1,7 +1,7 @@
-import requests
 import streamlit as st
 from dotenv import load_dotenv
 import os
+from utils.serpapi_client import SerpApiClient, get_serpapi_cache
 
 # .env 파일 불러오기
 load_dotenv()
@@ -17,13 +17,10 @@ if not api_key:
     st.error("❌ .env 파일에 SERPAPI_API_KEY가 설정되지 않았습니다.")
 else:
     def get_serpapi_usage(api_key: str):
-        url = f"https://serpapi.com/account?api_key={api_key}"
-        response = requests.get(url)
-        
-        if response.status_code != 200:
-            return None, response.text
-        
-        data = response.json()
+        try:
+            data = SerpApiClient(api_key).get_account_usage()
+        except Exception as e:
+            return None, str(e)
         
         plan_total = data.get("plan_searches", 0)       # 이번 달 총 할당량
         searches_left = data.get("searches_left", 0)    # 남은 검색 횟수
@@ -43,4 +40,19 @@ else:
             st.success("✅ 사용량 조회 성공")
             st.metric("이번달 총 할당량", usage["총 할당량"])
             st.metric("이번달 사용 횟수", usage["사용한 횟수"])
-            st.metric("이번달 남은 횟수", usage["남은 횟수"])
\ No newline at end of file
+            st.metric("이번달 남은 횟수", usage["남은 횟수"])
+    
+    # 검색 결과 캐시로 절약한 할당량 (이번 달 기준)
+    st.markdown("---")
+    st.subheader("💾 검색 결과 캐시")
+    try:
+        cache_stats = get_serpapi_cache().get_cache_stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("절약한 검색 횟수", f"{cache_stats['cache_hits']:,}")
+        col2.metric("실제 API 호출", f"{cache_stats['api_calls']:,}")
+        col3.metric("캐시 적중률", f"{cache_stats['hit_rate']:.1f}%")
+        st.caption(f"집계 시작일: {cache_stats['since_date']} · 캐시 항목 {cache_stats['total_entries']:,}개 "
+                   f"(결과 없음 {cache_stats['negative_entries']:,}개) · "
+                   f"TTL {cache_stats['ttl_hours']:.0f}시간 / 결과 없음 {cache_stats['negative_ttl_minutes']:.0f}분")
+    except Exception as e:
+        st.warning(f"캐시 통계를 불러올 수 없습니다: {e}")
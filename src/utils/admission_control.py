@@ -0,0 +1,224 @@
+# utils/admission_control.py - IP별 요청 허용 제어 및 과부하 시 요청 차단 (load shedding)
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# 허용 제어 설정 (환경변수로 조정)
+ADMISSION_WINDOW_SECONDS = float(os.getenv("ADMISSION_WINDOW_SECONDS", "60"))
+ADMISSION_MAX_REQUESTS_PER_WINDOW = int(os.getenv("ADMISSION_MAX_REQUESTS_PER_WINDOW", "20"))
+ADMISSION_BURST = int(os.getenv("ADMISSION_BURST", "5"))
+ADMISSION_REFILL_PER_MINUTE = float(os.getenv("ADMISSION_REFILL_PER_MINUTE", "10"))
+ADMISSION_MAX_INFLIGHT_PER_IP = int(os.getenv("ADMISSION_MAX_INFLIGHT_PER_IP", "2"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "60"))
+ADMISSION_MAX_TRACKED_IPS = int(os.getenv("ADMISSION_MAX_TRACKED_IPS", "5000"))
+
+# 대기열 순번 갱신 주기 (초)
+QUEUE_POLL_INTERVAL = 1.0
+
+
+class AdmissionController:
+    """챗봇 파이프라인 앞단의 실시간 허용 제어
+    
+    - IP별 슬라이딩 윈도우 (윈도우 내 최대 요청 수)
+    - IP별 토큰 버킷 (순간 폭주 제한)
+    - IP별 동시 실행 수 제한
+    - 전체 동시 실행 수 제한 + 대기열 (대기 순번 안내), 대기열이 가득 차면 즉시 거절
+    """
+    
+    def __init__(self, window_seconds: float = ADMISSION_WINDOW_SECONDS,
+                 max_requests_per_window: int = ADMISSION_MAX_REQUESTS_PER_WINDOW,
+                 burst: int = ADMISSION_BURST, refill_per_minute: float = ADMISSION_REFILL_PER_MINUTE,
+                 max_inflight_per_ip: int = ADMISSION_MAX_INFLIGHT_PER_IP,
+                 max_concurrent: int = ADMISSION_MAX_CONCURRENT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.window_seconds = window_seconds
+        self.max_requests_per_window = max_requests_per_window
+        self.burst = float(max(burst, 1))
+        self.refill_rate = max(refill_per_minute, 0.001) / 60.0
+        self.max_inflight_per_ip = max_inflight_per_ip
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        
+        self._clients = {}
+        self._in_flight = 0
+        self._waiting = deque()
+        self._condition = threading.Condition()
+        
+        self._stats = {'admitted': 0, 'queued': 0, 'rate_limited': 0, 'shed': 0, 'timed_out': 0}
+    
+    def _get_client(self, ip: str, now: float) -> Dict[str, Any]:
+        client = self._clients.get(ip)
+        if client is None:
+            if len(self._clients) >= ADMISSION_MAX_TRACKED_IPS:
+                self._evict_idle_clients(now)
+            client = {'requests': deque(), 'tokens': self.burst, 'updated_at': now, 'in_flight': 0}
+            self._clients[ip] = client
+        return client
+    
+    def _evict_idle_clients(self, now: float):
+        """윈도우가 지났고 실행 중인 요청이 없는 IP 상태 정리"""
+        idle_ips = [
+            ip for ip, client in self._clients.items()
+            if client['in_flight'] == 0 and (not client['requests'] or now - client['requests'][-1] > self.window_seconds)
+        ]
+        for ip in idle_ips:
+            del self._clients[ip]
+    
+    def _check_rate(self, client: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+        """IP별 제한 확인 - 위반 시 거절 결과, 통과 시 None (통과한 요청은 카운터에 반영)"""
+        if client['in_flight'] >= self.max_inflight_per_ip:
+            return {'admitted': False, 'reason': 'ip_concurrency', 'retry_after': 0.0}
+        
+        requests = client['requests']
+        while requests and now - requests[0] >= self.window_seconds:
+            requests.popleft()
+        if len(requests) >= self.max_requests_per_window:
+            return {'admitted': False, 'reason': 'rate_window',
+                    'retry_after': requests[0] + self.window_seconds - now}
+        
+        client['tokens'] = min(self.burst, client['tokens'] + (now - client['updated_at']) * self.refill_rate)
+        client['updated_at'] = now
+        if client['tokens'] < 1.0:
+            return {'admitted': False, 'reason': 'rate_burst',
+                    'retry_after': (1.0 - client['tokens']) / self.refill_rate}
+        
+        client['tokens'] -= 1.0
+        requests.append(now)
+        return None
+    
+    def acquire(self, ip: str, on_wait: Callable[[int], None] = None) -> Dict[str, Any]:
+        """
+        파이프라인 실행 슬롯 획득
+        
+        Args:
+            ip: 클라이언트 IP
+            on_wait: 대기열에서 기다리는 동안 대기 순번이 바뀔 때마다 호출 (순번은 1부터)
+        
+        Returns:
+            dict: admitted, reason, retry_after, waited (admitted=True이면 release() 호출 필요)
+        """
+        start = time.monotonic()
+        with self._condition:
+            client = self._get_client(ip, start)
+            rejection = self._check_rate(client, start)
+            if rejection:
+                self._stats['rate_limited'] += 1
+                return dict(rejection, waited=0.0)
+            
+            if self._in_flight < self.max_concurrent and not self._waiting:
+                return self._admit(client, start)
+            
+            if len(self._waiting) >= self.max_queue:
+                self._stats['shed'] += 1
+                return {'admitted': False, 'reason': 'overloaded', 'retry_after': self.queue_timeout / 2, 'waited': 0.0}
+            
+            ticket = object()
+            self._waiting.append(ticket)
+            self._stats['queued'] += 1
+            # 대기 중인 요청도 IP별 동시 실행 수에 포함 (같은 IP가 대기열을 채우지 못하도록)
+            client['in_flight'] += 1
+        
+        last_position = None
+        try:
+            while True:
+                with self._condition:
+                    if self._waiting[0] is ticket and self._in_flight < self.max_concurrent:
+                        self._waiting.popleft()
+                        client['in_flight'] -= 1
+                        decision = self._admit(client, start)
+                        self._condition.notify_all()
+                        return decision
+                    
+                    if time.monotonic() - start >= self.queue_timeout:
+                        self._waiting.remove(ticket)
+                        client['in_flight'] -= 1
+                        self._stats['timed_out'] += 1
+                        self._condition.notify_all()
+                        return {'admitted': False, 'reason': 'queue_timeout', 'retry_after': self.queue_timeout / 2,
+                                'waited': time.monotonic() - start}
+                    
+                    position = self._waiting.index(ticket) + 1
+                    if position == last_position:
+                        self._condition.wait(QUEUE_POLL_INTERVAL)
+                        continue
+                
+                # 콜백(화면 갱신)은 잠금 밖에서 호출
+                last_position = position
+                if on_wait:
+                    on_wait(position)
+        except BaseException:
+            # 세션 종료 등으로 대기가 중단되면 대기열에서 제거
+            with self._condition:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    client['in_flight'] -= 1
+                    self._condition.notify_all()
+            raise
+    
+    def _admit(self, client: Dict[str, Any], start: float) -> Dict[str, Any]:
+        self._in_flight += 1
+        client['in_flight'] += 1
+        self._stats['admitted'] += 1
+        return {'admitted': True, 'reason': None, 'retry_after': 0.0, 'waited': time.monotonic() - start}
+    
+    def release(self, ip: str):
+        """acquire()로 획득한 슬롯 반환"""
+        with self._condition:
+            self._in_flight = max(self._in_flight - 1, 0)
+            client = self._clients.get(ip)
+            if client:
+                client['in_flight'] = max(client['in_flight'] - 1, 0)
+            self._condition.notify_all()
+    
+    @contextmanager
+    def admit(self, ip: str, on_wait: Callable[[int], None] = None):
+        """with 블록 동안 슬롯 유지 - 허용 여부는 yield된 결과의 admitted로 확인"""
+        decision = self.acquire(ip, on_wait)
+        try:
+            yield decision
+        finally:
+            if decision['admitted']:
+                self.release(ip)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return dict(self._stats, in_flight=self._in_flight, waiting=len(self._waiting),
+                        tracked_ips=len(self._clients), max_concurrent=self.max_concurrent,
+                        max_queue=self.max_queue)
+    
+    def reset_stats(self):
+        with self._condition:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+def format_rejection_message(decision: Dict[str, Any]) -> str:
+    """거절 사유별 사용자 안내 메시지"""
+    retry_after = max(int(round(decision.get('retry_after') or 0)), 1)
+    reason = decision.get('reason')
+    
+    if reason == 'ip_concurrency':
+        return "⏳ 이전 질문을 처리하고 있습니다. 답변이 완료된 후 다시 질문해주세요."
+    if reason in ('rate_window', 'rate_burst'):
+        return f"⚠️ 짧은 시간에 질문이 너무 많습니다. 약 {retry_after}초 후 다시 시도해주세요."
+    if reason == 'queue_timeout':
+        return f"⚠️ 대기 시간이 초과되었습니다. 약 {retry_after}초 후 다시 시도해주세요."
+    return f"⚠️ 현재 사용자가 많아 질문을 처리할 수 없습니다. 약 {retry_after}초 후 다시 시도해주세요."
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """프로세스 공용 허용 제어기"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
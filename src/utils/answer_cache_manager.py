@@ -0,0 +1,247 @@
+# utils/answer_cache_manager.py - 유사 질문 답변 캐시
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from utils.db_utils import get_answer_cache_db_path
+
+class AnswerCacheManager:
+    """질문 임베딩 기반 답변 캐시 관리 클래스
+    
+    캐시 키는 (프롬프트 버전, 쿼리 타입, 검색된 incident_id 집합)이며,
+    같은 키 안에서 질문 임베딩의 코사인 유사도가 임계값 이상인 최근접 항목을 재사용한다.
+    검색된 문서의 내용 지문이 달라지면(인시던트 수정) 해당 항목은 폐기된다.
+    """
+    
+    # 내용 지문 계산에 사용하는 필드 (답변에 그대로 출력되는 필드)
+    FINGERPRINT_FIELDS = [
+        "service_name", "error_time", "symptom", "root_cause", "incident_repair",
+        "incident_plan", "done_type", "error_date", "incident_grade", "owner_depart",
+        "daynight", "week"
+    ]
+    
+    def __init__(self, db_path: str = None, similarity_threshold: float = 0.95,
+                 ttl_seconds: int = 86400, max_entries: int = 5000):
+        self.db_path = db_path or get_answer_cache_db_path()
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+    
+    def init_database(self):
+        """캐시 테이블 초기화"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS answer_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    prompt_version TEXT NOT NULL,
+                    query_type TEXT NOT NULL,
+                    incident_set_hash TEXT NOT NULL,
+                    content_fingerprint TEXT NOT NULL,
+                    query_text TEXT,
+                    embedding BLOB NOT NULL,
+                    response TEXT NOT NULL,
+                    hit_count INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_hit_at REAL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS answer_cache_incidents (
+                    cache_id INTEGER NOT NULL,
+                    incident_id TEXT NOT NULL,
+                    FOREIGN KEY (cache_id) REFERENCES answer_cache(id) ON DELETE CASCADE
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_answer_cache_key
+                ON answer_cache(prompt_version, query_type, incident_set_hash)
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_answer_cache_incident ON answer_cache_incidents(incident_id)')
+            conn.commit()
+    
+    @staticmethod
+    def _collect_incident_ids(documents: List[Dict[str, Any]]) -> List[str]:
+        """문서 목록에서 정렬된 incident_id 목록 추출"""
+        return sorted({str(doc.get('incident_id')).strip() for doc in documents if doc.get('incident_id')})
+    
+    @staticmethod
+    def build_incident_set_hash(incident_ids: List[str]) -> str:
+        """incident_id 집합 해시 (순서 무관)"""
+        return hashlib.sha256("|".join(sorted(incident_ids)).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def build_content_fingerprint(cls, documents: List[Dict[str, Any]]) -> str:
+        """검색된 문서 내용의 지문 - 인시던트가 수정되면 값이 달라진다"""
+        digest = hashlib.sha256()
+        for doc in sorted(documents, key=lambda d: str(d.get('incident_id', ''))):
+            payload = [str(doc.get('incident_id', ''))] + [str(doc.get(field, '')) for field in cls.FINGERPRINT_FIELDS]
+            digest.update(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _normalize_embedding(embedding) -> Optional[array]:
+        """단위 벡터로 정규화 (코사인 유사도 = 내적)"""
+        if not embedding:
+            return None
+        vector = array('f', embedding)
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return None
+        return array('f', (v / norm for v in vector))
+    
+    def lookup(self, query_embedding, query_type: str, prompt_version: str,
+               documents: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """유사 질문의 캐시된 답변 조회 (없으면 None)"""
+        query_vector = self._normalize_embedding(query_embedding)
+        incident_ids = self._collect_incident_ids(documents)
+        if query_vector is None or not incident_ids:
+            return None
+        
+        set_hash = self.build_incident_set_hash(incident_ids)
+        fingerprint = self.build_content_fingerprint(documents)
+        now = time.time()
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, content_fingerprint, embedding, response, created_at
+                    FROM answer_cache
+                    WHERE prompt_version = ? AND query_type = ? AND incident_set_hash = ?
+                ''', (prompt_version, query_type, set_hash))
+                rows = cursor.fetchall()
+                
+                stale_ids = []
+                best_id, best_score, best_response = None, -1.0, None
+                for cache_id, cached_fingerprint, blob, response, created_at in rows:
+                    if cached_fingerprint != fingerprint or now - created_at > self.ttl_seconds:
+                        stale_ids.append(cache_id)
+                        continue
+                    
+                    cached_vector = array('f')
+                    cached_vector.frombytes(blob)
+                    if len(cached_vector) != len(query_vector):
+                        continue
+                    
+                    score = sum(a * b for a, b in zip(query_vector, cached_vector))
+                    if score > best_score:
+                        best_id, best_score, best_response = cache_id, score, response
+                
+                if stale_ids:
+                    self._delete_entries(cursor, stale_ids)
+                
+                if best_id is None or best_score < self.similarity_threshold:
+                    conn.commit()
+                    return None
+                
+                cursor.execute('UPDATE answer_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE id = ?',
+                               (now, best_id))
+                conn.commit()
+                
+                return {'response': best_response, 'similarity': best_score, 'cache_id': best_id}
+        
+        except Exception as e:
+            print(f"답변 캐시 조회 실패: {str(e)}")
+            return None
+    
+    def store(self, query: str, query_embedding, query_type: str, prompt_version: str,
+              documents: List[Dict[str, Any]], response: str) -> bool:
+        """생성된 답변을 캐시에 저장"""
+        query_vector = self._normalize_embedding(query_embedding)
+        incident_ids = self._collect_incident_ids(documents)
+        if query_vector is None or not incident_ids or not response:
+            return False
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO answer_cache
+                    (prompt_version, query_type, incident_set_hash, content_fingerprint,
+                     query_text, embedding, response, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (prompt_version, query_type, self.build_incident_set_hash(incident_ids),
+                      self.build_content_fingerprint(documents), query,
+                      query_vector.tobytes(), response, time.time()))
+                cache_id = cursor.lastrowid
+                cursor.executemany('INSERT INTO answer_cache_incidents (cache_id, incident_id) VALUES (?, ?)',
+                                   [(cache_id, incident_id) for incident_id in incident_ids])
+                self._evict_overflow(cursor)
+                conn.commit()
+            return True
+        
+        except Exception as e:
+            print(f"답변 캐시 저장 실패: {str(e)}")
+            return False
+    
+    def invalidate_incidents(self, incident_ids: List[str]) -> int:
+        """지정한 인시던트를 참조하는 캐시 항목 삭제"""
+        incident_ids = [str(i).strip() for i in incident_ids if i]
+        if not incident_ids:
+            return 0
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                placeholders = ",".join("?" * len(incident_ids))
+                cursor.execute(f'SELECT DISTINCT cache_id FROM answer_cache_incidents WHERE incident_id IN ({placeholders})',
+                               incident_ids)
+                cache_ids = [row[0] for row in cursor.fetchall()]
+                self._delete_entries(cursor, cache_ids)
+                conn.commit()
+                return len(cache_ids)
+        
+        except Exception as e:
+            print(f"답변 캐시 무효화 실패: {str(e)}")
+            return 0
+    
+    def clear(self):
+        """캐시 전체 삭제"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM answer_cache_incidents')
+            cursor.execute('DELETE FROM answer_cache')
+            conn.commit()
+        return True
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM answer_cache')
+            total_entries, total_hits = cursor.fetchone()
+        
+        return {
+            "total_entries": total_entries,
+            "total_hits": total_hits,
+            "similarity_threshold": self.similarity_threshold,
+            "ttl_hours": self.ttl_seconds / 3600
+        }
+    
+    def _delete_entries(self, cursor, cache_ids: List[int]):
+        """캐시 항목 및 인시던트 매핑 삭제"""
+        if not cache_ids:
+            return
+        placeholders = ",".join("?" * len(cache_ids))
+        cursor.execute(f'DELETE FROM answer_cache_incidents WHERE cache_id IN ({placeholders})', cache_ids)
+        cursor.execute(f'DELETE FROM answer_cache WHERE id IN ({placeholders})', cache_ids)
+    
+    def _evict_overflow(self, cursor):
+        """최대 항목 수 초과 시 가장 오래 사용되지 않은 항목부터 삭제"""
+        cursor.execute('SELECT COUNT(*) FROM answer_cache')
+        overflow = cursor.fetchone()[0] - self.max_entries
+        if overflow <= 0:
+            return
+        cursor.execute('''
+            SELECT id FROM answer_cache
+            ORDER BY COALESCE(last_hit_at, created_at) ASC
+            LIMIT ?
+        ''', (overflow,))
+        self._delete_entries(cursor, [row[0] for row in cursor.fetchall()])
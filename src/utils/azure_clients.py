@@ -2,9 +2,9 @@ import streamlit as st
 import hashlib
 import json
 from datetime import datetime, timedelta
-from openai import AzureOpenAI
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
+from utils.llm_gateway import get_llm_gateway
 
 class VectorEmbeddingClient:
     """벡터 임베딩 생성 및 캐싱 관리 클라이언트"""
@@ -189,7 +189,7 @@ class AzureClientManager:
         """Azure 클라이언트 초기화 - 임베딩 클라이언트 추가 (단일 인덱스, 하위 호환성 유지)"""
         try:
             # Azure OpenAI 클라이언트 설정
-            azure_openai_client = AzureOpenAI(
+            azure_openai_client = get_llm_gateway().get_client(
                 azure_endpoint=_self.config.azure_openai_endpoint,
                 api_key=_self.config.azure_openai_key,
                 api_version=_self.config.azure_openai_api_version
@@ -227,7 +227,7 @@ class AzureClientManager:
         """
         try:
             # Azure OpenAI 클라이언트 설정
-            azure_openai_client = AzureOpenAI(
+            azure_openai_client = get_llm_gateway().get_client(
                 azure_endpoint=_self.config.azure_openai_endpoint,
                 api_key=_self.config.azure_openai_key,
                 api_version=_self.config.azure_openai_api_version
@@ -272,7 +272,9 @@ class AzureClientManager:
         """클라이언트 연결 테스트 (단일 인덱스)"""
         try:
             # OpenAI 연결 테스트
-            openai_client.chat.completions.create(
+            get_llm_gateway().chat_completion(
+                openai_client,
+                caller="connection_test",
                 model=self.config.azure_openai_model,
                 messages=[{"role": "user", "content": "test"}],
                 max_tokens=1
@@ -297,7 +299,9 @@ class AzureClientManager:
         """클라이언트 연결 테스트 (이중 인덱스)"""
         try:
             # OpenAI 연결 테스트
-            openai_client.chat.completions.create(
+            get_llm_gateway().chat_completion(
+                openai_client,
+                caller="connection_test",
                 model=self.config.azure_openai_model,
                 messages=[{"role": "user", "content": "test"}],
                 max_tokens=1
@@ -1,5 +1,5 @@
 import streamlit as st
-from openai import AzureOpenAI
+from utils.llm_gateway import get_llm_gateway
 
 class AzureClientManager:
     """웹 검색 기반 Azure 클라이언트 관리 클래스"""
@@ -12,7 +12,7 @@ class AzureClientManager:
         """Azure OpenAI 클라이언트만 초기화 (검색 클라이언트 제거)"""
         try:
             # Azure OpenAI 클라이언트 설정
-            azure_openai_client = AzureOpenAI(
+            azure_openai_client = get_llm_gateway().get_client(
                 azure_endpoint=_self.config.azure_openai_endpoint,
                 api_key=_self.config.azure_openai_key,
                 api_version=_self.config.azure_openai_api_version
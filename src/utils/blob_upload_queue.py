@@ -0,0 +1,361 @@
+# utils/blob_upload_queue.py - Blob 업로드 백그라운드 큐
+import datetime
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from utils.db_utils import get_base_db_path, get_blob_upload_queue_db_path
+
+load_dotenv()
+
+# 큐 설정
+BLOB_STORAGE_BACKEND = os.getenv("BLOB_STORAGE_BACKEND", "").lower()  # azure | local (미설정 시 azure, local은 명시적으로 지정해야 사용)
+BLOB_LOCAL_ROOT = os.getenv("BLOB_LOCAL_ROOT", os.path.join(get_base_db_path(), "blob_storage"))
+BLOB_UPLOAD_WORKERS = int(os.getenv("BLOB_UPLOAD_WORKERS", "4"))
+BLOB_UPLOAD_MAX_ATTEMPTS = int(os.getenv("BLOB_UPLOAD_MAX_ATTEMPTS", "5"))
+BLOB_UPLOAD_BACKOFF_BASE = float(os.getenv("BLOB_UPLOAD_BACKOFF_BASE", "2.0"))
+BLOB_UPLOAD_BACKOFF_MAX = float(os.getenv("BLOB_UPLOAD_BACKOFF_MAX", "300"))
+BLOB_MAX_SINGLE_PUT_SIZE = 8 * 1024 * 1024   # 이 크기 초과 시 블록 분할 업로드
+BLOB_MAX_BLOCK_SIZE = 4 * 1024 * 1024
+BLOB_MAX_CONCURRENCY = int(os.getenv("BLOB_MAX_CONCURRENCY", "4"))  # 파일당 병렬 블록 업로드 수
+
+
+class AzureBlobBackend:
+    """Azure Blob Storage 백엔드 (클라이언트/컨테이너 확인 결과 재사용)"""
+    
+    name = "azure"
+    
+    def __init__(self, connection_string: str, account_name: str = None):
+        from azure.storage.blob import BlobServiceClient
+        self.connection_string = connection_string
+        self.account_name = account_name
+        self.account_key = connection_string.split('AccountKey=')[1].split(';')[0] if 'AccountKey=' in connection_string else None
+        self.client = BlobServiceClient.from_connection_string(
+            connection_string,
+            max_single_put_size=BLOB_MAX_SINGLE_PUT_SIZE,
+            max_block_size=BLOB_MAX_BLOCK_SIZE
+        )
+        self._ready_containers = set()
+        self._lock = threading.Lock()
+    
+    def _ensure_container(self, container: str):
+        with self._lock:
+            if container in self._ready_containers:
+                return
+        container_client = self.client.get_container_client(container)
+        try:
+            container_client.get_container_properties()
+        except Exception as e:
+            if "ContainerNotFound" in str(e):
+                container_client.create_container()
+            else:
+                raise
+        with self._lock:
+            self._ready_containers.add(container)
+    
+    def upload_file(self, local_path: str, container: str, blob_name: str):
+        """파일 업로드 (큰 파일은 블록 분할 + 병렬 업로드)"""
+        self._ensure_container(container)
+        blob_client = self.client.get_blob_client(container=container, blob=blob_name)
+        with open(local_path, "rb") as data:
+            blob_client.upload_blob(data, overwrite=True, max_concurrency=BLOB_MAX_CONCURRENCY)
+    
+    def get_download_url(self, container: str, blob_name: str, expiry_hours: int = 24) -> str:
+        """읽기 전용 SAS URL"""
+        from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+        account_name = self.account_name or self.client.account_name
+        sas_token = generate_blob_sas(
+            account_name=account_name,
+            container_name=container,
+            blob_name=blob_name,
+            account_key=self.account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=expiry_hours)
+        )
+        return f"https://{account_name}.blob.core.windows.net/{container}/{blob_name}?{sas_token}"
+    
+    def test_connection(self, container: str):
+        self._ensure_container(container)
+        return True, "연결 성공"
+
+
+class LocalBlobBackend:
+    """로컬 파일시스템 백엔드 (오프라인 개발/테스트용 Blob Storage 대체)"""
+    
+    name = "local"
+    
+    def __init__(self, root_dir: str = BLOB_LOCAL_ROOT):
+        self.root_dir = root_dir
+    
+    def _blob_path(self, container: str, blob_name: str) -> str:
+        return os.path.join(self.root_dir, container or "default", blob_name)
+    
+    def upload_file(self, local_path: str, container: str, blob_name: str):
+        target_path = self._blob_path(container, blob_name)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temp_path = f"{target_path}.part"
+        shutil.copyfile(local_path, temp_path)
+        os.replace(temp_path, target_path)
+    
+    def get_download_url(self, container: str, blob_name: str, expiry_hours: int = 24) -> str:
+        return Path(os.path.abspath(self._blob_path(container, blob_name))).as_uri()
+    
+    def test_connection(self, container: str):
+        os.makedirs(os.path.join(self.root_dir, container or "default"), exist_ok=True)
+        return True, f"로컬 저장소 모드 ({self.root_dir})"
+
+
+def resolve_storage_backend_name() -> str:
+    """사용할 저장소 백엔드 이름 (BLOB_STORAGE_BACKEND=local 로 지정한 경우에만 로컬 저장소)"""
+    return "local" if BLOB_STORAGE_BACKEND == "local" else "azure"
+
+def create_storage_backend(backend_name: str = None):
+    """저장소 백엔드 생성 (이름을 지정하지 않으면 환경변수 기준)"""
+    connection_string = os.getenv("STORAGE_CONN_STR")
+    backend = backend_name or resolve_storage_backend_name()
+    if backend == "azure":
+        if not connection_string:
+            raise ValueError("Azure Storage 연결 문자열이 설정되지 않았습니다.")
+        return AzureBlobBackend(connection_string, os.getenv("STORAGE_ACCOUNT_NAME"))
+    return LocalBlobBackend()
+
+
+class BlobUploadQueue:
+    """SQLite 기반 영속 업로드 큐
+    
+    - 업로드할 파일은 스풀 디렉토리에 복사된 뒤 작업으로 등록되고, 워커 스레드가 백그라운드로 업로드
+    - 실패 시 지수 백오프(+지터)로 재시도, 최대 횟수 초과 시 failed
+    - 프로세스 재시작 시 uploading 상태로 남은 작업은 다시 대기열로 복구
+    """
+    
+    def __init__(self, backend=None, db_path: str = None, num_workers: int = BLOB_UPLOAD_WORKERS,
+                 max_attempts: int = BLOB_UPLOAD_MAX_ATTEMPTS):
+        self.backend = backend or create_storage_backend()
+        # 작업 등록 시의 백엔드로 업로드 (재시작 후 설정이 바뀌어도 다른 저장소로 올라가지 않도록)
+        self._backends = {self.backend.name: self.backend}
+        self._backends_lock = threading.Lock()
+        self.db_path = db_path or get_blob_upload_queue_db_path()
+        self.spool_dir = os.path.join(os.path.dirname(self.db_path), "upload_spool")
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        
+        self._wakeup = threading.Condition()
+        self._workers = []
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.init_database()
+    
+    def init_database(self):
+        """업로드 작업 테이블 초기화 및 중단된 작업 복구"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS upload_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    container TEXT NOT NULL,
+                    blob_name TEXT NOT NULL,
+                    spool_path TEXT NOT NULL,
+                    file_size INTEGER,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at REAL DEFAULT 0,
+                    last_error TEXT,
+                    backend TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL,
+                    completed_at REAL
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_jobs_status ON upload_jobs(status, next_attempt_at)')
+            cursor.execute("UPDATE upload_jobs SET status = 'queued' WHERE status = 'uploading'")
+            conn.commit()
+    
+    def start(self):
+        """워커 스레드 시작 (이미 시작했으면 무시)"""
+        with self._start_lock:
+            if self._workers:
+                return
+            for index in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"blob-upload-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+    
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+    
+    def enqueue_file(self, local_path: str, container: str, blob_name: str) -> int:
+        """파일 업로드 작업 등록 (파일은 스풀로 복사되므로 호출 후 원본을 삭제해도 됨)"""
+        spool_path = os.path.join(self.spool_dir, f"{uuid.uuid4().hex}_{os.path.basename(blob_name)}")
+        shutil.copyfile(local_path, spool_path)
+        return self._insert_job(container, blob_name, spool_path)
+    
+    def enqueue_stream(self, stream, container: str, blob_name: str) -> int:
+        """바이트/파일 객체 업로드 작업 등록"""
+        spool_path = os.path.join(self.spool_dir, f"{uuid.uuid4().hex}_{os.path.basename(blob_name)}")
+        with open(spool_path, 'wb') as f:
+            if isinstance(stream, (bytes, bytearray)):
+                f.write(stream)
+            else:
+                if hasattr(stream, 'seek'):
+                    stream.seek(0)
+                shutil.copyfileobj(stream, f, length=1024 * 1024)
+        return self._insert_job(container, blob_name, spool_path)
+    
+    def _insert_job(self, container: str, blob_name: str, spool_path: str) -> int:
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO upload_jobs (container, blob_name, spool_path, file_size, backend, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (container, blob_name, spool_path, os.path.getsize(spool_path), self.backend.name, now, now))
+            job_id = cursor.lastrowid
+            conn.commit()
+        
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+    
+    def _claim_job(self) -> Optional[Dict[str, Any]]:
+        """실행 가능한 작업 하나를 uploading 상태로 선점"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('''
+                SELECT * FROM upload_jobs
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id LIMIT 1
+            ''', (time.time(),)).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute("UPDATE upload_jobs SET status = 'uploading', updated_at = ? WHERE id = ?",
+                         (time.time(), row['id']))
+            conn.execute('COMMIT')
+            return dict(row)
+        finally:
+            conn.close()
+    
+    def _seconds_until_next_job(self) -> float:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM upload_jobs WHERE status = 'queued'").fetchone()
+        if not row or row[0] is None:
+            return 5.0
+        return min(max(row[0] - time.time(), 0.1), 5.0)
+    
+    def _worker_loop(self):
+        while not self._stopped:
+            try:
+                job = self._claim_job()
+            except Exception as e:
+                print(f"[BLOB_QUEUE] 작업 조회 실패: {e}")
+                job = None
+            
+            if job is None:
+                with self._wakeup:
+                    if not self._stopped:
+                        self._wakeup.wait(timeout=self._seconds_until_next_job())
+                continue
+            
+            self._run_job(job)
+    
+    def _backend_for(self, backend_name: Optional[str]):
+        """작업에 기록된 백엔드 (없으면 현재 백엔드)"""
+        if not backend_name:
+            return self.backend
+        with self._backends_lock:
+            backend = self._backends.get(backend_name)
+            if backend is None:
+                backend = self._backends[backend_name] = create_storage_backend(backend_name)
+            return backend
+    
+    def _run_job(self, job: Dict[str, Any]):
+        attempts = job['attempts'] + 1
+        try:
+            self._backend_for(job.get('backend')).upload_file(job['spool_path'], job['container'], job['blob_name'])
+        except Exception as e:
+            if attempts >= self.max_attempts:
+                self._update_job(job['id'], status='failed', attempts=attempts, last_error=str(e))
+                print(f"[BLOB_QUEUE] 업로드 실패 (포기): {job['blob_name']} - {e}")
+            else:
+                delay = random.uniform(0, min(BLOB_UPLOAD_BACKOFF_MAX, BLOB_UPLOAD_BACKOFF_BASE * (2 ** attempts)))
+                self._update_job(job['id'], status='queued', attempts=attempts, last_error=str(e),
+                                 next_attempt_at=time.time() + delay)
+                print(f"[BLOB_QUEUE] 업로드 재시도 {attempts}/{self.max_attempts}: {job['blob_name']} - {delay:.1f}초 후")
+            return
+        
+        self._update_job(job['id'], status='done', attempts=attempts, last_error=None, completed_at=time.time())
+        try:
+            os.remove(job['spool_path'])
+        except OSError:
+            pass
+    
+    def _update_job(self, job_id: int, **fields):
+        fields['updated_at'] = time.time()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute(f'UPDATE upload_jobs SET {columns} WHERE id = ?', list(fields.values()) + [job_id])
+            conn.commit()
+    
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """작업 상태 조회"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM upload_jobs WHERE id = ?', (job_id,)).fetchone()
+            return dict(row) if row else None
+    
+    def wait_for(self, job_id: int, timeout: float = 60.0) -> Optional[Dict[str, Any]]:
+        """작업 완료(done/failed)까지 대기 후 상태 반환"""
+        deadline = time.time() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job['status'] in ('done', 'failed') or time.time() >= deadline:
+                return job
+            time.sleep(0.2)
+    
+    def retry_failed(self) -> int:
+        """실패한 작업을 다시 대기열에 등록"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE upload_jobs SET status = 'queued', attempts = 0, next_attempt_at = 0 WHERE status = 'failed'")
+            count = cursor.rowcount
+            conn.commit()
+        if count:
+            self.start()
+            with self._wakeup:
+                self._wakeup.notify_all()
+        return count
+    
+    def get_queue_stats(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('SELECT status, COUNT(*) FROM upload_jobs GROUP BY status').fetchall()
+        stats = {'queued': 0, 'uploading': 0, 'done': 0, 'failed': 0}
+        stats.update(dict(rows))
+        return stats
+
+
+_upload_queue = None
+_upload_queue_lock = threading.Lock()
+
+def get_blob_upload_queue() -> BlobUploadQueue:
+    """프로세스 공용 업로드 큐 (최초 호출 시 생성 및 워커 시작)"""
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            _upload_queue = BlobUploadQueue()
+            _upload_queue.start()
+        return _upload_queue
@@ -1,85 +1,72 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import numpy as np
 import os
-import urllib.request
-import platform
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 import re
+from utils.font_utils import resolve_korean_font
 
-def setup_korean_font():
-    """한글 폰트 설정 함수 - 개선된 버전"""
-    try:
-        # matplotlib 기본 설정
-        plt.rcParams['axes.unicode_minus'] = False
-        
-        # 시스템별 폰트 경로 시도
-        system = platform.system()
-        
-        # 기본 폰트들 시도
-        fallback_fonts = ['DejaVu Sans', 'Arial', 'sans-serif']
-        
-        if system == 'Windows':
-            font_candidates = [
-                'Malgun Gothic', 'Microsoft YaHei', 'SimHei',
-                'C:/Windows/Fonts/malgun.ttf',
-                'C:/Windows/Fonts/gulim.ttc'
-            ]
-        elif system == 'Darwin':  # macOS
-            font_candidates = [
-                'AppleGothic', 'Helvetica', 'Arial Unicode MS',
-                '/System/Library/Fonts/AppleGothic.ttf'
-            ]
-        else:  # Linux and others
-            font_candidates = [
-                'NanumGothic', 'DejaVu Sans', 'Liberation Sans',
-                '/usr/share/fonts/truetype/nanum/NanumGothic.ttf'
-            ]
-        
-        # 폰트 설정 시도
-        for font in font_candidates:
-            try:
-                if font.endswith(('.ttf', '.ttc', '.otf')):
-                    # 파일 경로인 경우
-                    if os.path.exists(font):
-                        fm.fontManager.addfont(font)
-                        prop = fm.FontProperties(fname=font)
-                        plt.rcParams['font.family'] = prop.get_name()
-                        print(f"폰트 설정 성공: {prop.get_name()}")
-                        return prop.get_name()
-                else:
-                    # 폰트 이름인 경우
-                    plt.rcParams['font.family'] = font
-                    # 테스트 차트로 확인
-                    fig, ax = plt.subplots(figsize=(1, 1))
-                    ax.text(0.5, 0.5, '테스트', fontsize=10)
-                    plt.close(fig)
-                    print(f"폰트 설정 성공: {font}")
-                    return font
-            except Exception as e:
-                continue
-        
-        # 모든 폰트 설정 실패시 기본 폰트 사용
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        print("기본 폰트 사용: DejaVu Sans")
-        return 'DejaVu Sans'
-        
-    except Exception as e:
-        print(f"폰트 설정 중 오류: {e}")
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['axes.unicode_minus'] = False
-        return 'DejaVu Sans'
+CHART_RENDER_CACHE_SIZE = int(os.getenv("CHART_RENDER_CACHE_SIZE", "128"))
+
+class ChartRenderCache:
+    """렌더링된 차트 이미지(PNG/SVG 바이트) LRU 캐시
+    
+    - 키: (차트 유형, 정렬된 데이터, 제목, 크기, DPI, 폰트, 이미지 형식)의 해시
+    - 같은 통계 차트를 다시 요청하거나 화면이 재실행되면 matplotlib 없이 바로 반환
+    """
+    
+    def __init__(self, max_entries: int = CHART_RENDER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(chart_type, chart_data, title, figsize, dpi, font_name, image_format):
+        payload = json.dumps([str(chart_type), sorted(chart_data.items()), str(title),
+                              list(figsize), dpi, font_name, image_format], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+    
+    def put(self, key, image):
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'bytes': sum(len(image) for image in self._entries.values())}
+
+# 프로세스 전역 차트 렌더 캐시 (세션 간 공유)
+_chart_render_cache = ChartRenderCache()
+
+def get_chart_render_cache():
+    return _chart_render_cache
 
 class ChartManager:
     """차트 생성 및 관리 클래스 - 통계-차트 일치성 보장"""
     
     def __init__(self):
         """ChartManager 초기화 - 안정성 강화"""
-        # 폰트 설정
-        self.font_name = setup_korean_font()
-        
         # 색상 팔레트
         self.colors = ['#4CAF50', '#2196F3', '#FF9800', '#F44336', '#9C27B0', 
                     '#00BCD4', '#FFEB3B', '#795548', '#607D8B', '#E91E63']
@@ -104,19 +91,9 @@ class ChartManager:
         except Exception as e:
             print(f"matplotlib 설정 중 오류: {e}")
         
-        # 폰트 테스트
-        self._test_korean_font()
-        
-    def _test_korean_font(self):
-        """한글 폰트 정상 작동 테스트"""
-        try:
-            fig, ax = plt.subplots(figsize=(1, 1))
-            ax.text(0.5, 0.5, '한글테스트', fontsize=10, ha='center')
-            plt.close(fig)
-            print(f"한글 폰트 테스트 성공: {self.font_name}")
-        except Exception as e:
-            print(f"한글 폰트 테스트 실패: {e}")
-            self.font_name = setup_korean_font()
+        # 폰트 설정 (스타일 초기화 이후 적용, 폰트 탐색은 프로세스당 한 번)
+        self.font_name = resolve_korean_font()
+        self.render_cache = get_chart_render_cache()
 
     def _sort_chart_data(self, data, title=""):
         """차트 데이터 정렬 - 년도는 시간순, 나머지는 값 순서로"""
@@ -219,10 +196,10 @@ class ChartManager:
         """차트 생성 - 안정성 강화 및 정렬 기능 추가"""
         print(f"DEBUG: Creating chart - type: {chart_type}, data: {chart_data}")
         
-        # 폰트 재설정 (안전장치)
+        # 폰트 재설정 (안전장치 - 다른 화면에서 rcParams가 초기화된 경우)
         try:
             if not plt.rcParams.get('font.family') or plt.rcParams.get('font.family') == ['sans-serif']:
-                self.font_name = setup_korean_font()
+                self.font_name = resolve_korean_font()
         except Exception as e:
             print(f"DEBUG: Font setup warning: {e}")
             pass
@@ -276,6 +253,38 @@ class ChartManager:
             # 실패시 기본 차트 시도
             return self._create_simple_chart(sorted_data, title)
     
+    def render_chart(self, chart_type, chart_data, title="장애 통계", image_format='png'):
+        """차트를 이미지 바이트로 렌더링 (같은 차트는 렌더 캐시에서 반환)
+        
+        Returns:
+            bytes: PNG/SVG 이미지 (렌더링 실패 시 None)
+        """
+        if isinstance(chart_data, dict):
+            key_data = {str(k): v for k, v in chart_data.items()}
+        else:
+            key_data = {}
+        size = self.pie_figsize if str(chart_type).lower().strip() == 'pie' else self.default_figsize
+        cache_key = self.render_cache.make_key(chart_type, key_data, title, size, self.dpi,
+                                               self.font_name, image_format)
+        
+        image = self.render_cache.get(cache_key)
+        if image is not None:
+            print(f"DEBUG: Chart render cache hit - type: {chart_type}")
+            return image
+        
+        fig = self.create_chart(chart_type, chart_data, title)
+        if fig is None:
+            return None
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=image_format, dpi=self.dpi, bbox_inches='tight')
+            image = buffer.getvalue()
+        finally:
+            plt.close(fig)
+        
+        self.render_cache.put(cache_key, image)
+        return image
+    
     def _get_chart_unit(self, title, values):
         """차트 단위 결정"""
         is_time = '시간' in title or any(v > 100 for v in values if isinstance(v, (int, float)))
@@ -593,16 +602,21 @@ class ChartManager:
             try:
                 col_chart = st.columns([0.15, 0.7, 0.15])
                 with col_chart[1]:
-                    st.pyplot(chart, use_container_width=False, clear_figure=True)
+                    if isinstance(chart, (bytes, bytearray)):
+                        # 렌더 캐시에서 받은 이미지는 matplotlib 없이 표시
+                        st.image(chart)
+                    else:
+                        st.pyplot(chart, use_container_width=False, clear_figure=True)
                 print("DEBUG: Chart displayed successfully")
             except Exception as e:
                 print(f"DEBUG: Failed to display chart: {e}")
                 st.error(f"차트 표시 중 오류가 발생했습니다: {str(e)}")
             finally:
-                try:
-                    plt.close(chart)
-                except:
-                    pass
+                if not isinstance(chart, (bytes, bytearray)):
+                    try:
+                        plt.close(chart)
+                    except:
+                        pass
         else:
             st.warning("차트를 생성할 수 없습니다.")
         
@@ -1,10 +1,152 @@
 import json
 import re
 import datetime
+import hashlib
 import os
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Any
 import streamlit as st
 
+TERM_SYNONYMS = {
+    '누락': ['빠짐', '없음', '미포함'],
+    '중단': ['정지', '중지', '종료'],
+    '실패': ['오류', '에러', '장애'],
+    '서버': ['시스템', '호스트'],
+    '데이터베이스': ['DB', '디비'],
+    '네트워크': ['망', '통신'],
+    '로그인': ['접속', '인증'],
+    '가입': ['등록', '신청'],
+    '결제': ['구매', '주문'],
+    '발송': ['전송', '송신']
+}
+
+ENGLISH_TERM_PATTERN = re.compile(r'\b[A-Z][A-Za-z]{2,}\b')
+KOREAN_TERM_PATTERN = re.compile(r'[가-힣]{3,}')
+KOREAN_PARTICLE_PATTERN = re.compile(r'^[가-힣]{1,2}(이|가|을|를|의|에|서|로|으로|에서|부터|까지)$')
+NUMERIC_TERM_PATTERN = re.compile(r'\d+[가-힣A-Za-z%]+')
+
+CRITICAL_TERM_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'.*(?:서버|시스템|서비스|데이터베이스|네트워크|API|헤더|로직).*',
+        r'.*(?:누락|중단|실패|오류|에러|장애).*',
+        r'[A-Z]{2,}',
+        r'\d+(?:MB|GB|분|%)',
+        r'.*(?:설정|구성|적용|프로세스).*'
+    ]
+]
+
+# 문서 묶음별 컴파일된 용어 색인 캐시 크기
+TERM_INDEX_CACHE_SIZE = 64
+
+class TermAutomaton:
+    """여러 용어를 한 번에 찾는 Aho-Corasick 오토마톤 (대소문자 무시)
+    
+    patterns: {검색 문자열: [용어 id, ...]} - 용어 자신과 동의어를 같은 용어 id로 등록
+    """
+    
+    def __init__(self, patterns: Dict[str, List[int]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        outputs = [set()]
+        
+        for pattern, term_ids in patterns.items():
+            state = 0
+            for ch in pattern.lower():
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].update(term_ids)
+        
+        # 실패 링크 계산 (BFS), 출력은 실패 링크를 따라 병합
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and ch not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                outputs[next_state] |= outputs[self.fail[next_state]]
+        self.output = [frozenset(term_ids) for term_ids in outputs]
+    
+    def scanner(self) -> 'TermScanner':
+        return TermScanner(self)
+
+class TermScanner:
+    """오토마톤 상태를 유지하며 스트리밍 텍스트를 조각 단위로 스캔 (조각 경계에 걸친 용어도 인식)"""
+    
+    def __init__(self, automaton: TermAutomaton):
+        self.automaton = automaton
+        self.state = 0
+        self.found = set()
+    
+    def feed(self, text: str):
+        goto, fail, output = self.automaton.goto, self.automaton.fail, self.automaton.output
+        state, found = self.state, self.found
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        self.state = state
+
+class DocumentTermIndex:
+    """문서 묶음에서 추출한 검증 대상 용어와 오토마톤 (문서 묶음당 한 번 컴파일)"""
+    
+    def __init__(self, monitor: 'DataIntegrityMonitor', documents: List[Dict]):
+        self.document_count = len(documents)
+        self.terms: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        
+        # (문서 인덱스, 필드, 장애 ID, 원문 길이, 용어 id 목록)
+        self.field_checks: List[Tuple[int, str, str, int, List[int]]] = []
+        retention_ids = set()
+        critical_ids = set()
+        
+        for doc_index, doc in enumerate(documents[:3]):
+            for field in monitor.critical_fields:
+                value = doc.get(field, '')
+                if not value:
+                    continue
+                term_ids = [self._add_term(term) for term in monitor._extract_technical_terms(value)]
+                retention_ids.update(term_ids)
+                
+                if field in ('root_cause', 'incident_repair'):
+                    critical_ids.update(term_id for term_id in term_ids
+                                        if monitor._is_critical_technical_term(self.terms[term_id]))
+                
+                original_value = value.strip()
+                if len(original_value) >= 10 and term_ids:
+                    self.field_checks.append((doc_index, field, doc.get('incident_id', ''), len(original_value), term_ids))
+        
+        self.retention_ids = sorted(retention_ids)
+        self.critical_ids = sorted(critical_ids)
+        
+        patterns: Dict[str, List[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            for candidate in [term] + monitor._get_term_synonyms(term):
+                patterns.setdefault(candidate.lower(), []).append(term_id)
+        self.automaton = TermAutomaton(patterns)
+    
+    def _add_term(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._term_ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
 class DataIntegrityMonitor:
     """RAG 데이터 무결성 실시간 모니터링 시스템"""
     
@@ -13,6 +155,12 @@ class DataIntegrityMonitor:
         self.violation_logs = []
         self.critical_fields = ['root_cause', 'incident_repair', 'incident_plan', 'symptom', 'effect']
         self.technical_patterns = self._initialize_technical_patterns()
+        self._compiled_patterns = [
+            re.compile(pattern, re.IGNORECASE)
+            for patterns in self.technical_patterns.values() for pattern in patterns
+        ]
+        self._term_index_cache = OrderedDict()
+        self._term_index_lock = threading.Lock()
         self.violation_count = {'high': 0, 'medium': 0, 'low': 0}
         
         if self.config and self.config.save_violation_logs:
@@ -45,18 +193,52 @@ class DataIntegrityMonitor:
             ]
         }
     
+    def get_term_index(self, original_documents: List[Dict]) -> DocumentTermIndex:
+        """문서 묶음의 용어 색인 (같은 문서 묶음이면 캐시된 오토마톤 재사용)
+        
+        색인 용어는 앞 3개 문서에서만 추출하지만 document_count는 전체 문서 수이므로 키는 전체 문서 기준
+        """
+        key_source = json.dumps([len(original_documents)] + [
+            [doc.get('incident_id', '')] + [doc.get(field, '') or '' for field in self.critical_fields]
+            for doc in original_documents
+        ], ensure_ascii=False, default=str)
+        cache_key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+        
+        with self._term_index_lock:
+            index = self._term_index_cache.get(cache_key)
+            if index is not None:
+                self._term_index_cache.move_to_end(cache_key)
+        
+        if index is None:
+            index = DocumentTermIndex(self, original_documents)
+            with self._term_index_lock:
+                self._term_index_cache[cache_key] = index
+                while len(self._term_index_cache) > TERM_INDEX_CACHE_SIZE:
+                    self._term_index_cache.popitem(last=False)
+        return index
+    
     def validate_llm_output(self, original_documents: List[Dict], llm_output: str) -> Dict[str, Any]:
         if not original_documents or not llm_output:
             return {'is_valid': True, 'violations': [], 'warning_count': 0}
         
+        index = self.get_term_index(original_documents)
+        scanner = index.automaton.scanner()
+        scanner.feed(llm_output)
+        return self._build_validation_result(index, scanner.found, True)
+    
+    def _build_validation_result(self, index: DocumentTermIndex, found_ids: set, has_output: bool) -> Dict[str, Any]:
+        """출력 스캔에서 찾은 용어 id 집합으로 필드/글로벌 검증 결과 생성"""
+        if not index.document_count or not has_output:
+            return {'is_valid': True, 'violations': [], 'warning_count': 0}
+        
         all_violations = []
         
-        for idx, doc in enumerate(original_documents[:3]):
-            doc_violations = self._validate_document_fields(doc, llm_output, idx)
-            all_violations.extend(doc_violations)
+        for doc_index, field, incident_id, original_length, term_ids in index.field_checks:
+            violation = self._check_field_preservation(field, original_length, index, term_ids, found_ids, doc_index, incident_id)
+            if violation:
+                all_violations.append(violation)
         
-        global_violations = self._validate_global_technical_terms(original_documents, llm_output)
-        all_violations.extend(global_violations)
+        all_violations.extend(self._validate_global_technical_terms(index, found_ids))
         
         high_violations = [v for v in all_violations if v['severity'] == 'HIGH']
         medium_violations = [v for v in all_violations if v['severity'] == 'MEDIUM']
@@ -74,8 +256,8 @@ class DataIntegrityMonitor:
                 'low': len(low_violations)
             },
             'critical_field_violations': len([v for v in all_violations if v.get('field') in ['root_cause', 'incident_repair']]),
-            'technical_term_retention_rate': self._calculate_technical_term_retention(original_documents, llm_output),
-            'overall_score': self._calculate_integrity_score(all_violations, len(original_documents))
+            'technical_term_retention_rate': self._calculate_technical_term_retention(index, found_ids),
+            'overall_score': self._calculate_integrity_score(all_violations, index.document_count)
         }
         
         if all_violations and self.config and self.config.log_integrity_violations:
@@ -83,33 +265,11 @@ class DataIntegrityMonitor:
         
         return validation_result
     
-    def _validate_document_fields(self, doc: Dict, llm_output: str, doc_index: int) -> List[Dict]:
-        violations = []
-        
-        for field in self.critical_fields:
-            original_value = doc.get(field, '').strip()
-            if not original_value or len(original_value) < 10:
-                continue
-            
-            violation = self._check_field_preservation(field, original_value, llm_output, doc_index, doc.get('incident_id', ''))
-            if violation:
-                violations.append(violation)
-        
-        return violations
-    
-    def _check_field_preservation(self, field_name: str, original_value: str, llm_output: str, doc_index: int, incident_id: str) -> Dict:
-        tech_terms = self._extract_technical_terms(original_value)
-        if not tech_terms:
-            return None
-        
-        preserved_terms = []
-        missing_terms = []
-        
-        for term in tech_terms:
-            if self._is_term_preserved_in_output(term, llm_output):
-                preserved_terms.append(term)
-            else:
-                missing_terms.append(term)
+    def _check_field_preservation(self, field_name: str, original_length: int, index: DocumentTermIndex,
+                                  term_ids: List[int], found_ids: set, doc_index: int, incident_id: str) -> Dict:
+        tech_terms = [index.terms[term_id] for term_id in term_ids]
+        preserved_terms = [index.terms[term_id] for term_id in term_ids if term_id in found_ids]
+        missing_terms = [index.terms[term_id] for term_id in term_ids if term_id not in found_ids]
         
         preservation_rate = len(preserved_terms) / len(tech_terms) if tech_terms else 1.0
         
@@ -139,7 +299,7 @@ class DataIntegrityMonitor:
             'incident_id': incident_id,
             'severity': severity,
             'preservation_rate': preservation_rate,
-            'original_length': len(original_value),
+            'original_length': original_length,
             'missing_terms': missing_terms,
             'preserved_terms': preserved_terms,
             'total_terms': len(tech_terms),
@@ -150,86 +310,37 @@ class DataIntegrityMonitor:
         if not text:
             return []
         
-        terms = set()
+        terms = {}
         
-        for category, patterns in self.technical_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    if isinstance(match, str) and len(match.strip()) >= 2:
-                        terms.add(match.strip())
+        for pattern in self._compiled_patterns:
+            for match in pattern.findall(text):
+                if isinstance(match, str) and len(match.strip()) >= 2:
+                    terms[match.strip()] = None
         
-        english_terms = re.findall(r'\b[A-Z][A-Za-z]{2,}\b', text)
-        terms.update([term for term in english_terms if len(term) >= 3])
+        for term in ENGLISH_TERM_PATTERN.findall(text):
+            terms[term] = None
         
-        korean_terms = re.findall(r'[가-힣]{3,}', text)
-        terms.update([term for term in korean_terms if len(term) >= 3 and not re.match(r'^[가-힣]{1,2}(이|가|을|를|의|에|서|로|으로|에서|부터|까지)$', term)])
+        for term in KOREAN_TERM_PATTERN.findall(text):
+            if not KOREAN_PARTICLE_PATTERN.match(term):
+                terms[term] = None
         
-        numeric_terms = re.findall(r'\d+[가-힣A-Za-z%]+', text)
-        terms.update(numeric_terms)
+        for term in NUMERIC_TERM_PATTERN.findall(text):
+            terms[term] = None
         
         return list(terms)[:15]
     
-    def _is_term_preserved_in_output(self, term: str, llm_output: str) -> bool:
-        if not term or not llm_output:
-            return False
-        
-        if term in llm_output:
-            return True
-        
-        if term.lower() in llm_output.lower():
-            return True
-        
-        if len(term) >= 3:
-            if re.search(re.escape(term), llm_output, re.IGNORECASE):
-                return True
-        
-        synonyms = self._get_term_synonyms(term)
-        for synonym in synonyms:
-            if synonym in llm_output:
-                return True
-        
-        return False
-    
     def _get_term_synonyms(self, term: str) -> List[str]:
-        synonym_map = {
-            '누락': ['빠짐', '없음', '미포함'],
-            '중단': ['정지', '중지', '종료'],
-            '실패': ['오류', '에러', '장애'],
-            '서버': ['시스템', '호스트'],
-            '데이터베이스': ['DB', '디비'],
-            '네트워크': ['망', '통신'],
-            '로그인': ['접속', '인증'],
-            '가입': ['등록', '신청'],
-            '결제': ['구매', '주문'],
-            '발송': ['전송', '송신']
-        }
-        
-        return synonym_map.get(term.lower(), [])
+        return TERM_SYNONYMS.get(term.lower(), [])
     
-    def _validate_global_technical_terms(self, documents: List[Dict], llm_output: str) -> List[Dict]:
+    def _validate_global_technical_terms(self, index: DocumentTermIndex, found_ids: set) -> List[Dict]:
         violations = []
         
-        all_critical_terms = set()
-        for doc in documents[:3]:
-            for field in ['root_cause', 'incident_repair']:
-                value = doc.get(field, '')
-                if value:
-                    terms = self._extract_technical_terms(value)
-                    critical_terms = [t for t in terms if self._is_critical_technical_term(t)]
-                    all_critical_terms.update(critical_terms)
-        
+        all_critical_terms = index.critical_ids
         if not all_critical_terms:
             return violations
         
-        preserved_critical_terms = []
-        missing_critical_terms = []
-        
-        for term in all_critical_terms:
-            if self._is_term_preserved_in_output(term, llm_output):
-                preserved_critical_terms.append(term)
-            else:
-                missing_critical_terms.append(term)
+        preserved_critical_terms = [index.terms[term_id] for term_id in all_critical_terms if term_id in found_ids]
+        missing_critical_terms = [index.terms[term_id] for term_id in all_critical_terms if term_id not in found_ids]
         
         global_preservation_rate = len(preserved_critical_terms) / len(all_critical_terms)
         
@@ -257,31 +368,14 @@ class DataIntegrityMonitor:
         return violations
     
     def _is_critical_technical_term(self, term: str) -> bool:
-        critical_patterns = [
-            r'.*(?:서버|시스템|서비스|데이터베이스|네트워크|API|헤더|로직).*',
-            r'.*(?:누락|중단|실패|오류|에러|장애).*',
-            r'[A-Z]{2,}',
-            r'\d+(?:MB|GB|분|%)',
-            r'.*(?:설정|구성|적용|프로세스).*'
-        ]
-        
-        return any(re.match(pattern, term, re.IGNORECASE) for pattern in critical_patterns)
+        return any(pattern.match(term) for pattern in CRITICAL_TERM_PATTERNS)
     
-    def _calculate_technical_term_retention(self, documents: List[Dict], llm_output: str) -> float:
-        all_terms = set()
-        
-        for doc in documents[:3]:
-            for field in self.critical_fields:
-                value = doc.get(field, '')
-                if value:
-                    terms = self._extract_technical_terms(value)
-                    all_terms.update(terms)
-        
-        if not all_terms:
+    def _calculate_technical_term_retention(self, index: DocumentTermIndex, found_ids: set) -> float:
+        if not index.retention_ids:
             return 1.0
         
-        preserved_count = sum(1 for term in all_terms if self._is_term_preserved_in_output(term, llm_output))
-        return preserved_count / len(all_terms)
+        preserved_count = sum(1 for term_id in index.retention_ids if term_id in found_ids)
+        return preserved_count / len(index.retention_ids)
     
     def _calculate_integrity_score(self, violations: List[Dict], document_count: int) -> float:
         if not violations:
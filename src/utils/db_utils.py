@@ -34,6 +34,26 @@ def get_monitoring_db_path():
     base_path = get_base_db_path()
     return os.path.join(base_path, 'monitoring.db')
 
+def get_answer_cache_db_path():
+    """답변 캐시 DB 경로 가져오기"""
+    base_path = get_base_db_path()
+    return os.path.join(base_path, 'answer_cache.db')
+
+def get_summary_checkpoint_db_path():
+    """요약 배치 체크포인트 DB 경로 가져오기"""
+    base_path = get_base_db_path()
+    return os.path.join(base_path, 'summary_checkpoint.db')
+
+def get_blob_upload_queue_db_path():
+    """Blob 업로드 대기열 DB 경로 가져오기"""
+    base_path = get_base_db_path()
+    return os.path.join(base_path, 'blob_upload_queue.db')
+
+def get_serpapi_cache_db_path():
+    """SerpApi 검색 캐시 DB 경로 가져오기"""
+    base_path = get_base_db_path()
+    return os.path.join(base_path, 'serpapi_cache.db')
+
 def ensure_db_directory():
     """DB 디렉토리 생성 (존재하지 않는 경우)"""
     base_path = get_base_db_path()
@@ -48,5 +68,9 @@ def get_all_db_paths():
         'eml_reports': get_eml_reports_db_path(),
         'incident_data': get_incident_db_path(),
         'reprompting_questions': get_reprompting_db_path(),
-        'monitoring': get_monitoring_db_path()
+        'monitoring': get_monitoring_db_path(),
+        'answer_cache': get_answer_cache_db_path(),
+        'summary_checkpoint': get_summary_checkpoint_db_path(),
+        'blob_upload_queue': get_blob_upload_queue_db_path(),
+        'serpapi_cache': get_serpapi_cache_db_path()
     }
\ No newline at end of file
@@ -0,0 +1,159 @@
+# utils/docx_template_engine.py - 컴파일된 DOCX 보고서 템플릿
+import hashlib
+import io
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from docx import Document
+
+# 템플릿 플레이스홀더 형식: (#이름)
+PLACEHOLDER_PATTERN = re.compile(r'\(#[^()]*\)')
+
+# 조치 경과 표 헤더 키워드 (2개 이상 매칭 시 조치 경과 표로 판단)
+PROGRESS_KEYWORDS = ["일시", "시간", "작업", "내용", "현상", "비고", "경과"]
+
+class CompiledDocxTemplate:
+    """한 번 분석한 DOCX 템플릿
+    
+    - 플레이스홀더가 있는 문단/표 셀 위치, 내용이 있는 문단 위치, 조치 경과 표 위치를 미리 색인
+    - 채우기는 색인된 위치만 한 번씩 방문하여 모든 필드를 동시에 치환
+    - 문서 복제는 메모리에 보관한 템플릿 바이트에서 바로 로드 (디스크 I/O, deepcopy 없음)
+    """
+    
+    def __init__(self, template_bytes: bytes):
+        self.template_bytes = template_bytes
+        self.template_hash = hashlib.sha256(template_bytes).hexdigest()
+        
+        doc = Document(io.BytesIO(template_bytes))
+        
+        # 본문 문단: (문단 인덱스, 포함된 플레이스홀더 목록)
+        self.paragraph_slots: List[Tuple[int, List[str]]] = []
+        # 내용이 있는 본문 문단 인덱스 (제목/소속 입력 위치 계산용)
+        self.content_paragraph_indices: List[int] = []
+        for index, paragraph in enumerate(doc.paragraphs):
+            text = paragraph.text
+            if text.strip():
+                self.content_paragraph_indices.append(index)
+            placeholders = self._find_placeholders(text)
+            if placeholders:
+                self.paragraph_slots.append((index, placeholders))
+        self.paragraph_count = len(doc.paragraphs)
+        
+        # 표 셀: ((표, 행, 열), 포함된 플레이스홀더 목록) - 병합 셀은 한 번만
+        self.cell_slots: List[Tuple[Tuple[int, int, int], List[str]]] = []
+        for table_idx, table in enumerate(doc.tables):
+            # id()가 아닌 요소 자체를 보관 (lxml 프록시는 해제 후 id가 재사용됨)
+            seen_cells = set()
+            for row_idx, row in enumerate(table.rows):
+                for col_idx, cell in enumerate(row.cells):
+                    if cell._tc in seen_cells:
+                        continue
+                    seen_cells.add(cell._tc)
+                    placeholders = self._find_placeholders(cell.text)
+                    if placeholders:
+                        self.cell_slots.append(((table_idx, row_idx, col_idx), placeholders))
+        
+        self.action_table_index, self.action_table_reason = self._locate_action_table(doc)
+    
+    @staticmethod
+    def _find_placeholders(text: str) -> List[str]:
+        if '(#' not in text:
+            return []
+        return list(dict.fromkeys(PLACEHOLDER_PATTERN.findall(text)))
+    
+    @staticmethod
+    def _locate_action_table(doc) -> Tuple[Optional[int], str]:
+        """조치 경과 표 위치 (헤더 키워드 → '조치 경과/결과' 셀 순으로 탐색)"""
+        for table_idx, table in enumerate(doc.tables):
+            if len(table.rows) > 0:
+                header_text = " ".join([cell.text.strip() for cell in table.rows[0].cells])
+                matched_count = sum(1 for keyword in PROGRESS_KEYWORDS if keyword in header_text)
+                if matched_count >= 2:
+                    return table_idx, f"헤더: {header_text}"
+        
+        for table_idx, table in enumerate(doc.tables):
+            for row in table.rows:
+                for cell in row.cells:
+                    if "조치" in cell.text and ("경과" in cell.text or "결과" in cell.text):
+                        return table_idx, "키워드 매칭"
+        
+        return None, ""
+    
+    def new_document(self):
+        """채우기용 새 문서 (캐시된 템플릿 바이트에서 로드)"""
+        return Document(io.BytesIO(self.template_bytes))
+    
+    def replace_placeholders(self, doc, replacements: Dict[str, str]) -> Dict[str, int]:
+        """색인된 위치에서 모든 플레이스홀더를 한 번에 치환
+        
+        Returns:
+            dict: 플레이스홀더별 치환된 문단/셀 수
+        """
+        counts = {placeholder: 0 for placeholder in replacements}
+        
+        if self.paragraph_slots:
+            paragraphs = doc.paragraphs
+            for index, placeholders in self.paragraph_slots:
+                targets = [p for p in placeholders if p in replacements]
+                if targets:
+                    paragraph = paragraphs[index]
+                    paragraph.text = self._substitute(paragraph.text, targets, replacements, counts)
+        
+        tables = doc.tables if self.cell_slots else []
+        for (table_idx, row_idx, col_idx), placeholders in self.cell_slots:
+            targets = [p for p in placeholders if p in replacements]
+            if targets:
+                cell = tables[table_idx].rows[row_idx].cells[col_idx]
+                cell.text = self._substitute(cell.text, targets, replacements, counts)
+        
+        return counts
+    
+    @staticmethod
+    def _substitute(text: str, targets: List[str], replacements: Dict[str, str], counts: Dict[str, int]) -> str:
+        for placeholder in targets:
+            if placeholder in text:
+                text = text.replace(placeholder, replacements[placeholder])
+                counts[placeholder] += 1
+        return text
+    
+    def get_action_table(self, doc):
+        """조치 경과 표 (없으면 None)"""
+        if self.action_table_index is None:
+            return None
+        return doc.tables[self.action_table_index]
+    
+    def get_content_paragraph_indices(self, title_filled: bool) -> List[int]:
+        """내용이 있는 문단 인덱스 (첫 문단에 제목을 채운 경우 반영)"""
+        indices = self.content_paragraph_indices
+        if title_filled and self.paragraph_count > 0 and (not indices or indices[0] != 0):
+            return [0] + indices
+        return indices
+
+
+_template_cache: Dict[str, Tuple[Tuple[int, int], CompiledDocxTemplate]] = {}
+_templates_by_hash: Dict[str, CompiledDocxTemplate] = {}
+_template_cache_lock = threading.Lock()
+
+def get_compiled_template(template_path: str) -> CompiledDocxTemplate:
+    """템플릿 경로의 컴파일된 템플릿 (파일이 바뀌지 않으면 재사용, 같은 내용이면 해시로 공유)"""
+    stat = os.stat(template_path)
+    file_key = (stat.st_mtime_ns, stat.st_size)
+    
+    with _template_cache_lock:
+        cached = _template_cache.get(template_path)
+        if cached and cached[0] == file_key:
+            return cached[1]
+        
+        with open(template_path, 'rb') as f:
+            template_bytes = f.read()
+        template_hash = hashlib.sha256(template_bytes).hexdigest()
+        
+        compiled = _templates_by_hash.get(template_hash)
+        if compiled is None:
+            compiled = CompiledDocxTemplate(template_bytes)
+            _templates_by_hash[template_hash] = compiled
+            print(f"[DOCX_TEMPLATE] 템플릿 컴파일: {template_path} ({template_hash[:12]})")
+        
+        _template_cache[template_path] = (file_key, compiled)
+        return compiled
@@ -4,6 +4,22 @@ import streamlit as st
 import re
 from io import BytesIO
 from datetime import datetime
+from utils.response_renderer import find_markdown_table_lines, parse_markdown_table
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+EXCEL_SHEET_NAME = '장애내역'
+EXCEL_DATE_WIDTH = 10  # yyyy-mm-dd
+
+# 셀 수(행 × 컬럼)가 이 값을 넘으면 엑셀 대신 CSV로 다운로드
+EXCEL_CSV_THRESHOLD_CELLS = 200000
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIME = "text/csv"
 
 class ExcelDownloadManager:
     """엑셀 다운로드 관리 클래스"""
@@ -14,37 +30,8 @@ class ExcelDownloadManager:
     def extract_table_from_response(self, response_text):
         """응답 텍스트에서 표 데이터 추출 - 개선된 버전"""
         try:
-            # 마크다운 표 패턴 찾기 (더 유연한 패턴)
-            table_pattern = r'\|([^|]+\|)*[^|]+\|'
-            
-            lines = response_text.split('\n')
-            table_lines = []
-            in_table = False
-            
-            print(f"DEBUG: 전체 라인 수: {len(lines)}")  # 디버그 로그
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
-                
-                # 표 시작 감지 - 더 관대한 조건
-                if '|' in line and len(line.split('|')) >= 3:
-                    # 구분선(---|---|---) 스킵
-                    if re.match(r'\|[\s\-:]+\|', line):
-                        print(f"DEBUG: 구분선 스킵: {line}")
-                        continue
-                        
-                    table_lines.append(line)
-                    in_table = True
-                    print(f"DEBUG: 표 라인 추가: {line}")
-                    
-                elif in_table and not line:
-                    # 빈 줄이 나오면 표 끝
-                    print(f"DEBUG: 빈 줄로 표 종료")
-                    break
-                elif in_table and '|' not in line:
-                    # 파이프가 없는 줄이 나오면 표 끝
-                    print(f"DEBUG: 파이프 없는 줄로 표 종료: {line}")
-                    break
+            # 첫 번째 마크다운 표 라인 찾기 (구분선 제외, 빈 줄/파이프 없는 줄에서 종료)
+            table_lines = find_markdown_table_lines(response_text.split('\n'))
             
             print(f"DEBUG: 추출된 표 라인 수: {len(table_lines)}")
             
@@ -53,38 +40,15 @@ class ExcelDownloadManager:
                 return self._extract_table_fallback(response_text)
             
             # 표 데이터 파싱
-            parsed_data = []
-            headers = None
-            
-            for i, line in enumerate(table_lines):
-                # 파이프로 분리하고 앞뒤 공백 제거
-                cells = [cell.strip() for cell in line.split('|') if cell.strip()]
-                
-                if not cells:
-                    continue
-                    
-                if i == 0:
-                    headers = cells
-                    print(f"DEBUG: 헤더 추출: {headers}")
-                else:
-                    if len(cells) >= len(headers) - 1:  # 약간의 오차 허용
-                        # 셀 수가 부족하면 빈 값으로 채움
-                        while len(cells) < len(headers):
-                            cells.append("")
-                        parsed_data.append(cells[:len(headers)])
-                        print(f"DEBUG: 데이터 행 추가: {cells[:len(headers)]}")
-            
-            if headers and parsed_data:
-                result = {'headers': headers, 'data': parsed_data}
-                print(f"DEBUG: 파싱 성공 - 헤더: {len(headers)}, 데이터: {len(parsed_data)}")
-                return result
-            
-            return None
+            result = parse_markdown_table(table_lines)
+            if result:
+                print(f"DEBUG: 파싱 성공 - 헤더: {len(result['headers'])}, 데이터: {len(result['data'])}")
+            return result
             
         except Exception as e:
             print(f"DEBUG: Table extraction error: {e}")
             return None
-
+    
     def _extract_table_fallback(self, response_text):
         """표 추출 실패 시 폴백 방법"""
         try:
@@ -156,11 +120,106 @@ class ExcelDownloadManager:
                 print(f"DEBUG: DataFrame creation error: {e}")
             return None
     
+    def _column_widths(self, df):
+        """컬럼 너비 계산 (헤더/값 문자열 길이의 최대값 + 2, 최대 50자) - 컬럼 단위 벡터 연산"""
+        widths = []
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                value_length = EXCEL_DATE_WIDTH if series.notna().any() else 0
+            else:
+                lengths = series.dropna().astype(str).str.len()
+                value_length = int(lengths.max()) if not lengths.empty else 0
+            widths.append(min(max(len(str(col)), value_length) + 2, 50))  # 최대 50자로 제한
+        return widths
+    
+    def _iter_rows(self, df):
+        """행 단위 값 순회 (NaN/NaT는 None, 날짜는 datetime으로 변환)"""
+        columns = []
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = [None if pd.isna(value) else value for value in series.dt.to_pydatetime()]
+            else:
+                values = series.astype(object).where(series.notna(), None).tolist()
+            columns.append(values)
+        return zip(*columns)
+    
+    def _write_xlsxwriter(self, df, output):
+        """xlsxwriter 상수 메모리 모드로 작성 (행 순서대로 기록, 스타일은 컬럼 단위 포맷)"""
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'in_memory': False})
+        worksheet = workbook.add_worksheet(EXCEL_SHEET_NAME)
+        
+        border = {'border': 1, 'valign': 'vcenter'}
+        header_format = workbook.add_format(dict(border, bold=True, font_color='#FFFFFF',
+                                                 bg_color='#366092', align='center'))
+        text_format = workbook.add_format(dict(border, align='left'))
+        date_format = workbook.add_format(dict(border, align='left', num_format='yyyy-mm-dd'))
+        
+        column_formats = [
+            date_format if pd.api.types.is_datetime64_any_dtype(df[col]) else text_format
+            for col in df.columns
+        ]
+        for col_num, width in enumerate(self._column_widths(df)):
+            worksheet.set_column(col_num, col_num, width, column_formats[col_num])
+        
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        for row_num, row in enumerate(self._iter_rows(df), 1):
+            for col_num, value in enumerate(row):
+                if value is None:
+                    worksheet.write_blank(row_num, col_num, None, column_formats[col_num])
+                else:
+                    worksheet.write(row_num, col_num, value, column_formats[col_num])
+        
+        workbook.close()
+    
+    def _write_openpyxl(self, df, output):
+        """openpyxl 쓰기 전용(write-only) 워크시트로 작성 (xlsxwriter가 없을 때)"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+        from openpyxl.utils import get_column_letter
+        
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(EXCEL_SHEET_NAME)
+        
+        thin = Side(style='thin')
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        center_alignment = Alignment(horizontal='center', vertical='center')
+        left_alignment = Alignment(horizontal='left', vertical='center')
+        
+        # 쓰기 전용 모드에서는 행을 추가하기 전에 컬럼 너비를 지정해야 함
+        for col_num, width in enumerate(self._column_widths(df), 1):
+            worksheet.column_dimensions[get_column_letter(col_num)].width = width
+        
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(worksheet, value=str(col))
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = border
+            cell.alignment = center_alignment
+            header.append(cell)
+        worksheet.append(header)
+        
+        for row in self._iter_rows(df):
+            cells = []
+            for value in row:
+                cell = WriteOnlyCell(worksheet, value=value)
+                cell.border = border
+                cell.alignment = left_alignment
+                cells.append(cell)
+            worksheet.append(cells)
+        
+        workbook.save(output)
+    
     def generate_excel_file(self, df, filename_prefix="장애내역"):
-        """DataFrame을 엑셀 파일로 변환"""
+        """DataFrame을 엑셀 파일로 변환 (스트리밍 작성)"""
         try:
             if df is None or df.empty:
-                return None
+                return None, None
             
             # 현재 시간을 파일명에 포함
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -168,53 +227,10 @@ class ExcelDownloadManager:
             
             # BytesIO 객체에 엑셀 파일 생성
             output = BytesIO()
-            
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='장애내역', index=False)
-                
-                # 워크시트 스타일 적용
-                worksheet = writer.sheets['장애내역']
-                
-                # 헤더 스타일 적용
-                from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-                
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                center_alignment = Alignment(horizontal='center', vertical='center')
-                
-                # 헤더 행에 스타일 적용
-                for col_num, column in enumerate(df.columns, 1):
-                    cell = worksheet.cell(row=1, column=col_num)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.border = border
-                    cell.alignment = center_alignment
-                
-                # 데이터 행에 테두리 적용
-                for row_num in range(2, len(df) + 2):
-                    for col_num in range(1, len(df.columns) + 1):
-                        cell = worksheet.cell(row=row_num, column=col_num)
-                        cell.border = border
-                        cell.alignment = Alignment(horizontal='left', vertical='center')
-                
-                # 컬럼 너비 자동 조정
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)  # 최대 50자로 제한
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            if XLSXWRITER_AVAILABLE:
+                self._write_xlsxwriter(df, output)
+            else:
+                self._write_openpyxl(df, output)
             
             excel_data = output.getvalue()
             return excel_data, filename
@@ -224,8 +240,36 @@ class ExcelDownloadManager:
                 print(f"DEBUG: Excel generation error: {e}")
             return None, None
     
-    def display_download_button(self, response_text, query_type="inquiry"):
-        """엑셀 다운로드 버튼 표시 - 개선된 버전"""
+    def generate_csv_file(self, df, filename_prefix="장애내역"):
+        """DataFrame을 CSV 파일로 변환 (대용량 결과용, 엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+        try:
+            if df is None or df.empty:
+                return None, None
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{filename_prefix}_{timestamp}.csv"
+            csv_data = df.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8-sig')
+            return csv_data, filename
+        
+        except Exception as e:
+            if self.debug_mode:
+                print(f"DEBUG: CSV generation error: {e}")
+            return None, None
+    
+    def generate_download_file(self, df, filename_prefix="장애내역"):
+        """결과 크기에 따라 엑셀 또는 CSV 파일 생성
+        
+        Returns:
+            tuple: (파일 데이터, 파일명, MIME 타입)
+        """
+        if df is not None and df.size > EXCEL_CSV_THRESHOLD_CELLS:
+            data, filename = self.generate_csv_file(df, filename_prefix)
+            return data, filename, CSV_MIME
+        data, filename = self.generate_excel_file(df, filename_prefix)
+        return data, filename, EXCEL_MIME
+    
+    def display_download_button(self, response_text, query_type="inquiry", table_data=None):
+        """엑셀 다운로드 버튼 표시 - 개선된 버전 (table_data: 응답 파싱 시 미리 추출한 표 데이터)"""
         try:
             print(f"DEBUG: 다운로드 버튼 표시 시작 - query_type: {query_type}")
             
@@ -234,8 +278,8 @@ class ExcelDownloadManager:
                 print(f"DEBUG: INQUIRY 타입이 아니므로 다운로드 버튼 표시하지 않음")
                 return False
             
-            # 응답에서 표 데이터 추출
-            table_data = self.extract_table_from_response(response_text)
+            # 응답에서 표 데이터 추출 (미리 추출된 표 데이터가 있으면 재사용)
+            table_data = table_data or self.extract_table_from_response(response_text)
             
             if not table_data:
                 print(f"DEBUG: 표 데이터를 찾을 수 없음")
@@ -258,14 +302,15 @@ class ExcelDownloadManager:
             
             print(f"DEBUG: DataFrame 생성 성공: {len(df)} 행")
             
-            # 엑셀 파일 생성
-            excel_data, filename = self.generate_excel_file(df)
+            # 엑셀 파일 생성 (대용량이면 CSV)
+            excel_data, filename, mime = self.generate_download_file(df)
             
             if excel_data is None:
                 print(f"DEBUG: 엑셀 파일 생성 실패")
                 return False
             
-            print(f"DEBUG: 엑셀 파일 생성 성공: {filename}")
+            is_csv = mime == CSV_MIME
+            print(f"DEBUG: {'CSV' if is_csv else '엑셀'} 파일 생성 성공: {filename}")
             
             # 다운로드 버튼 표시
             st.markdown("---")
@@ -275,15 +320,18 @@ class ExcelDownloadManager:
             
             with col1:
                 st.download_button(
-                    label="📥 엑셀 파일 다운로드",
+                    label="📥 CSV 파일 다운로드" if is_csv else "📥 엑셀 파일 다운로드",
                     data=excel_data,
                     file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    mime=mime,
                     help="표 형태의 장애 내역을 엑셀 파일로 다운로드합니다."
                 )
             
             with col2:
-                st.info(f"총 {len(df)}건의 장애 내역이 포함된 엑셀 파일을 다운로드할 수 있습니다.")
+                if is_csv:
+                    st.info(f"총 {len(df)}건으로 데이터가 많아 CSV 파일(엑셀에서 열기 가능)로 다운로드합니다.")
+                else:
+                    st.info(f"총 {len(df)}건의 장애 내역이 포함된 엑셀 파일을 다운로드할 수 있습니다.")
             
             # 미리보기 표시
             with st.expander("📋 다운로드될 데이터 미리보기"):
@@ -22,6 +22,9 @@ from enum import Enum
 from datetime import datetime
 import json
 
+from utils.incident_feature_store import get_incident_feature_store
+from utils.incident_record import IncidentRecord, document_year, document_month
+
 
 class QueryType(Enum):
     """쿼리 타입 정의"""
@@ -218,10 +221,13 @@ class DocumentNormalizer:
     @staticmethod
     def normalize_date_fields(doc):
         """날짜 관련 필드 정규화 - 챗봇 구조 맞춤"""
-        normalized_doc = doc.copy()
-        
+        return DocumentNormalizer._fill_date_fields(IncidentRecord(doc))
+    
+    @staticmethod
+    def _fill_date_fields(normalized_doc):
+        """날짜 관련 필드 정규화 (제자리 변경)"""
         # error_date 필드 처리
-        error_date = doc.get('error_date', '')
+        error_date = normalized_doc.get('error_date', '')
         if error_date:
             try:
                 error_date_str = str(error_date).strip()
@@ -272,8 +278,11 @@ class DocumentNormalizer:
     @staticmethod
     def normalize_string_fields(doc):
         """문자열 필드들 정규화"""
-        normalized_doc = doc.copy()
-        
+        return DocumentNormalizer._strip_string_fields(IncidentRecord(doc))
+    
+    @staticmethod
+    def _strip_string_fields(normalized_doc):
+        """문자열 필드들 정규화 (제자리 변경)"""
         string_fields = [
             'service_name', 'incident_grade', 'owner_depart', 
             'daynight', 'week', 'symptom', 'root_cause', 
@@ -292,13 +301,17 @@ class DocumentNormalizer:
     
     @classmethod
     def normalize_document(cls, doc):
-        """문서 전체 정규화"""
+        """문서 전체 정규화 (이미 정규화된 문서는 그대로 반환, 그 외에는 한 번만 복사)"""
         if doc is None:
             return None
         
-        normalized_doc = cls.normalize_date_fields(doc)
+        if doc.get('_normalized'):
+            return doc
+        
+        normalized_doc = IncidentRecord(doc)
+        cls._fill_date_fields(normalized_doc)
         normalized_doc['error_time'] = cls.normalize_error_time(doc.get('error_time'))
-        normalized_doc = cls.normalize_string_fields(normalized_doc)
+        cls._strip_string_fields(normalized_doc)
         
         # 정규화 메타데이터 추가
         normalized_doc['_normalized'] = True
@@ -755,81 +768,12 @@ class DocumentValidator:
     @staticmethod
     def _extract_year(doc: Dict[Any, Any]) -> Optional[str]:
         """문서에서 연도 추출"""
-        # year 필드 우선
-        year = doc.get('year')
-        if year:
-            year_str = str(year).strip()
-            if len(year_str) == 4 and year_str.isdigit():
-                return year_str
-        
-        # extracted_year 필드
-        year = doc.get('extracted_year')
-        if year:
-            year_str = str(year).strip()
-            if len(year_str) == 4 and year_str.isdigit():
-                return year_str
-        
-        # error_date에서 추출
-        error_date = doc.get('error_date', '')
-        if error_date:
-            error_date_str = str(error_date).strip()
-            if len(error_date_str) >= 4:
-                if '-' in error_date_str:
-                    parts = error_date_str.split('-')
-                    if len(parts) > 0 and len(parts[0]) == 4 and parts[0].isdigit():
-                        return parts[0]
-                elif len(error_date_str) >= 8 and error_date_str[:4].isdigit():
-                    return error_date_str[:4]
-                elif len(error_date_str) >= 4 and error_date_str[:4].isdigit():
-                    return error_date_str[:4]
-        
-        return None
+        return document_year(doc)
     
     @staticmethod
     def _extract_month(doc: Dict[Any, Any]) -> Optional[str]:
         """문서에서 월 추출"""
-        # month 필드 우선
-        month = doc.get('month')
-        if month:
-            try:
-                month_num = int(month)
-                if 1 <= month_num <= 12:
-                    return str(month_num)
-            except (ValueError, TypeError):
-                pass
-        
-        # extracted_month 필드
-        month = doc.get('extracted_month')
-        if month:
-            try:
-                month_num = int(month)
-                if 1 <= month_num <= 12:
-                    return str(month_num)
-            except (ValueError, TypeError):
-                pass
-        
-        # error_date에서 추출
-        error_date = doc.get('error_date', '')
-        if error_date:
-            error_date_str = str(error_date).strip()
-            if '-' in error_date_str:
-                parts = error_date_str.split('-')
-                if len(parts) >= 2 and parts[1].isdigit():
-                    try:
-                        month_num = int(parts[1])
-                        if 1 <= month_num <= 12:
-                            return str(month_num)
-                    except (ValueError, TypeError):
-                        pass
-            elif len(error_date_str) >= 6 and error_date_str.isdigit():
-                try:
-                    month_num = int(error_date_str[4:6])
-                    if 1 <= month_num <= 12:
-                        return str(month_num)
-                except (ValueError, TypeError):
-                    pass
-        
-        return None
+        return document_month(doc)
 
 
 class DocumentFilterManager:
@@ -1277,9 +1221,10 @@ class DocumentFilterManager:
         
         filtered_docs = []
         filter_stats = {'strong_filtered': 0, 'weak_filtered': 0, 'penalty_applied': 0}
+        feature_store = get_incident_feature_store()
         
         for doc in documents:
-            doc_text = f"{doc.get('symptom', '')} {doc.get('effect', '')} {doc.get('incident_repair', '')}".lower()
+            doc_text = feature_store.get_document_features(doc)['negative_text']
             
             # 강한 네거티브 키워드 체크 (완전 제외)
             strong_negative = any(keyword in doc_text for keyword in keywords['strong'])
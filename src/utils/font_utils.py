@@ -0,0 +1,121 @@
+# utils/font_utils.py - 한글 폰트 탐색 결과를 프로세스/디스크에 캐시
+import json
+import os
+import platform
+import threading
+from typing import List, Optional
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.font_manager as fm
+
+FONT_CACHE_PATH = os.getenv("FONT_CACHE_PATH", "./data/cache/korean_font.json")
+
+KOREAN_FONT_KEYWORDS = ['nanum', 'malgun', 'gothic', 'batang', 'gulim']
+DEFAULT_FONT = 'DejaVu Sans'
+
+_resolved_font = None  # (폰트 이름, 폰트 파일 경로)
+_font_lock = threading.Lock()
+
+def _system_font_paths() -> List[str]:
+    system = platform.system()
+    if system == 'Windows':
+        return ["C:/Windows/Fonts/malgun.ttf", "C:/Windows/Fonts/gulim.ttc", "C:/Windows/Fonts/batang.ttc"]
+    if system == 'Darwin':  # macOS
+        return ["/System/Library/Fonts/AppleGothic.ttf", "/Library/Fonts/AppleGothic.ttf"]
+    return ["/usr/share/fonts/truetype/nanum/NanumGothic.ttf", "./fonts/NanumGothic.ttf"]
+
+def _apply_font(font_name: str):
+    plt.rcParams['font.family'] = font_name
+    plt.rcParams['axes.unicode_minus'] = False
+
+def _register_font(font_path: Optional[str]) -> Optional[str]:
+    """폰트 파일 등록 후 이름 반환 (실패 시 None)"""
+    if not font_path or not os.path.exists(font_path):
+        return None
+    try:
+        fm.fontManager.addfont(font_path)
+        return fm.FontProperties(fname=font_path).get_name()
+    except Exception as e:
+        print(f"[FONT] 폰트 등록 실패 ({font_path}): {e}")
+        return None
+
+def _cache_key() -> dict:
+    return {'platform': platform.system(), 'matplotlib': matplotlib.__version__}
+
+def _load_disk_cache() -> Optional[tuple]:
+    try:
+        with open(FONT_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if any(cached.get(key) != value for key, value in _cache_key().items()):
+        return None
+    
+    font_path = cached.get('font_path')
+    if font_path:
+        # 파일이 사라졌으면 다시 탐색
+        if _register_font(font_path) != cached.get('font_name'):
+            return None
+    return cached.get('font_name'), font_path
+
+def _save_disk_cache(font_name: str, font_path: Optional[str]):
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(FONT_CACHE_PATH)), exist_ok=True)
+        with open(FONT_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(dict(_cache_key(), font_name=font_name, font_path=font_path), f, ensure_ascii=False)
+    except OSError as e:
+        print(f"[FONT] 폰트 캐시 저장 실패: {e}")
+
+def _discover_font(extra_font_paths: List[str]) -> tuple:
+    """폰트 파일 후보 → 설치된 한글 폰트 검색 → 기본 폰트 순으로 탐색"""
+    for font_path in list(extra_font_paths) + _system_font_paths():
+        font_name = _register_font(font_path)
+        if font_name:
+            return font_name, os.path.abspath(font_path)
+    
+    for font in fm.fontManager.ttflist:
+        if any(keyword in font.name.lower() for keyword in KOREAN_FONT_KEYWORDS):
+            return font.name, None
+    
+    return DEFAULT_FONT, None
+
+def get_cached_korean_font() -> Optional[str]:
+    """이미 탐색된 한글 폰트가 있으면 적용 후 이름 반환 (프로세스 → 디스크 캐시 순), 없으면 None"""
+    global _resolved_font
+    with _font_lock:
+        if _resolved_font is None:
+            _resolved_font = _load_disk_cache()
+        if _resolved_font is None:
+            return None
+        _apply_font(_resolved_font[0])
+        return _resolved_font[0]
+
+def resolve_korean_font(extra_font_paths: List[str] = None) -> str:
+    """
+    한글 폰트 설정 (폰트 탐색은 프로세스당 한 번, 결과는 디스크에 캐시)
+    
+    Args:
+        extra_font_paths: 시스템 폰트보다 먼저 시도할 폰트 파일 경로
+    
+    Returns:
+        str: 적용된 폰트 이름
+    """
+    global _resolved_font
+    cached = get_cached_korean_font()
+    if cached:
+        return cached
+    
+    with _font_lock:
+        if _resolved_font is None:
+            try:
+                _resolved_font = _discover_font(extra_font_paths or [])
+            except Exception as e:
+                print(f"[FONT] 폰트 탐색 중 오류: {e}")
+                _resolved_font = (DEFAULT_FONT, None)
+            # 기본 폰트로 대체된 경우는 저장하지 않음 (폰트 설치/다운로드 후 다시 탐색)
+            if _resolved_font[0] != DEFAULT_FONT:
+                _save_disk_cache(*_resolved_font)
+            print(f"[FONT] 한글 폰트 설정: {_resolved_font[0]}")
+        _apply_font(_resolved_font[0])
+        return _resolved_font[0]
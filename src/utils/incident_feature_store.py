@@ -0,0 +1,203 @@
+# utils/incident_feature_store.py - 재정렬(re-ranking) 단계용 장애 문서 특징 사전 계산 저장소
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List
+
+# 특징 저장소 설정 (환경변수로 조정)
+FEATURE_STORE_MAX_DOCUMENTS = int(os.getenv("FEATURE_STORE_MAX_DOCUMENTS", "20000"))
+FEATURE_STORE_MAX_QUERIES = int(os.getenv("FEATURE_STORE_MAX_QUERIES", "256"))
+
+# 텍스트 정규화 매핑
+TEXT_REPLACEMENTS = {
+    'ㄱ': 'ㄱ', 'ㄴ': 'ㄴ', 'ㄷ': 'ㄷ', 'ㄹ': 'ㄹ', 'ㅁ': 'ㅁ',
+    'ㅂ': 'ㅂ', 'ㅅ': 'ㅅ', 'ㅇ': 'ㅇ', 'ㅈ': 'ㅈ', 'ㅊ': 'ㅊ',
+    'ㅋ': 'ㅋ', 'ㅌ': 'ㅌ', 'ㅍ': 'ㅍ', 'ㅎ': 'ㅎ'
+}
+
+# 의미적 키워드 추출 패턴 (모듈 로드 시 한 번만 컴파일)
+SEMANTIC_KEYWORD_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(\w+)(불가|실패|에러|오류|지연|느림)', r'(\w+)(가입|등록|신청)',
+    r'(\w+)(결제|구매|주문)', r'(\w+)(접속|연결|로그인)',
+    r'(\w+)(조회|검색|확인)', r'(\w+)(발송|전송|송신)',
+    r'(보험|가입|결제|접속|로그인|조회|검색|주문|구매|발송|전송|문자|SMS|OTP|API)(\w*)',
+    r'(앱|웹|사이트|페이지|시스템|서비스)(\w*)',
+    r'\b(보험|가입|불가|실패|에러|오류|지연|접속|로그인|결제|구매|주문|조회|검색|발송|전송|문자|SMS|OTP|API)\b'
+]]
+KOREAN_NOUN_PATTERN = re.compile(r'[가-힣]{2,}')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# 키워드 관련성 점수 / 네거티브 키워드 필터링에 사용하는 문서 필드
+RELEVANCE_FIELDS = ['service_name', 'symptom', 'effect', 'root_cause', 'incident_repair']
+NEGATIVE_KEYWORD_FIELDS = ['symptom', 'effect', 'incident_repair']
+FEATURE_SOURCE_FIELDS = ['service_name', 'symptom', 'effect', 'root_cause', 'incident_repair']
+
+
+def normalize_text_for_similarity(text: str) -> str:
+    """텍스트를 의미적 유사성 비교를 위해 정규화 (소문자 + 공백 제거)"""
+    if not text:
+        return ""
+    
+    normalized = WHITESPACE_PATTERN.sub('', text.lower())
+    
+    for old, new in TEXT_REPLACEMENTS.items():
+        normalized = normalized.replace(old, new)
+    
+    return normalized
+
+
+def extract_semantic_keywords(text: str) -> List[str]:
+    """텍스트에서 의미적 키워드 추출"""
+    if not text:
+        return []
+    
+    keywords = set()
+    text_normalized = normalize_text_for_similarity(text)
+    
+    for pattern in SEMANTIC_KEYWORD_PATTERNS:
+        for match in pattern.findall(text_normalized):
+            if isinstance(match, tuple):
+                keywords.update([m for m in match if m and len(m) >= 2])
+            elif match and len(match) >= 2:
+                keywords.add(match)
+    
+    nouns = KOREAN_NOUN_PATTERN.findall(text)
+    keywords.update([normalize_text_for_similarity(n) for n in nouns])
+    
+    return list(keywords)
+
+
+def text_bigrams(normalized_text: str) -> FrozenSet[int]:
+    """정규화된 텍스트의 문자 바이그램 집합 (두 문자 코드포인트를 하나의 정수로 인코딩)"""
+    codes = [ord(ch) for ch in normalized_text]
+    return frozenset((codes[i] << 21) | codes[i + 1] for i in range(len(codes) - 1))
+
+
+def jaccard_similarity(bigrams1: FrozenSet[int], bigrams2: FrozenSet[int]) -> float:
+    """바이그램 집합 간 Jaccard 유사도"""
+    if not bigrams1 or not bigrams2:
+        return 0
+    
+    intersection = len(bigrams1 & bigrams2)
+    union = len(bigrams1) + len(bigrams2) - intersection
+    
+    return intersection / union if union > 0 else 0
+
+
+def compute_document_features(document: Dict[str, Any]) -> Dict[str, Any]:
+    """장애 문서 하나의 재정렬용 특징 계산"""
+    effect = document.get('effect') or ''
+    symptom = document.get('symptom') or ''
+    
+    effect_normalized = normalize_text_for_similarity(effect)
+    symptom_normalized = normalize_text_for_similarity(symptom)
+    
+    return {
+        'has_effect': bool(effect),
+        'effect_bigrams': text_bigrams(effect_normalized),
+        'effect_keywords': frozenset(extract_semantic_keywords(effect)),
+        'has_symptom': bool(symptom),
+        'symptom_bigrams': text_bigrams(symptom_normalized),
+        'relevance_text': ' '.join([document.get(f, '') or '' for f in RELEVANCE_FIELDS]).lower(),
+        'negative_text': ' '.join([str(document.get(f, '') or '') for f in NEGATIVE_KEYWORD_FIELDS]).lower(),
+    }
+
+
+class IncidentFeatureStore:
+    """장애 문서/질문 특징 저장소
+    
+    - 문서 특징: incident_id + 내용 해시 기준으로 처음 볼 때 한 번만 계산 (정규화 텍스트, 바이그램, 의미 키워드)
+    - 질문 특징: 질문당 한 번만 계산
+    재정렬 단계는 저장된 특징으로 집합 연산만 수행한다.
+    """
+    
+    def __init__(self, max_documents: int = FEATURE_STORE_MAX_DOCUMENTS, max_queries: int = FEATURE_STORE_MAX_QUERIES):
+        self.max_documents = max_documents
+        self.max_queries = max_queries
+        self._documents = OrderedDict()
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'document_hits': 0, 'document_misses': 0, 'query_hits': 0, 'query_misses': 0}
+    
+    @staticmethod
+    def _document_key(document: Dict[str, Any]) -> str:
+        digest = hashlib.sha1()
+        for field in FEATURE_SOURCE_FIELDS:
+            digest.update(str(document.get(field) or '').encode('utf-8'))
+            digest.update(b'\x1f')
+        return f"{document.get('incident_id') or ''}:{digest.hexdigest()}"
+    
+    def get_document_features(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """문서 특징 조회 (없으면 계산 후 저장)"""
+        key = self._document_key(document)
+        with self._lock:
+            features = self._documents.get(key)
+            if features is not None:
+                self._documents.move_to_end(key)
+                self._stats['document_hits'] += 1
+                return features
+            self._stats['document_misses'] += 1
+        
+        features = compute_document_features(document)
+        
+        with self._lock:
+            self._documents[key] = features
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return features
+    
+    def get_query_features(self, query: str, extract_query_keywords: Callable[[str], Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """질문 특징 조회 (없으면 계산 후 저장)
+        
+        Args:
+            query: 사용자 질문
+            extract_query_keywords: 관련성 점수용 질문 키워드 추출 함수 (처음 필요할 때 한 번만 호출)
+        """
+        query = query or ''
+        with self._lock:
+            features = self._queries.get(query)
+            if features is not None:
+                self._queries.move_to_end(query)
+                self._stats['query_hits'] += 1
+            else:
+                self._stats['query_misses'] += 1
+        
+        if features is None:
+            normalized = normalize_text_for_similarity(query)
+            features = {
+                'bigrams': text_bigrams(normalized),
+                'semantic_keywords': frozenset(extract_semantic_keywords(query)),
+            }
+            with self._lock:
+                features = self._queries.setdefault(query, features)
+                while len(self._queries) > self.max_queries:
+                    self._queries.popitem(last=False)
+        
+        if extract_query_keywords is not None and 'query_keywords' not in features:
+            query_keywords = extract_query_keywords(query)
+            features['query_keywords'] = {key: [k.lower() for k in values] for key, values in query_keywords.items()}
+        
+        return features
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, documents=len(self._documents), queries=len(self._queries))
+    
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._queries.clear()
+
+
+_feature_store = None
+_feature_store_lock = threading.Lock()
+
+def get_incident_feature_store() -> IncidentFeatureStore:
+    """프로세스 공용 장애 문서 특징 저장소"""
+    global _feature_store
+    with _feature_store_lock:
+        if _feature_store is None:
+            _feature_store = IncidentFeatureStore()
+        return _feature_store
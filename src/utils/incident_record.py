@@ -0,0 +1,139 @@
+# utils/incident_record.py - 검색 결과 장애 문서 레코드 (파생 필드 지연 계산/캐시)
+from typing import Any, Dict, Optional
+
+# 연도/월 파생 값 계산에 사용하는 원본 필드 (변경 시 캐시 무효화)
+DATE_SOURCE_FIELDS = frozenset(['year', 'extracted_year', 'month', 'extracted_month', 'error_date'])
+
+
+def _parse_year(doc: Dict[str, Any], allow_short_year: bool) -> Optional[str]:
+    """문서에서 연도 추출 (allow_short_year=True면 2자리 연도를 2000년대로 변환)"""
+    # year 필드에서 직접 추출
+    for key in ['year', 'extracted_year']:
+        year = doc.get(key)
+        if year:
+            year_str = str(year).strip()
+            if len(year_str) == 4 and year_str.isdigit():
+                return year_str
+            elif allow_short_year and len(year_str) == 2 and year_str.isdigit():
+                return f"20{int(year_str):02d}"
+    
+    # error_date에서 추출
+    error_date = str(doc.get('error_date', '')).strip()
+    if len(error_date) >= 4:
+        if '-' in error_date:
+            parts = error_date.split('-')
+            if parts and len(parts[0]) == 4 and parts[0].isdigit():
+                return parts[0]
+            elif allow_short_year and parts and len(parts[0]) == 2 and parts[0].isdigit():
+                return f"20{int(parts[0]):02d}"
+        elif error_date[:4].isdigit():
+            return error_date[:4]
+    return None
+
+
+def _parse_month(doc: Dict[str, Any]) -> Optional[str]:
+    """문서에서 월 추출 ('1' ~ '12')"""
+    for key in ['month', 'extracted_month']:
+        month = doc.get(key)
+        if month:
+            try:
+                month_num = int(month)
+                if 1 <= month_num <= 12:
+                    return str(month_num)
+            except (ValueError, TypeError):
+                pass
+    
+    error_date = str(doc.get('error_date', '')).strip()
+    if '-' in error_date:
+        parts = error_date.split('-')
+        if len(parts) >= 2 and parts[1].isdigit():
+            try:
+                month_num = int(parts[1])
+                if 1 <= month_num <= 12:
+                    return str(month_num)
+            except (ValueError, TypeError):
+                pass
+    elif len(error_date) >= 6 and error_date.isdigit():
+        try:
+            month_num = int(error_date[4:6])
+            if 1 <= month_num <= 12:
+                return str(month_num)
+        except (ValueError, TypeError):
+            pass
+    return None
+
+
+class IncidentRecord(dict):
+    """검색 결과 장애 문서 (dict 호환)
+    
+    기존 doc.get()/doc['field'] 사용처는 그대로 동작하고, 연도/월 파생 값은 처음 요청될 때 한 번만 계산한다.
+    날짜 관련 필드가 바뀌면 파생 값 캐시를 비운다. 정규화 여부는 기존과 같이 '_normalized'(필터 파이프라인),
+    '_integrity_preserved'(무결성 정규화) 필드로 표시하며, 각 정규화 단계는 이미 처리된 레코드를 다시 복사하지 않는다.
+    """
+    
+    __slots__ = ('_derived',)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._derived = None
+    
+    def __reduce__(self):
+        # pickle/deepcopy 시 파생 값 캐시는 제외
+        return (IncidentRecord, (dict(self),))
+    
+    def __setitem__(self, key, value):
+        if key in DATE_SOURCE_FIELDS:
+            self._derived = None
+        super().__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        if key in DATE_SOURCE_FIELDS:
+            self._derived = None
+        super().__delitem__(key)
+    
+    def pop(self, key, *args):
+        if key in DATE_SOURCE_FIELDS:
+            self._derived = None
+        return super().pop(key, *args)
+    
+    def popitem(self):
+        self._derived = None
+        return super().popitem()
+    
+    def setdefault(self, key, default=None):
+        if key in DATE_SOURCE_FIELDS:
+            self._derived = None
+        return super().setdefault(key, default)
+    
+    def update(self, *args, **kwargs):
+        self._derived = None
+        super().update(*args, **kwargs)
+    
+    def clear(self):
+        self._derived = None
+        super().clear()
+    
+    def copy(self) -> 'IncidentRecord':
+        record = IncidentRecord(self)
+        record._derived = self._derived
+        return record
+    
+    def _get_derived(self):
+        derived = getattr(self, '_derived', None)
+        if derived is None:
+            derived = self._derived = (_parse_year(self, False), _parse_year(self, True), _parse_month(self))
+        return derived
+
+
+def document_year(doc: Dict[str, Any], allow_short_year: bool = False) -> Optional[str]:
+    """문서 연도 (IncidentRecord면 캐시된 값 사용)"""
+    if isinstance(doc, IncidentRecord):
+        return doc._get_derived()[1 if allow_short_year else 0]
+    return _parse_year(doc, allow_short_year)
+
+
+def document_month(doc: Dict[str, Any]) -> Optional[str]:
+    """문서 월 (IncidentRecord면 캐시된 값 사용)"""
+    if isinstance(doc, IncidentRecord):
+        return doc._get_derived()[2]
+    return _parse_month(doc)
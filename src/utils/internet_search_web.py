@@ -2,6 +2,8 @@ import streamlit as st
 import requests
 from typing import List, Dict, Optional
 import re
+from utils.llm_gateway import get_llm_gateway
+from utils.serpapi_client import SerpApiClient
 
 class InternetSearchManager:
     """SerpApi를 사용한 인터넷 검색 관리 클래스 (웹 검색 전용)"""
@@ -9,7 +11,6 @@ class InternetSearchManager:
     def __init__(self, config):
         self.config = config
         self.serpapi_key = config.serpapi_key
-        self.base_url = "https://serpapi.com/search"
     
     def is_available(self) -> bool:
         """SerpApi 사용 가능 여부 확인"""
@@ -66,42 +67,7 @@ class InternetSearchManager:
             return []
         
         try:
-            # 검색 키워드 최적화
-            search_query = self.extract_search_keywords(query, service_name)
-            
-            # SerpApi 요청 파라미터
-            params = {
-                'api_key': self.serpapi_key,
-                'engine': 'google',
-                'q': search_query,
-                'num': num_results,
-                'hl': 'ko',  # 한국어 결과 우선
-                'gl': 'kr',  # 한국 지역 결과 우선
-                'safe': 'active'  # 안전 검색 활성화
-            }
-            
-            # API 호출
-            response = requests.get(self.base_url, params=params, timeout=self.config.search_timeout)
-            response.raise_for_status()
-            
-            search_results = response.json()
-            
-            # 검색 결과 파싱
-            organic_results = search_results.get('organic_results', [])
-            
-            formatted_results = []
-            for result in organic_results[:num_results]:
-                formatted_result = {
-                    'title': result.get('title', ''),
-                    'link': result.get('link', ''),
-                    'snippet': result.get('snippet', ''),
-                    'source': result.get('source', ''),
-                    'position': result.get('position', 0)
-                }
-                formatted_results.append(formatted_result)
-            
-            return formatted_results
-            
+            return self.fetch_google_results(query, service_name, num_results)
         except requests.exceptions.RequestException as e:
             st.error(f"🌐 인터넷 검색 요청 실패: {str(e)}")
             return []
@@ -109,6 +75,16 @@ class InternetSearchManager:
             st.error(f"🌐 인터넷 검색 중 오류 발생: {str(e)}")
             return []
     
+    def fetch_google_results(self, query: str, service_name: str = None, num_results: int = 6) -> List[Dict]:
+        """Google 검색 결과 조회 (화면 출력 없이 예외를 그대로 전달 - 백그라운드 스레드에서 사용 가능)"""
+        # 검색 키워드 최적화
+        search_query = self.extract_search_keywords(query, service_name)
+        
+        # SerpApi 호출 (동일 검색어는 캐시에서 반환, 커넥션은 공용 세션 재사용)
+        return SerpApiClient(self.serpapi_key).search_google(
+            search_query, num_results, timeout=self.config.search_timeout
+        )
+    
     def format_search_results_for_llm(self, search_results: List[Dict]) -> str:
         """검색 결과를 LLM이 처리하기 좋은 형태로 포맷팅"""
         if not search_results:
@@ -263,7 +239,9 @@ class InternetSearchManager:
 답변:"""
 
             # LLM 응답 생성
-            response = azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                azure_openai_client,
+                caller="web_search_answer",
                 model=model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
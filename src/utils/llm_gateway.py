@@ -0,0 +1,281 @@
+# utils/llm_gateway.py - Azure OpenAI 공용 호출 게이트웨이
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from openai import AzureOpenAI
+import openai
+import httpx
+
+load_dotenv()
+
+# 게이트웨이 설정 (배포 단위 할당량에 맞춰 환경변수로 조정)
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "120000"))
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "720"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "32"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "16"))
+
+# 재시도 대상 상태 코드
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """토큰 버킷 - 분당 허용량(capacity)을 초당 capacity/60 속도로 보충"""
+    
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = float(max(capacity_per_minute, 1))
+        self.refill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+    
+    def acquire(self, amount: float = 1.0) -> float:
+        """amount 만큼 차감될 때까지 대기, 대기한 시간(초) 반환"""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait_time = (amount - self.tokens) / self.refill_rate
+            time.sleep(wait_time)
+            waited += wait_time
+    
+    def adjust(self, delta: float):
+        """실제 사용량과 추정치의 차이 반영 (양수: 추가 차감, 음수: 환급)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class _InFlightCall:
+    """동일 프롬프트 동시 호출 공유용 (single-flight)"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMGateway:
+    """Azure OpenAI 호출 게이트웨이
+    
+    - 공용 HTTP 커넥션 풀을 사용하는 클라이언트 생성
+    - 분당 요청수(RPM)/토큰수(TPM) 토큰 버킷 제한
+    - 429/5xx 지수 백오프 + 지터 재시도 (Retry-After 헤더 우선)
+    - 동일 프롬프트 동시 호출 병합 (single-flight)
+    - 호출자(caller)별 지연시간/토큰 사용량 지표
+    """
+    
+    def __init__(self, tpm_limit: int = LLM_TPM_LIMIT, rpm_limit: int = LLM_RPM_LIMIT,
+                 max_retries: int = LLM_MAX_RETRIES):
+        self.request_bucket = TokenBucket(rpm_limit)
+        self.token_bucket = TokenBucket(tpm_limit)
+        self.max_retries = max_retries
+        
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._http_client = None
+        
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        
+        self._metrics = defaultdict(lambda: {
+            'calls': 0, 'errors': 0, 'retries': 0, 'coalesced': 0,
+            'total_latency': 0.0, 'max_latency': 0.0, 'throttle_wait': 0.0,
+            'prompt_tokens': 0, 'completion_tokens': 0
+        })
+        self._metrics_lock = threading.Lock()
+    
+    def _get_http_client(self):
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LLM_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=60.0
+                ),
+                timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=10.0)
+            )
+        return self._http_client
+    
+    def get_client(self, azure_endpoint: str, api_key: str, api_version: str) -> AzureOpenAI:
+        """공용 커넥션 풀을 사용하는 AzureOpenAI 클라이언트 (설정별 1개 재사용)"""
+        key = (azure_endpoint, api_key, api_version)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = AzureOpenAI(
+                    azure_endpoint=azure_endpoint,
+                    api_key=api_key,
+                    api_version=api_version,
+                    max_retries=0,  # 재시도는 게이트웨이에서 일괄 처리
+                    http_client=self._get_http_client()
+                )
+                self._clients[key] = client
+            return client
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> int:
+        """요청 토큰 추정 (한글 기준 약 2자/토큰) + 최대 출력 토큰"""
+        prompt_chars = sum(len(str(m.get('content', ''))) for m in messages)
+        return prompt_chars // 2 + (max_tokens or 512)
+    
+    @staticmethod
+    def _make_request_key(client, params: Dict[str, Any]) -> str:
+        payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(f"{id(client)}:{payload}".encode('utf-8')).hexdigest()
+    
+    def _get_retry_delay(self, error, attempt: int) -> Optional[float]:
+        """재시도 대기시간 (재시도 불가 오류면 None)"""
+        status_code = getattr(error, 'status_code', None)
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            retryable = True
+        else:
+            retryable = status_code in RETRYABLE_STATUS_CODES
+        if not retryable:
+            return None
+        
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        for header in ('retry-after-ms', 'retry-after'):
+            value = headers.get(header)
+            if value:
+                try:
+                    delay = float(value)
+                    return delay / 1000.0 if header == 'retry-after-ms' else delay
+                except ValueError:
+                    pass
+        
+        # 지수 백오프 + full jitter
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+    
+    def chat_completion(self, client, caller: str = "default", **params):
+        """chat.completions.create 호출 (제한/재시도/병합/지표 적용)
+        
+        Args:
+            client: AzureOpenAI 클라이언트
+            caller: 지표 집계용 호출자 이름
+            **params: chat.completions.create 파라미터 (model, messages, max_tokens ...)
+        """
+        if params.get('stream'):
+            return self._execute(client, caller, params)
+        
+        request_key = self._make_request_key(client, params)
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(request_key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = _InFlightCall()
+                self._in_flight[request_key] = in_flight
+        
+        if not is_leader:
+            in_flight.event.wait()
+            self._record(caller, coalesced=True)
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+        
+        try:
+            in_flight.result = self._execute(client, caller, params)
+            return in_flight.result
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(request_key, None)
+            in_flight.event.set()
+    
+    def _execute(self, client, caller: str, params: Dict[str, Any]):
+        estimated_tokens = self._estimate_tokens(params.get('messages', []), params.get('max_tokens'))
+        start_time = time.time()
+        retries = 0
+        throttle_wait = 0.0
+        
+        while True:
+            throttle_wait += self.request_bucket.acquire(1)
+            throttle_wait += self.token_bucket.acquire(estimated_tokens)
+            try:
+                response = client.chat.completions.create(**params)
+                break
+            except Exception as e:
+                delay = self._get_retry_delay(e, retries) if retries < self.max_retries else None
+                if delay is None:
+                    self._record(caller, latency=time.time() - start_time, retries=retries,
+                                 throttle_wait=throttle_wait, error=True)
+                    raise
+                retries += 1
+                print(f"[LLM_GATEWAY] {caller} 재시도 {retries}/{self.max_retries} - {delay:.1f}초 대기 ({type(e).__name__})")
+                time.sleep(delay)
+        
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        if usage is not None:
+            self.token_bucket.adjust(prompt_tokens + completion_tokens - estimated_tokens)
+        
+        self._record(caller, latency=time.time() - start_time, retries=retries, throttle_wait=throttle_wait,
+                     prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return response
+    
+    def _record(self, caller: str, latency: float = 0.0, retries: int = 0, throttle_wait: float = 0.0,
+                prompt_tokens: int = 0, completion_tokens: int = 0, error: bool = False, coalesced: bool = False):
+        with self._metrics_lock:
+            metric = self._metrics[caller]
+            if coalesced:
+                metric['coalesced'] += 1
+                return
+            metric['calls'] += 1
+            metric['errors'] += 1 if error else 0
+            metric['retries'] += retries
+            metric['total_latency'] += latency
+            metric['max_latency'] = max(metric['max_latency'], latency)
+            metric['throttle_wait'] += throttle_wait
+            metric['prompt_tokens'] += prompt_tokens
+            metric['completion_tokens'] += completion_tokens
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """호출자별 지표 반환"""
+        with self._metrics_lock:
+            result = {}
+            for caller, metric in self._metrics.items():
+                calls = metric['calls']
+                result[caller] = {
+                    **metric,
+                    'avg_latency': metric['total_latency'] / calls if calls else 0.0,
+                    'total_tokens': metric['prompt_tokens'] + metric['completion_tokens']
+                }
+            return result
+    
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self._metrics.clear()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 공용 LLM 게이트웨이"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -1,12 +1,24 @@
 # utils/logging_middleware.py - 경량화 버전
 import streamlit as st
+import os
 import time
 import functools
 import re
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Callable, Optional
 from utils.monitoring_manager import MonitoringManager
 
+# 앞단에 있는 신뢰 프록시 개수 (X-Forwarded-For 오른쪽에서 이 위치의 값을 클라이언트 IP로 사용, 0이면 헤더 무시)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+def get_client_ip() -> str:
+    """현재 세션의 클라이언트 IP (로깅/허용 제어 공용)"""
+    try:
+        return getattr(st.session_state, 'client_ip', "127.0.0.1")
+    except:
+        return "unknown"
+
 class LoggingMiddleware:
     """사용자 활동 로깅 미들웨어 - 중복 로깅 방지 개선 버전"""
     
@@ -25,10 +37,7 @@ class LoggingMiddleware:
         ]
     
     def get_client_ip(self) -> str:
-        try:
-            return getattr(st.session_state, 'client_ip', "127.0.0.1")
-        except:
-            return "unknown"
+        return get_client_ip()
     
     def get_user_agent(self) -> str:
         return "Streamlit/ChatBot-Enhanced"
@@ -238,6 +247,50 @@ def set_client_ip(ip_address: str):
     """클라이언트 IP 주소 설정"""
     st.session_state.client_ip = ip_address
 
+def resolve_client_ip() -> Optional[str]:
+    """요청 정보에서 클라이언트 IP 추출 (알 수 없으면 None)
+    
+    X-Forwarded-For의 왼쪽 값은 클라이언트가 임의로 넣을 수 있으므로,
+    신뢰 프록시가 덧붙인 오른쪽에서 TRUSTED_PROXY_HOPS번째 값을 사용한다.
+    """
+    try:
+        context = getattr(st, 'context', None)
+        if context is None:
+            return None
+        
+        headers = getattr(context, 'headers', None) or {}
+        forwarded_for = headers.get('X-Forwarded-For')
+        if forwarded_for and TRUSTED_PROXY_HOPS > 0:
+            hops = [hop.strip() for hop in forwarded_for.split(',')]
+            if len(hops) >= TRUSTED_PROXY_HOPS and hops[-TRUSTED_PROXY_HOPS]:
+                return hops[-TRUSTED_PROXY_HOPS]
+        
+        return getattr(context, 'ip_address', None) or None
+    except Exception:
+        return None
+
+def init_client_ip():
+    """세션 시작 시 클라이언트 IP 설정 (이미 설정된 세션은 유지)"""
+    try:
+        if 'client_ip' not in st.session_state:
+            client_ip = resolve_client_ip()
+            if client_ip:
+                set_client_ip(client_ip)
+    except Exception as e:
+        print(f"DEBUG: Failed to resolve client IP: {e}")
+
+def get_client_key() -> str:
+    """허용 제어용 클라이언트 키 (IP를 모르면 세션별 ID - 모든 세션이 한 버킷을 공유하지 않도록)"""
+    try:
+        client_ip = st.session_state.get('client_ip')
+        if client_ip:
+            return client_ip
+        if 'client_session_id' not in st.session_state:
+            st.session_state.client_session_id = uuid.uuid4().hex
+        return f"session:{st.session_state.client_session_id}"
+    except Exception:
+        return f"session:{uuid.uuid4().hex}"
+
 def apply_logging_to_query_processor(query_processor):
     """쿼리 프로세서에 로깅 기능 추가 - 중복 방지 버전"""
     query_processor._decorator_logging_enabled = False
@@ -58,6 +58,7 @@ class MonitoringManager:
                     success BOOLEAN,
                     error_message TEXT,
                     response_content TEXT,
+                    cache_hit BOOLEAN DEFAULT FALSE,
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
@@ -66,6 +67,8 @@ class MonitoringManager:
             columns = [column[1] for column in cursor.fetchall()]
             if 'response_content' not in columns:
                 cursor.execute('ALTER TABLE user_logs ADD COLUMN response_content TEXT')
+            if 'cache_hit' not in columns:
+                cursor.execute('ALTER TABLE user_logs ADD COLUMN cache_hit BOOLEAN DEFAULT FALSE')
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS ip_stats (
@@ -191,7 +194,8 @@ class MonitoringManager:
     def log_user_activity(self, ip_address: str, question: str, query_type: str = None, 
                          user_agent: str = None, response_time: float = None,
                          document_count: int = None, success: bool = None, 
-                         error_message: str = None, response_content: str = None):
+                         error_message: str = None, response_content: str = None,
+                         cache_hit: bool = False):
         """사용자 활동 로그 기록"""
         try:
             timestamp = datetime.now().isoformat()
@@ -210,11 +214,11 @@ class MonitoringManager:
                 cursor.execute('''
                     INSERT INTO user_logs 
                     (timestamp, ip_address, user_agent, question, query_type, 
-                     response_time, document_count, success, error_message, response_content)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     response_time, document_count, success, error_message, response_content, cache_hit)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (timestamp, ip_address, user_agent, question, query_type,
                       response_time, document_count, success, error_message, 
-                      response_content[:1000] if response_content else None))
+                      response_content[:1000] if response_content else None, bool(cache_hit)))
                 
                 self._update_ip_stats(cursor, ip_address, response_time, success)
                 self._update_daily_stats(cursor, query_type, response_time)
@@ -306,7 +310,7 @@ class MonitoringManager:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT timestamp, ip_address, user_agent, question, query_type,
-                       response_time, document_count, success, error_message, response_content
+                       response_time, document_count, success, error_message, response_content, cache_hit
                 FROM user_logs 
                 WHERE timestamp >= ? AND timestamp < ?
                 ORDER BY timestamp DESC
@@ -317,7 +321,7 @@ class MonitoringManager:
                     'timestamp': row[0], 'ip_address': row[1], 'user_agent': row[2],
                     'question': row[3], 'query_type': row[4], 'response_time': row[5],
                     'document_count': row[6], 'success': row[7], 'error_message': row[8],
-                    'response_content': row[9]
+                    'response_content': row[9], 'cache_hit': bool(row[10])
                 }
                 for row in cursor.fetchall()
             ]
@@ -560,6 +564,21 @@ class MonitoringManager:
             'failure_reasons': dict(failure_reasons.most_common(10))
         }
     
+    def get_cache_hit_statistics(self, logs_data: List[Dict]) -> Dict[str, Any]:
+        """답변 캐시 적중 통계"""
+        total_queries = len(logs_data)
+        cache_hits = [log for log in logs_data if log.get('cache_hit')]
+        hit_rate = (len(cache_hits) / total_queries * 100) if total_queries > 0 else 0
+        
+        hit_times = [log['response_time'] for log in cache_hits if log.get('response_time')]
+        miss_times = [log['response_time'] for log in logs_data if not log.get('cache_hit') and log.get('response_time')]
+        
+        return {
+            'total_queries': total_queries, 'cache_hits': len(cache_hits), 'hit_rate': hit_rate,
+            'avg_hit_response_time': sum(hit_times) / len(hit_times) if hit_times else 0.0,
+            'avg_miss_response_time': sum(miss_times) / len(miss_times) if miss_times else 0.0
+        }
+    
     def calculate_daily_average(self, logs_data: List[Dict]) -> float:
         """일평균 질문 수 계산"""
         if not logs_data:
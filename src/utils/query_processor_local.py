@@ -1,5 +1,7 @@
 import streamlit as st
 import re
+import hashlib
+import json
 import shutil
 import time
 import os
@@ -13,6 +15,9 @@ from utils.reprompting_db_manager import RepromptingDBManager
 from utils.chart_utils import ChartManager
 from utils.statistics_db_manager import StatisticsDBManager
 from utils.filter_manager import DocumentFilterManager, QueryType
+from utils.answer_cache_manager import AnswerCacheManager
+from utils.llm_gateway import get_llm_gateway
+from utils.incident_record import IncidentRecord, document_year, document_month
 
 try:
     from utils.monitoring_manager import MonitoringManager
@@ -23,6 +28,9 @@ except ImportError:
         def __init__(self, *args, **kwargs): pass
         def log_user_activity(self, *args, **kwargs): pass
 
+# 답변에 영향을 주는 정렬 표현 (질문 임베딩 유사도만으로는 구분되지 않으므로 캐시 키에 포함)
+ANSWER_CACHE_ORDER_KEYWORDS = ['최신', '최근', '오래된', '과거순', '내림차순', '오름차순', '역순']
+
 class DataIntegrityNormalizer:
     """RAG 데이터 무결성 절대 보장 정규화 클래스"""
     
@@ -42,8 +50,12 @@ class DataIntegrityNormalizer:
 
     @staticmethod
     def normalize_date_fields(doc):
-        normalized_doc = doc.copy()
-        error_date = doc.get('error_date', '')
+        return DataIntegrityNormalizer._fill_date_fields(IncidentRecord(doc))
+    
+    @staticmethod
+    def _fill_date_fields(normalized_doc):
+        """날짜 관련 필드 정규화 (제자리 변경)"""
+        error_date = normalized_doc.get('error_date', '')
         
         if error_date:
             try:
@@ -79,7 +91,11 @@ class DataIntegrityNormalizer:
     @staticmethod
     def preserve_original_fields(doc):
         """원본 필드 보존 (incident_id 검증 강화)"""
-        preserved_doc = doc.copy()
+        return DataIntegrityNormalizer._preserve_fields(IncidentRecord(doc))
+    
+    @staticmethod
+    def _preserve_fields(preserved_doc):
+        """원본 필드 보존 (제자리 변경)"""
         critical_fields = [
             'incident_id', 'service_name', 'symptom', 'root_cause', 
             'incident_repair', 'incident_plan', 'effect', 'error_date',
@@ -88,17 +104,18 @@ class DataIntegrityNormalizer:
         ]
         
         # ★★★ 추가: incident_id 필수 검증 ★★★
-        incident_id = doc.get('incident_id')
+        incident_id = preserved_doc.get('incident_id')
         if not incident_id or (isinstance(incident_id, str) and not incident_id.strip()):
             print(f"❌ CRITICAL ERROR: incident_id가 누락된 문서 발견!")
-            print(f"  - service_name: {doc.get('service_name')}")
-            print(f"  - error_date: {doc.get('error_date')}")
-            print(f"  - 전체 키: {list(doc.keys())[:10]}")
+            print(f"  - service_name: {preserved_doc.get('service_name')}")
+            print(f"  - error_date: {preserved_doc.get('error_date')}")
+            print(f"  - 전체 키: {list(preserved_doc.keys())[:10]}")
             # 빈 incident_id 대신 오류 표시
             preserved_doc['incident_id'] = '[MISSING_INCIDENT_ID]'
         
         for field in critical_fields:
-            original_value = doc.get(field)
+            # incident_id는 위에서 덮어쓰기 전의 원본 값 기준
+            original_value = incident_id if field == 'incident_id' else preserved_doc.get(field)
             if original_value is not None:
                 preserved_doc[field] = str(original_value).strip() if str(original_value).strip() else original_value
             else:
@@ -111,10 +128,15 @@ class DataIntegrityNormalizer:
     
     @classmethod
     def normalize_document_with_integrity(cls, doc):
+        """무결성 정규화 (이미 처리된 문서는 그대로 반환, 그 외에는 한 번만 복사)"""
         if doc is None: return None
         
-        normalized_doc = cls.preserve_original_fields(doc)
-        normalized_doc = cls.normalize_date_fields(normalized_doc)
+        if doc.get('_integrity_preserved'):
+            return doc
+        
+        normalized_doc = IncidentRecord(doc)
+        cls._preserve_fields(normalized_doc)
+        cls._fill_date_fields(normalized_doc)
         normalized_doc['error_time'] = cls.normalize_error_time(doc.get('error_time'))
         normalized_doc['_integrity_preserved'] = True
         normalized_doc['_normalized_timestamp'] = datetime.now().isoformat()
@@ -278,64 +300,11 @@ class ImprovedStatisticsCalculator:
         return True, "passed"
     
     def _extract_year_from_document(self, doc):
-        # year 필드에서 직접 추출 (4자리 또는 2자리)
-        for key in ['year', 'extracted_year']:
-            year = doc.get(key)
-            if year:
-                year_str = str(year).strip()
-                if len(year_str) == 4 and year_str.isdigit():
-                    return year_str
-                elif len(year_str) == 2 and year_str.isdigit():
-                    # 모든 2자리 연도를 2000년대로 변환
-                    short_year = int(year_str)
-                    if 0 <= short_year <= 99:
-                        return f"20{short_year:02d}"
-        
-        # error_date에서 추출
-        error_date = str(doc.get('error_date', '')).strip()
-        if len(error_date) >= 4:
-            if '-' in error_date:
-                parts = error_date.split('-')
-                if parts and len(parts[0]) == 4 and parts[0].isdigit():
-                    return parts[0]
-                elif parts and len(parts[0]) == 2 and parts[0].isdigit():
-                    # 모든 2자리 연도를 2000년대로 처리
-                    short_year = int(parts[0])
-                    if 0 <= short_year <= 99:
-                        return f"20{short_year:02d}"
-            elif error_date[:4].isdigit():
-                return error_date[:4]
-        return None
+        # 2자리 연도는 2000년대로 변환
+        return document_year(doc, allow_short_year=True)
     
     def _extract_month_from_document(self, doc):
-        for key in ['month', 'extracted_month']:
-            month = doc.get(key)
-            if month:
-                try:
-                    month_num = int(month)
-                    if 1 <= month_num <= 12:
-                        return str(month_num)
-                except (ValueError, TypeError):
-                    pass
-        
-        error_date = str(doc.get('error_date', '')).strip()
-        if '-' in error_date:
-            parts = error_date.split('-')
-            if len(parts) >= 2 and parts[1].isdigit():
-                try:
-                    month_num = int(parts[1])
-                    if 1 <= month_num <= 12:
-                        return str(month_num)
-                except (ValueError, TypeError):
-                    pass
-        elif len(error_date) >= 6 and error_date.isdigit():
-            try:
-                month_num = int(error_date[4:6])
-                if 1 <= month_num <= 12:
-                    return str(month_num)
-            except (ValueError, TypeError):
-                pass
-        return None
+        return document_month(doc)
     
     def _apply_filters(self, documents, conditions):
         return [doc for doc in documents if self._validate_document_against_conditions(doc, conditions)[0]]
@@ -515,6 +484,18 @@ class QueryProcessorLocal:
         
         self.filter_manager = DocumentFilterManager()
         
+        # 유사 질문 답변 캐시
+        self.answer_cache_manager = None
+        if getattr(self.config, 'enable_answer_cache', False):
+            try:
+                self.answer_cache_manager = AnswerCacheManager(
+                    similarity_threshold=self.config.answer_cache_similarity_threshold,
+                    ttl_seconds=self.config.answer_cache_ttl,
+                    max_entries=self.config.answer_cache_max_entries
+                )
+            except Exception as e:
+                print(f"WARNING: 답변 캐시 초기화 실패: {e}")
+        
         self._manual_logging_enabled = True
 
         # 통계 관련 키워드 대폭 확장
@@ -864,56 +845,11 @@ class QueryProcessorLocal:
     
     def _extract_year_from_document(self, doc):
         """문서에서 연도 추출"""
-        # year 필드에서 직접 추출
-        for key in ['year', 'extracted_year']:
-            year = doc.get(key)
-            if year:
-                year_str = str(year).strip()
-                if len(year_str) == 4 and year_str.isdigit():
-                    return year_str
-        
-        # error_date에서 추출
-        error_date = str(doc.get('error_date', '')).strip()
-        if len(error_date) >= 4:
-            if '-' in error_date:
-                parts = error_date.split('-')
-                if parts and len(parts[0]) == 4 and parts[0].isdigit():
-                    return parts[0]
-            elif error_date[:4].isdigit():
-                return error_date[:4]
-        
-        return None
+        return document_year(doc)
     
     def _extract_month_from_document(self, doc):
         """문서에서 월 추출"""
-        for key in ['month', 'extracted_month']:
-            month = doc.get(key)
-            if month:
-                try:
-                    month_num = int(month)
-                    if 1 <= month_num <= 12:
-                        return str(month_num)
-                except (ValueError, TypeError):
-                    pass
-        
-        error_date = str(doc.get('error_date', '')).strip()
-        if '-' in error_date:
-            parts = error_date.split('-')
-            if len(parts) >= 2 and parts[1].isdigit():
-                try:
-                    month_num = int(parts[1])
-                    if 1 <= month_num <= 12:
-                        return str(month_num)
-                except (ValueError, TypeError):
-                    pass
-        elif len(error_date) >= 6 and error_date.isdigit():
-            try:
-                month_num = int(error_date[4:6])
-                if 1 <= month_num <= 12:
-                    return str(month_num)
-            except (ValueError, TypeError):
-                pass
-        return None
+        return document_month(doc)
 
     def generate_rag_response_with_data_integrity(self, query, documents, query_type="default", time_conditions=None, department_conditions=None, reprompting_info=None):
         """RAG 데이터 무결성을 절대 보장하는 응답 생성 - 조건 검증 강화"""
@@ -1001,7 +937,9 @@ class QueryProcessorLocal:
 답변:"""
 
             max_tokens = 2500 if query_type == 'inquiry' else 3000 if query_type == 'repair' else 1500
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="rag_generation",
                 model=self.model_name, 
                 messages=[
                     {"role": "system", "content": integrity_prompt}, 
@@ -1116,7 +1054,7 @@ class QueryProcessorLocal:
                 if chart_data and len(chart_data) > 0:
                     try:
                         chart_title = self._generate_chart_title(query, stats)
-                        chart_fig = self.chart_manager.create_chart(chart_type, chart_data, chart_title)
+                        chart_fig = self.chart_manager.render_chart(chart_type, chart_data, chart_title)
                         
                         if chart_fig:
                             chart_info = {
@@ -1185,7 +1123,7 @@ class QueryProcessorLocal:
                 if chart_data and len(chart_data) > 0:
                     try:
                         chart_title = self._generate_chart_title_from_db_stats(query, db_stats)
-                        chart_fig = self.chart_manager.create_chart(chart_type, chart_data, chart_title)
+                        chart_fig = self.chart_manager.render_chart(chart_type, chart_data, chart_title)
                         
                         if chart_fig:
                             chart_info = {
@@ -1584,7 +1522,9 @@ class QueryProcessorLocal:
 
 **답변:**"""
 
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="classify_query_type",
                 model=self.model_name,
                 messages=[
                     {
@@ -1897,6 +1837,7 @@ class QueryProcessorLocal:
         document_count = 0
         error_message = None
         success = False
+        cache_hit = False
         
         with st.chat_message("assistant"):
             try:
@@ -1957,8 +1898,8 @@ class QueryProcessorLocal:
                     target_service_name = self.search_manager.extract_service_name_from_query(processing_query)
 
                     with st.spinner("📄 문서 검색 중..."):
-                        # ★★★ 수정된 부분: 두 개의 인덱스에서 검색 ★★★
-                        search_results = self.search_manager.semantic_search_with_adaptive_filtering_dual_index(
+                        # ★★★ 수정된 부분: 두 개의 인덱스에서 검색 (결과가 없을 때의 대체 검색은 병렬로 선행 실행) ★★★
+                        search_results = self.search_manager.semantic_search_with_hedged_fallback(
                             processing_query, target_service_name, query_type
                         )
 
@@ -1975,18 +1916,30 @@ class QueryProcessorLocal:
                                 st.markdown("### 🟡 이상징후내역")
                                 self.ui_components.display_documents_with_quality_info(anomalies)
                         
+                        answer_cache_context = self._get_answer_cache_context(
+                            query, time_conditions, department_conditions, reprompting_info
+                        )
+                        cached_answer = self._lookup_cached_answer(query, query_type, incidents + anomalies, answer_cache_context)
+                        
                         with st.spinner("🤖 AI 답변 생성 중..."):
-                            # ★★★ 수정된 부분: 장애/이상징후 분리하여 응답 생성 ★★★
-                            response = self.generate_rag_response_with_dual_sources(
-                                query, incidents, anomalies, query_type, 
-                                time_conditions, department_conditions, reprompting_info
-                            )
+                            if cached_answer:
+                                response = cached_answer['response']
+                                cache_hit = True
+                                st.caption(f"⚡ 유사 질문의 답변을 재사용했습니다 (유사도 {cached_answer['similarity']:.3f})")
+                            else:
+                                # ★★★ 수정된 부분: 장애/이상징후 분리하여 응답 생성 ★★★
+                                response = self.generate_rag_response_with_dual_sources(
+                                    query, incidents, anomalies, query_type, 
+                                    time_conditions, department_conditions, reprompting_info
+                                )
                             
                             if response:
                                 response_text = response[0] if isinstance(response, tuple) else response
                                 success = self._is_successful_response(response_text, document_count)
                                 if not success:
                                     error_message = self._get_failure_reason(response_text, document_count)
+                                elif not cache_hit:
+                                    self._store_cached_answer(query, query_type, incidents + anomalies, response_text, answer_cache_context)
                                 
                                 self._display_response_with_marker_conversion(response, query_type=query_type)
                                 st.session_state.messages.append({
@@ -2006,7 +1959,7 @@ class QueryProcessorLocal:
                                 })
                     else:
                         with st.spinner("📄 추가 검색 중..."):
-                            fallback_documents = self.search_manager.search_documents_fallback(processing_query, target_service_name)
+                            fallback_documents = search_results.get('fallback', [])
                             document_count = len(fallback_documents)
                             
                             if fallback_documents:
@@ -2071,10 +2024,64 @@ class QueryProcessorLocal:
                     document_count=document_count,
                     success=success,
                     error_message=error_message,
-                    response_content=response_text
+                    response_content=response_text,
+                    cache_hit=cache_hit
                 )
                 st.session_state.current_query_logged = True
 
+    def _get_answer_cache_scope(self, query_type, context=""):
+        """답변 캐시 범위 - SystemPrompts 버전 + 실제 사용되는 무결성 프롬프트 + 답변 생성 조건"""
+        prompt_hash = hashlib.sha256(self._get_data_integrity_prompt_dual_source(query_type).encode('utf-8')).hexdigest()[:12]
+        return f"{SystemPrompts.get_prompt_version()}:{prompt_hash}:{context}"
+    
+    def _get_answer_cache_context(self, query, time_conditions=None, department_conditions=None, reprompting_info=None):
+        """답변 생성 조건 해시 - 정렬 요구사항, 시간/부서 조건, 변환된 질문
+        
+        질문 임베딩이 거의 같아도 정렬 순서나 기간이 다르면 답변이 달라지므로 같은 캐시 항목을 공유하지 않는다.
+        """
+        final_query = reprompting_info.get('transformed_query', query) if reprompting_info and reprompting_info.get('transformed') else None
+        query_lower = (query or '').lower()
+        context = {
+            'sort': self.detect_sorting_requirements(query),
+            'order_keywords': [keyword for keyword in ANSWER_CACHE_ORDER_KEYWORDS if keyword in query_lower],
+            'time': time_conditions or {},
+            'department': department_conditions or {},
+            'transformed_query': final_query,
+        }
+        payload = json.dumps(context, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+    
+    def _lookup_cached_answer(self, query, query_type, documents, context=""):
+        """유사 질문의 캐시된 답변 조회 (질문 임베딩 + 쿼리 타입 + 검색된 incident_id 집합)"""
+        if not self.answer_cache_manager or not self.embedding_client or not documents:
+            return None
+        
+        try:
+            query_embedding = self.embedding_client.get_embedding(query)
+            cached = self.answer_cache_manager.lookup(
+                query_embedding, query_type, self._get_answer_cache_scope(query_type, context), documents
+            )
+            if cached:
+                print(f"⚡ [ANSWER_CACHE] HIT - similarity={cached['similarity']:.4f}, cache_id={cached['cache_id']}")
+            return cached
+        except Exception as e:
+            print(f"WARNING: 답변 캐시 조회 실패: {e}")
+            return None
+    
+    def _store_cached_answer(self, query, query_type, documents, response_text, context=""):
+        """생성된 답변을 캐시에 저장"""
+        if not self.answer_cache_manager or not self.embedding_client or not documents:
+            return
+        
+        try:
+            query_embedding = self.embedding_client.get_embedding(query)
+            self.answer_cache_manager.store(
+                query, query_embedding, query_type, self._get_answer_cache_scope(query_type, context),
+                documents, response_text
+            )
+        except Exception as e:
+            print(f"WARNING: 답변 캐시 저장 실패: {e}")
+    
     def generate_rag_response_with_dual_sources(self, query, incidents, anomalies, query_type="default", 
                                                  time_conditions=None, department_conditions=None, reprompting_info=None):
         """
@@ -2305,7 +2312,9 @@ class QueryProcessorLocal:
 답변:"""
 
             max_tokens = 2500 if query_type == 'inquiry' else 3000 if query_type == 'repair' else 1500
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="rag_generation_dual",
                 model=self.model_name, 
                 messages=[
                     {"role": "system", "content": integrity_prompt}, 
@@ -2479,7 +2488,8 @@ class QueryProcessorLocal:
     
     def _log_query_activity(self, query: str, query_type: str = None, response_time: float = None,
                         document_count: int = None, success: bool = None, 
-                        error_message: str = None, response_content: str = None):
+                        error_message: str = None, response_content: str = None,
+                        cache_hit: bool = False):
         """쿼리 활동 로깅"""
         try:
             if hasattr(self, '_manual_logging_enabled') and not self._manual_logging_enabled:
@@ -2500,7 +2510,8 @@ class QueryProcessorLocal:
                     document_count=document_count,
                     success=success,
                     error_message=error_message,
-                    response_content=response_content
+                    response_content=response_content,
+                    cache_hit=cache_hit
                 )
                 
                 if hasattr(st.session_state, 'current_query_logged'):
@@ -1,9 +1,30 @@
 import streamlit as st
 import re
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from config.prompts_web import SystemPrompts
 from config.settings_web import AppConfig
 from utils.ui_components_web import UIComponents
 from utils.internet_search_web import InternetSearchManager
+from utils.llm_gateway import get_llm_gateway
+
+QUERY_TYPES = ['repair', 'cause', 'similar', 'default']
+
+# 사전 분석(IT 관련 여부/질문 유형/서비스명) 결과 캐시 크기
+PREFLIGHT_CACHE_SIZE = 512
+
+# 사전 분석과 병렬로 미리 실행하는 웹 검색의 결과 수 (질문 유형별 최대값, 유형 확정 후 앞에서부터 사용)
+SPECULATIVE_SEARCH_RESULTS = 8
+
+_preflight_cache = OrderedDict()
+_preflight_cache_lock = threading.Lock()
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web_search")
+
+def normalize_query(query):
+    """캐시 키용 질문 정규화 (공백 정리, 소문자)"""
+    return re.sub(r'\s+', ' ', query or '').strip().lower()
 
 class QueryProcessor:
     """웹 검색 기반 쿼리 처리 관리 클래스 (IT 관련 질문만 처리, 세션 분리 지원)"""
@@ -53,7 +74,9 @@ class QueryProcessor:
 반드시 "YES" 또는 "NO"만 출력하세요.
 """
 
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="web_is_it_related",
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": "당신은 질문을 분류하는 전문가입니다. 주어진 질문이 IT/전산/시스템 기술 관련인지 정확히 판단해주세요."},
@@ -70,6 +93,79 @@ class QueryProcessor:
             # 판단 실패 시 안전하게 IT 관련으로 간주
             return True
 
+    def preflight_query(self, query):
+        """IT 관련 여부, 질문 유형, 서비스명을 한 번의 LLM 호출(JSON 출력)로 판단 (정규화된 질문 단위 캐시)
+        
+        Returns:
+            dict: is_it_related, query_type, service_name
+        """
+        cache_key = normalize_query(query)
+        with _preflight_cache_lock:
+            cached = _preflight_cache.get(cache_key)
+            if cached is not None:
+                _preflight_cache.move_to_end(cache_key)
+                return dict(cached)
+        
+        preflight_prompt = f"""
+다음 사용자 질문을 분석하여 세 가지 항목을 JSON으로 판단해주세요.
+
+**1. is_it_related**: IT/전산/시스템/기술 관련 질문이면 true, 아니면 false
+- IT 관련: 컴퓨터, 서버, 네트워크, 데이터베이스, 소프트웨어, 웹서비스, 개발/배포, 클라우드/인프라/보안, 시스템 장애/설정, 기술 지원
+- IT 무관: 연예, 주식/투자, 요리, 여행, 스포츠, 의료, 법률/정치, 일반 상식
+
+**2. query_type**: 다음 중 하나
+- repair: 문제 해결방법, 복구방법을 요청하는 문의
+- cause: 장애원인, 문제원인 분석을 요청하는 문의
+- similar: 유사사례, 비슷한 문제 사례를 요청하는 문의
+- default: 그 외의 모든 경우 (일반 문의, 설정 방법, 개념 설명 등)
+
+**3. service_name**: 질문에 언급된 구체적인 서비스/제품/시스템 이름 (영문 그대로, 없으면 null)
+
+**사용자 질문:** {query}
+
+**응답 형식:** {{"is_it_related": true, "query_type": "repair", "service_name": null}}
+"""
+        
+        try:
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="web_preflight",
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": "당신은 IT 질문을 분류하는 전문가입니다. 반드시 JSON 객체만 출력하세요."},
+                    {"role": "user", "content": preflight_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=100,
+                response_format={"type": "json_object"}
+            )
+            parsed = json.loads(response.choices[0].message.content)
+            
+            query_type = str(parsed.get('query_type') or 'default').strip().lower()
+            service_name = parsed.get('service_name')
+            if not isinstance(service_name, str) or not self.is_valid_service_name(service_name.strip()):
+                service_name = None
+            result = {
+                'is_it_related': parsed.get('is_it_related') is not False,
+                'query_type': query_type if query_type in QUERY_TYPES else 'default',
+                'service_name': service_name.strip() if service_name else None
+            }
+        except Exception as e:
+            # 구조화 출력 실패 시 기존 개별 호출로 판단 (결과는 캐시하지 않음)
+            print(f"DEBUG: preflight 통합 분석 실패, 개별 호출로 전환: {e}")
+            is_it_related = self.is_it_related_query(query)
+            return {
+                'is_it_related': is_it_related,
+                'query_type': self.classify_query_type_with_llm(query) if is_it_related else 'default',
+                'service_name': None
+            }
+        
+        with _preflight_cache_lock:
+            _preflight_cache[cache_key] = result
+            while len(_preflight_cache) > PREFLIGHT_CACHE_SIZE:
+                _preflight_cache.popitem(last=False)
+        return dict(result)
+    
     def show_non_it_response(self, query):
         """IT 관련이 아닌 질문에 대한 안내 메시지 표시"""
         non_it_response = f"""
@@ -124,7 +220,9 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
 **응답 형식:** repair, cause, similar, default 중 하나만 출력하세요.
 """
 
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="web_classify_query_type",
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": "당신은 IT 질문을 분류하는 전문가입니다. 주어진 질문을 정확히 분석하여 적절한 카테고리를 선택해주세요."},
@@ -191,7 +289,25 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
         
         return True
 
-    def _generate_web_search_response(self, query, target_service_name, query_type, type_labels):
+    def _collect_search_results(self, query, target_service_name, num_results, speculative_search=None):
+        """미리 시작한 웹 검색 결과 재사용 (서비스명이 달라졌거나 검색이 실패하면 다시 검색)"""
+        if speculative_search:
+            speculative_service_name, future = speculative_search
+            if speculative_service_name == target_service_name:
+                try:
+                    return future.result()[:num_results]
+                except Exception as e:
+                    print(f"DEBUG: 선행 웹 검색 실패, 다시 검색: {e}")
+            else:
+                future.cancel()
+        
+        return self.internet_search.search_google(
+            query, 
+            service_name=target_service_name, 
+            num_results=num_results
+        )
+    
+    def _generate_web_search_response(self, query, target_service_name, query_type, type_labels, speculative_search=None):
         """웹 검색 기반 응답 생성"""
         try:
             # 웹 검색 수행
@@ -200,10 +316,8 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
                 search_settings = self.config.get_search_quality_settings(query_type)
                 
                 # 웹 검색 실행
-                search_results = self.internet_search.search_google(
-                    query, 
-                    service_name=target_service_name, 
-                    num_results=search_settings['max_results']
+                search_results = self._collect_search_results(
+                    query, target_service_name, search_settings['max_results'], speculative_search
                 )
                 
                 if search_results:
@@ -331,7 +445,9 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
 
 답변:"""
 
-            response = self.azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                self.azure_openai_client,
+                caller="web_general_answer",
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -370,35 +486,39 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
     def process_query(self, query, query_type=None):
         """웹 검색 기반 쿼리 처리 (IT 관련 질문만 처리, 세션 분리)"""
         with st.chat_message("assistant"):
-            # 1단계: IT 관련 질문인지 먼저 확인
-            with st.spinner("🔍 질문 유형 검증 중..."):
-                if not self.is_it_related_query(query):
-                    # IT 관련이 아닌 경우 거부 메시지 표시 후 처리 중단
-                    self.show_non_it_response(query)
-                    return
+            # 서비스명 추출 (패턴 기반)
+            target_service_name = self.extract_service_name_from_query(query)
+            
+            # 사전 분석과 병렬로 웹 검색을 미리 시작 (IT 무관 질문으로 판단되면 결과는 사용하지 않음)
+            speculative_search = None
+            if self.internet_search.is_available():
+                speculative_search = (target_service_name, _search_executor.submit(
+                    self.internet_search.fetch_google_results, query, target_service_name, SPECULATIVE_SEARCH_RESULTS
+                ))
+            
+            # 1단계: IT 관련 여부 / 질문 유형 / 서비스명을 한 번의 LLM 호출로 판단
+            with st.spinner("🔍 질문 유형 분석 중..."):
+                preflight = self.preflight_query(query)
+            
+            if not preflight['is_it_related']:
+                if speculative_search:
+                    speculative_search[1].cancel()
+                # IT 관련이 아닌 경우 거부 메시지 표시 후 처리 중단
+                self.show_non_it_response(query)
+                return
             
-            # LLM 기반 쿼리 타입 자동 분류
             if query_type is None:
-                with st.spinner("🤖 질문 유형 분석 중..."):
-                    query_type = self.classify_query_type_with_llm(query)
-                    
-                    # 분류 결과 표시
-                    type_labels = {
-                        'repair': '🔧 문제 해결방법',
-                        'cause': '🔍 원인 분석',
-                        'similar': '📄 유사사례 참조', 
-                        'default': '📋 일반 문의'
-                    }
-            else:
-                type_labels = {
-                    'repair': '🔧 문제 해결방법',
-                    'cause': '🔍 원인 분석',
-                    'similar': '📄 유사사례 참조', 
-                    'default': '📋 일반 문의'
-                }
+                query_type = preflight['query_type']
             
-            # 서비스명 추출
-            target_service_name = self.extract_service_name_from_query(query)
+            type_labels = {
+                'repair': '🔧 문제 해결방법',
+                'cause': '🔍 원인 분석',
+                'similar': '📄 유사사례 참조', 
+                'default': '📋 일반 문의'
+            }
+            
+            # 패턴으로 찾지 못한 서비스명은 사전 분석 결과 사용
+            target_service_name = target_service_name or preflight['service_name']
             
             # SerpApi 설정 확인
             if not self.internet_search.is_available():
@@ -429,4 +549,4 @@ IT 기술 관련 질문으로 다시 문의해주시기 바랍니다.
                 return
             
             # 웹 검색 기반 응답 생성
-            self._generate_web_search_response(query, target_service_name, query_type, type_labels)
\ No newline at end of file
+            self._generate_web_search_response(query, target_service_name, query_type, type_labels, speculative_search)
\ No newline at end of file
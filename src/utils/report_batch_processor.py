@@ -0,0 +1,209 @@
+# utils/report_batch_processor.py - 복구보고(EML) 일괄 보고서 생성
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+def decode_zip_member_name(info: zipfile.ZipInfo) -> str:
+    """zip 항목 이름 복원 (UTF-8 플래그가 없으면 윈도우 압축기의 cp949 이름으로 해석)"""
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode('cp437').decode('cp949')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+def iter_eml_sources(source) -> Iterator[Tuple[str, bytes]]:
+    """zip(경로/bytes/파일 객체) 또는 디렉토리에서 (파일명, EML 원본) 순회"""
+    if isinstance(source, str) and os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                if filename.lower().endswith('.eml'):
+                    with open(os.path.join(root, filename), 'rb') as f:
+                        yield filename, f.read()
+        return
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = os.path.basename(decode_zip_member_name(info))
+            if name.lower().endswith('.eml'):
+                yield name, archive.read(info)
+
+class ReportBatchProcessor:
+    """EML 여러 건을 워커 풀로 처리하여 DOCX 보고서와 요약 매니페스트를 생성
+    
+    - 보고서 생성(파싱 → 정보 추출 → 템플릿 채우기)은 워커 풀에서 동시 실행
+    - 생성된 보고서의 Blob 업로드는 별도 업로드 풀에서 백그라운드로 진행
+    - 같은 원본 메일(SHA-256 동일)은 한 번만 처리
+    """
+    
+    def __init__(self, process_fn: Callable[[str, bytes], Tuple[str, Dict]],
+                 upload_fn: Optional[Callable[[str, str], Tuple[bool, Optional[str], Optional[str]]]] = None,
+                 max_workers: int = 4, upload_workers: int = 4,
+                 thread_initializer: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            process_fn: (파일명, EML 원본) -> (생성된 DOCX 임시 경로, 부가 정보). 실패 시 예외 발생
+            upload_fn: (DOCX 경로, 업로드 파일명) -> (성공 여부, URL, 오류)
+            max_workers: 보고서 생성 워커 수
+            upload_workers: 업로드 워커 수
+            thread_initializer: 워커 스레드 시작 시 호출 (실행 컨텍스트 연결용)
+        """
+        self.process_fn = process_fn
+        self.upload_fn = upload_fn
+        self.max_workers = max_workers
+        self.upload_workers = upload_workers
+        self.thread_initializer = thread_initializer
+    
+    @staticmethod
+    def _make_output_name(filename: str, used_names: set) -> str:
+        """출력 DOCX 파일명 (중복 시 번호 추가)"""
+        stem = os.path.splitext(filename)[0].strip() or "report"
+        candidate = f"{stem}.docx"
+        index = 2
+        while candidate in used_names:
+            candidate = f"{stem}_{index}.docx"
+            index += 1
+        used_names.add(candidate)
+        return candidate
+    
+    def _process_one(self, filename: str, content: bytes, output_path: str, upload_executor) -> Dict:
+        started_at = time.time()
+        report_path, info = self.process_fn(filename, content)
+        shutil.move(report_path, output_path)
+        
+        upload_future = None
+        if upload_executor is not None:
+            upload_future = upload_executor.submit(self.upload_fn, output_path, os.path.basename(output_path))
+        
+        return {'info': info or {}, 'elapsed': time.time() - started_at, 'upload_future': upload_future}
+    
+    def run(self, sources, output_dir: str,
+            progress_callback: Callable[[int, int, str], None] = None) -> Dict:
+        """
+        일괄 처리 실행
+        
+        Args:
+            sources: (파일명, EML 원본) 순회 객체 (iter_eml_sources 결과)
+            output_dir: DOCX 및 매니페스트 저장 디렉토리
+            progress_callback: (완료 수, 전체 수, 메시지) 콜백. 호출 스레드에서 실행됨
+        
+        Returns:
+            dict: 요약 매니페스트 (summary, items)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        started_at = time.time()
+        
+        items: List[Dict] = []
+        jobs = []
+        seen_hashes = {}
+        used_names = set()
+        
+        for filename, content in sources:
+            content_hash = hashlib.sha256(content).hexdigest()
+            item = {'file': filename, 'content_hash': content_hash, 'status': 'pending',
+                    'output': '', 'url': '', 'error': '', 'elapsed': 0.0}
+            items.append(item)
+            
+            if content_hash in seen_hashes:
+                item['status'] = 'duplicate'
+                item['error'] = f"중복 메일 ({seen_hashes[content_hash]})"
+                continue
+            seen_hashes[content_hash] = filename
+            
+            output_name = self._make_output_name(filename, used_names)
+            jobs.append((item, content, os.path.join(output_dir, output_name)))
+        
+        total = len(jobs)
+        completed = 0
+        if progress_callback:
+            progress_callback(0, total, f"처리 대상 {total}건 (중복 {len(items) - total}건 제외)")
+        
+        upload_executor = None
+        if self.upload_fn is not None:
+            upload_executor = ThreadPoolExecutor(max_workers=self.upload_workers,
+                                                 initializer=self.thread_initializer)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, initializer=self.thread_initializer) as executor:
+                futures = {
+                    executor.submit(self._process_one, item['file'], content, output_path, upload_executor): (item, output_path)
+                    for item, content, output_path in jobs
+                }
+                
+                for future in as_completed(futures):
+                    item, output_path = futures[future]
+                    try:
+                        result = future.result()
+                        item.update(result['info'])
+                        item['status'] = 'generated'
+                        item['output'] = os.path.basename(output_path)
+                        item['elapsed'] = round(result['elapsed'], 2)
+                        item['_upload_future'] = result['upload_future']
+                    except Exception as e:
+                        item['status'] = 'failed'
+                        item['error'] = str(e)
+                    
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total, item['file'])
+            
+            # 백그라운드 업로드 완료 대기
+            for item in items:
+                upload_future = item.pop('_upload_future', None)
+                if upload_future is None:
+                    continue
+                try:
+                    success, url, error = upload_future.result()
+                except Exception as e:
+                    success, url, error = False, None, str(e)
+                if success:
+                    item['status'] = 'uploaded'
+                    item['url'] = url
+                else:
+                    item['error'] = f"업로드 실패: {error}"
+        finally:
+            if upload_executor is not None:
+                upload_executor.shutdown(wait=True)
+        
+        manifest = {
+            'summary': {
+                'total_files': len(items),
+                'generated': sum(1 for item in items if item['status'] in ('generated', 'uploaded')),
+                'uploaded': sum(1 for item in items if item['status'] == 'uploaded'),
+                'failed': sum(1 for item in items if item['status'] == 'failed'),
+                'duplicates': sum(1 for item in items if item['status'] == 'duplicate'),
+                'elapsed_seconds': round(time.time() - started_at, 2)
+            },
+            'items': items
+        }
+        self.write_manifest(manifest, output_dir)
+        return manifest
+    
+    @staticmethod
+    def write_manifest(manifest: Dict, output_dir: str):
+        """manifest.json / manifest.csv 저장"""
+        with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+        
+        items = manifest['items']
+        if not items:
+            return
+        fieldnames = []
+        for item in items:
+            fieldnames.extend(key for key in item if key not in fieldnames)
+        with open(os.path.join(output_dir, 'manifest.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(items)
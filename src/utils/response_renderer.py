@@ -0,0 +1,286 @@
+# utils/response_renderer.py - LLM 응답 마커 구문 1회 파싱 및 표시용 변환 (HTML/조회 응답/표 데이터)
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 파싱 결과 캐시 크기 (응답 내용 해시 기준)
+RESPONSE_PARSE_CACHE_SIZE = 128
+
+# 박스 마커([CAUSE_BOX_START] 등)와 div 태그를 한 번에 찾는 토큰 패턴
+MARKUP_TOKEN_PATTERN = re.compile(
+    r'\[(?P<box_type>[A-Za-z]+(?:_[A-Za-z]+)*?)_BOX_(?P<box_edge>START|END)\]|(?P<div_open><div\b[^>]*>)|(?P<div_close></div>)',
+    re.IGNORECASE
+)
+
+# 조회(inquiry) 응답에서 제거할 HTML 박스 판별 키워드
+HTML_BOX_KEYWORDS = ['background:#e8f5e8', '복구방법', '장애원인', '🔧', '📋', '녹색']
+HTML_BOX_CLASS_PATTERN = re.compile(r'class="[^"]*(?:repair|cause)[^"]*"', re.IGNORECASE)
+
+# 조회 응답에서 건너뛸 복구방법 섹션 키워드
+REPAIR_SECTION_KEYWORDS = ['복구방법', '복구절차', '조치방법', '해결방법', '대응방법', '복구', '조치',
+                           '해결', '대응', '수정', '개선', 'repair', 'recovery', 'solution', 'fix']
+REPAIR_HEADING_KEYWORDS = ['복구방법', '조치방법', '해결방법']
+REPAIR_HEADING_LINES = {'복구방법', '복구방법:', '**복구방법**', '**복구방법:**'}
+
+LEFTOVER_MARKER_PATTERN = re.compile(r'\[.*?BOX.*?\]', re.IGNORECASE)
+MARKDOWN_TABLE_SEPARATOR_PATTERN = re.compile(r'\|[\s\-:]+\|')
+BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
+CAUSE_ITEM_PATTERN = re.compile(r'원인(\d+):\s*([^\n원]*(?:\n(?!원인\d+:)[^\n]*)*)', re.MULTILINE)
+
+
+def parse_cause_content(cause_content: str) -> List[Tuple[str, str]]:
+    """원인 컨텐츠 파싱 - (번호, HTML 강조 적용된 내용) 목록"""
+    matches = CAUSE_ITEM_PATTERN.findall(cause_content)
+    
+    if matches:
+        return [(num, BOLD_PATTERN.sub(r'<strong>\1</strong>', content.strip()))
+                for num, content in matches[:3] if content.strip()]
+    
+    lines = [line.strip() for line in cause_content.split('\n') if line.strip()]
+    bullet_lines = [line[1:].strip() if line.startswith(('•', '-', '*')) else line
+                    for line in lines if line][:3]
+    
+    return [(str(i+1), BOLD_PATTERN.sub(r'<strong>\1</strong>', content))
+            for i, content in enumerate(bullet_lines or [cause_content])]
+
+
+def create_info_box(content: str, title: str, icon: str) -> str:
+    """정보 박스 HTML 생성"""
+    return f"""<div style="background:#e8f5e8;border:1px solid #10b981;border-radius:8px;padding:15px;margin:15px 0;display:flex;align-items:flex-start;gap:12px;">
+<div style="background:#10b981;border-radius:50%;width:32px;height:32px;display:flex;align-items:center;justify-content:center;color:white;font-size:16px;flex-shrink:0;margin-top:2px;">{icon}</div>
+<div style="flex:1;"><h4 style="color:#065f46;margin:0 0 8px 0;font-size:16px;font-weight:bold;">{title}</h4>
+<div style="color:#065f46;line-height:1.5;font-size:14px;">{content}</div></div></div>"""
+
+
+def find_markdown_table_lines(lines: List[str]) -> List[str]:
+    """첫 번째 마크다운 표의 행 목록 (구분선 제외, 빈 줄/파이프 없는 줄에서 종료)"""
+    table_lines = []
+    in_table = False
+    
+    for line in lines:
+        line = line.strip()
+        
+        if '|' in line and len(line.split('|')) >= 3:
+            if MARKDOWN_TABLE_SEPARATOR_PATTERN.match(line):
+                continue
+            table_lines.append(line)
+            in_table = True
+        elif in_table and (not line or '|' not in line):
+            break
+    
+    return table_lines
+
+
+def parse_markdown_table(table_lines: List[str]) -> Optional[Dict[str, Any]]:
+    """표 행 목록을 {'headers', 'data'}로 변환 (헤더보다 셀이 1개까지 부족한 행은 빈 값으로 채움)"""
+    headers = None
+    parsed_data = []
+    
+    for i, line in enumerate(table_lines):
+        cells = [cell.strip() for cell in line.split('|') if cell.strip()]
+        if not cells:
+            continue
+        
+        if i == 0:
+            headers = cells
+        elif headers and len(cells) >= len(headers) - 1:
+            cells += [""] * (len(headers) - len(cells))
+            parsed_data.append(cells[:len(headers)])
+    
+    if headers and parsed_data:
+        return {'headers': headers, 'data': parsed_data}
+    return None
+
+
+class ParsedResponse:
+    """LLM 응답의 마커 구문 파싱 결과 (중간 표현)
+    
+    응답을 한 번 토큰화해 텍스트/박스 마커/div 블록 구간으로 나누고,
+    장애원인 HTML, 조회 응답 텍스트, 표 데이터 등 파생 결과는 처음 요청될 때 한 번만 계산한다.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text or ''
+        self.segments = self._tokenize(self.text)
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+    
+    @staticmethod
+    def _tokenize(text: str) -> List[Dict[str, Any]]:
+        """1회 스캔으로 구간 분리
+        
+        - text: 일반 텍스트
+        - box: [X_BOX_START] ~ 다음 [Y_BOX_END] (닫히지 않으면 끝까지, closed=False)
+        - box_end: 짝이 없는 [X_BOX_END]
+        - div: 중첩을 고려한 최상위 <div> ~ </div> 블록 (닫히지 않은 div는 텍스트로 취급)
+        """
+        segments = []
+        position = 0
+        open_box = None      # (시작 위치, 박스 타입, 내용 시작 위치)
+        div_start, div_depth = None, 0
+        
+        def add_text(end):
+            if end > position:
+                segments.append({'kind': 'text', 'raw': text[position:end]})
+        
+        for token in MARKUP_TOKEN_PATTERN.finditer(text):
+            box_edge = token.group('box_edge')
+            
+            if open_box is not None:
+                if box_edge and box_edge.upper() == 'END':
+                    start, box_type, inner_start = open_box
+                    segments.append({'kind': 'box', 'raw': text[start:token.end()], 'box_type': box_type.upper(),
+                                     'inner': text[inner_start:token.start()], 'closed': True})
+                    open_box = None
+                    position = token.end()
+                continue
+            
+            if div_depth:
+                if token.group('div_open'):
+                    div_depth += 1
+                elif token.group('div_close'):
+                    div_depth -= 1
+                    if div_depth == 0:
+                        segments.append({'kind': 'div', 'raw': text[div_start:token.end()]})
+                        position = token.end()
+                continue
+            
+            if box_edge:
+                add_text(token.start())
+                if box_edge.upper() == 'START':
+                    open_box = (token.start(), token.group('box_type'), token.end())
+                else:
+                    segments.append({'kind': 'box_end', 'raw': token.group(0), 'box_type': token.group('box_type').upper()})
+                position = token.end() if box_edge.upper() == 'END' else token.start()
+            elif token.group('div_open'):
+                add_text(token.start())
+                div_start, div_depth = token.start(), 1
+                position = token.start()
+        
+        if open_box is not None:
+            start, box_type, inner_start = open_box
+            segments.append({'kind': 'box', 'raw': text[start:], 'box_type': box_type.upper(),
+                             'inner': text[inner_start:], 'closed': False})
+        else:
+            add_text(len(text))
+        return segments
+    
+    def memoize(self, key: str, compute: Callable[[], Any]) -> Any:
+        """파생 결과를 한 번만 계산 (예: repair 탭 데이터)"""
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with self._memo_lock:
+            self._memo.setdefault(key, value)
+            return self._memo[key]
+    
+    @property
+    def lines(self) -> List[str]:
+        return self.memoize('lines', lambda: self.text.split('\n'))
+    
+    def has_box(self, box_type: str) -> bool:
+        return any(segment['kind'] == 'box' and segment['box_type'] == box_type for segment in self.segments)
+    
+    def cause_box_html(self) -> Tuple[str, bool]:
+        """첫 번째 장애원인 박스를 HTML로 변환한 텍스트와 변환 여부"""
+        return self.memoize('cause_box_html', self._render_cause_box_html)
+    
+    def _render_cause_box_html(self) -> Tuple[str, bool]:
+        parts = []
+        converted = False
+        for segment in self.segments:
+            if not converted and segment['kind'] == 'box' and segment['box_type'] == 'CAUSE' and segment['closed']:
+                parsed = parse_cause_content(segment['inner'].strip())
+                formatted = ''.join([f'<li key="cause-{num}" style="margin-bottom:8px;line-height:1.5;"><strong>원인{num}:</strong> {c}</li>'
+                                     for num, c in parsed])
+                content = f'<ul style="margin:0;padding-left:20px;list-style-type:none;">{formatted}</ul>'
+                parts.append(create_info_box(content, '장애원인', '📋'))
+                converted = True
+            else:
+                parts.append(segment['raw'])
+        return ''.join(parts), converted
+    
+    def inquiry_text(self) -> str:
+        """조회(inquiry) 응답 표시용 텍스트 - 박스/HTML 박스/복구방법 섹션 제거"""
+        return self.memoize('inquiry_text', self._render_inquiry_text)
+    
+    @staticmethod
+    def _is_html_box(raw: str) -> bool:
+        return any(keyword in raw for keyword in HTML_BOX_KEYWORDS) or bool(HTML_BOX_CLASS_PATTERN.search(raw))
+    
+    def _render_inquiry_text(self) -> str:
+        # 짝이 없는 장애원인 닫는 마커가 있으면 그 이전 내용은 박스 내용으로 간주해 제거
+        # (다른 박스의 짝 없는 닫는 마커는 마커만 제거)
+        start = 0
+        for index, segment in enumerate(self.segments):
+            if segment['kind'] == 'box_end' and segment['box_type'] == 'CAUSE':
+                start = index + 1
+        
+        kept = []
+        for segment in self.segments[start:]:
+            if segment['kind'] == 'text' or (segment['kind'] == 'div' and not self._is_html_box(segment['raw'])):
+                kept.append(segment['raw'])
+        
+        # 복구방법 섹션 제거 - 섹션 헤더 감지 상태와 소제목 감지 상태를 한 줄씩 함께 적용
+        output_lines = []
+        skip_section = False
+        skip_heading = False
+        for line in ''.join(kept).split('\n'):
+            line_stripped = line.strip()
+            line_lower = line_stripped.lower()
+            
+            if any(keyword in line_lower for keyword in REPAIR_SECTION_KEYWORDS):
+                if (line_stripped.startswith(('**', '#')) or line_stripped.endswith(':') or
+                        '복구방법:' in line_lower or '조치방법:' in line_lower):
+                    skip_section = True
+                    continue
+            
+            if (line_stripped.startswith(('#', '##', 'Case', '|', '1.')) or
+                    (line_stripped.startswith('**') and not any(kw in line_lower for kw in REPAIR_SECTION_KEYWORDS))):
+                skip_section = False
+            
+            if skip_section or line_stripped in REPAIR_HEADING_LINES:
+                continue
+            
+            if any(keyword in line_lower for keyword in REPAIR_HEADING_KEYWORDS):
+                if line_stripped.endswith(':') or '**' in line_stripped:
+                    skip_heading = True
+                    continue
+            
+            if line_stripped.startswith(('1.', '2.', '3.', 'Case', '|')) or '장애 ID' in line_stripped:
+                skip_heading = False
+            
+            if not skip_heading:
+                output_lines.append(line)
+        
+        result = LEFTOVER_MARKER_PATTERN.sub('', '\n'.join(output_lines))
+        return re.sub(r'\n{3,}', '\n\n', result).strip()
+    
+    def inquiry_table_data(self) -> Optional[Dict[str, Any]]:
+        """조회 응답 텍스트의 첫 번째 마크다운 표 데이터 (엑셀 다운로드용, 없으면 None)"""
+        return self.memoize('inquiry_table_data', lambda: parse_markdown_table(
+            find_markdown_table_lines(self.inquiry_text().split('\n'))
+        ))
+
+
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+def parse_response(text: str) -> ParsedResponse:
+    """응답 파싱 결과 (내용 해시 기준 LRU 캐시)"""
+    cache_key = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+    with _parse_cache_lock:
+        parsed = _parse_cache.get(cache_key)
+        if parsed is not None:
+            _parse_cache.move_to_end(cache_key)
+            return parsed
+    
+    parsed = ParsedResponse(text)
+    with _parse_cache_lock:
+        _parse_cache[cache_key] = parsed
+        while len(_parse_cache) > RESPONSE_PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return parsed
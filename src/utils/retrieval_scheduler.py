@@ -0,0 +1,125 @@
+# utils/retrieval_scheduler.py - 필터 통과율 기반 점진적 검색 (적응형 top_k)
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Dict
+
+# 점진적 검색 설정 (환경변수로 조정)
+RETRIEVAL_TARGET_RESULTS = int(os.getenv("RETRIEVAL_TARGET_RESULTS", "15"))
+RETRIEVAL_ANOMALY_TARGET_RESULTS = int(os.getenv("RETRIEVAL_ANOMALY_TARGET_RESULTS", "5"))
+RETRIEVAL_ANOMALY_MAX_RESULTS = int(os.getenv("RETRIEVAL_ANOMALY_MAX_RESULTS", "20"))
+RETRIEVAL_MIN_PAGE = int(os.getenv("RETRIEVAL_MIN_PAGE", "10"))
+RETRIEVAL_SAFETY_FACTOR = float(os.getenv("RETRIEVAL_SAFETY_FACTOR", "1.5"))
+RETRIEVAL_MIN_OBSERVATIONS = int(os.getenv("RETRIEVAL_MIN_OBSERVATIONS", "5"))
+
+# 전체 목록/건수가 필요한 질문 유형은 점진적 검색 없이 기존 top_k로 한 번에 조회
+RETRIEVAL_FULL_DEPTH_QUERY_TYPES = {'inquiry', 'statistics'}
+
+# 헤지(대체 검색 선행 실행) 설정 - 주 검색이 최근 지연시간 p90을 넘기면 대체 검색을 병렬로 시작
+SEARCH_HEDGED_FALLBACK = os.getenv("SEARCH_HEDGED_FALLBACK", "true").lower() == "true"
+HEDGE_LATENCY_PERCENTILE = float(os.getenv("HEDGE_LATENCY_PERCENTILE", "0.9"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "3.0"))
+HEDGE_LATENCY_WINDOW = int(os.getenv("HEDGE_LATENCY_WINDOW", "200"))
+
+# 통과율 지수이동평균 가중치 / 통과율 하한 (0에 가까우면 페이지 크기가 발산)
+PASS_RATE_EWMA_ALPHA = 0.2
+MIN_PASS_RATE = 0.05
+
+
+class AdaptiveRetrievalScheduler:
+    """질문 유형별 필터 통과율을 학습해 검색 페이지 크기를 결정
+    
+    - 학습 전(관측 수 부족): 기존과 같은 크기로 한 번에 조회하면서 통과율만 기록
+    - 학습 후: 목표 건수 / 예상 통과율 만큼만 첫 페이지로 조회하고,
+      필터 통과 건수가 목표에 못 미치면 남은 건수 / 관측 통과율 만큼 다음 페이지(skip) 조회
+    """
+    
+    def __init__(self, min_page: int = RETRIEVAL_MIN_PAGE, safety_factor: float = RETRIEVAL_SAFETY_FACTOR,
+                 min_observations: int = RETRIEVAL_MIN_OBSERVATIONS):
+        self.min_page = min_page
+        self.safety_factor = safety_factor
+        self.min_observations = min_observations
+        self._policies = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+    
+    def _page_size_for(self, needed: int, pass_rate: float, remaining: int) -> int:
+        size = math.ceil(needed / max(pass_rate, MIN_PASS_RATE) * self.safety_factor)
+        return max(min(max(size, self.min_page), remaining), 0)
+    
+    def first_page_size(self, policy_key: str, max_results: int, target: int, default_page: int) -> int:
+        """첫 페이지 크기 (학습 전에는 default_page)"""
+        with self._lock:
+            policy = self._policies.get(policy_key)
+            if not policy or policy['searches'] < self.min_observations:
+                return min(default_page, max_results)
+            pass_rate = policy['pass_rate']
+        return self._page_size_for(target, pass_rate, max_results)
+    
+    def next_page_size(self, policy_key: str, fetched: int, qualified: int, max_results: int, target: int) -> int:
+        """다음 페이지 크기 (0이면 조회 종료)"""
+        if qualified >= target or fetched >= max_results:
+            return 0
+        
+        if qualified:
+            pass_rate = qualified / fetched
+        else:
+            # 아직 통과 문서가 없으면 학습된 통과율의 절반으로 보수적으로 추정
+            with self._lock:
+                policy = self._policies.get(policy_key)
+                pass_rate = policy['pass_rate'] / 2 if policy else MIN_PASS_RATE
+        return self._page_size_for(target - qualified, pass_rate, max_results - fetched)
+    
+    def record(self, policy_key: str, fetched: int, qualified: int, pages: int):
+        """검색 1회의 필터 통계 기록 (통과율 지수이동평균 갱신)"""
+        if fetched <= 0:
+            return
+        
+        pass_rate = qualified / fetched
+        with self._lock:
+            policy = self._policies.get(policy_key)
+            if policy is None:
+                policy = self._policies[policy_key] = {
+                    'pass_rate': pass_rate, 'searches': 0, 'fetched': 0, 'qualified': 0, 'pages': 0
+                }
+            else:
+                policy['pass_rate'] += PASS_RATE_EWMA_ALPHA * (pass_rate - policy['pass_rate'])
+            policy['searches'] += 1
+            policy['fetched'] += fetched
+            policy['qualified'] += qualified
+            policy['pages'] += pages
+    
+    def record_latency(self, latency_key: str, seconds: float):
+        """검색 지연시간 기록 (최근 HEDGE_LATENCY_WINDOW건 유지)"""
+        with self._lock:
+            samples = self._latencies.get(latency_key)
+            if samples is None:
+                samples = self._latencies[latency_key] = deque(maxlen=HEDGE_LATENCY_WINDOW)
+            samples.append(seconds)
+    
+    def hedge_delay(self, latency_key: str) -> float:
+        """대체 검색을 선행 시작할 대기 시간 (최근 지연시간의 p90, 관측 부족 시 기본값)"""
+        with self._lock:
+            samples = sorted(self._latencies.get(latency_key) or [])
+        if len(samples) < self.min_observations:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        index = min(int(math.ceil(len(samples) * HEDGE_LATENCY_PERCENTILE)) - 1, len(samples) - 1)
+        return samples[max(index, 0)]
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(policy, avg_fetched=round(policy['fetched'] / policy['searches'], 1))
+                    for key, policy in self._policies.items()}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_retrieval_scheduler() -> AdaptiveRetrievalScheduler:
+    """프로세스 공용 점진적 검색 스케줄러"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AdaptiveRetrievalScheduler()
+        return _scheduler
@@ -2,10 +2,44 @@ import streamlit as st
 import re
 import math
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from config.settings_local import AppConfigLocal
 from utils.filter_manager import DocumentFilterManager, FilterConditions, QueryType
+from utils.llm_gateway import get_llm_gateway
+from utils.incident_record import IncidentRecord
+from utils.incident_feature_store import (
+    TEXT_REPLACEMENTS, get_incident_feature_store, normalize_text_for_similarity,
+    extract_semantic_keywords, text_bigrams, jaccard_similarity
+)
+from utils.retrieval_scheduler import (
+    RETRIEVAL_TARGET_RESULTS, RETRIEVAL_ANOMALY_TARGET_RESULTS, RETRIEVAL_ANOMALY_MAX_RESULTS,
+    RETRIEVAL_FULL_DEPTH_QUERY_TYPES, SEARCH_HEDGED_FALLBACK, get_retrieval_scheduler
+)
+
+# 1단계(후보 검색)에서 가져오는 필드 - 필터링/재정렬에 사용하는 필드만
+SEARCH_CANDIDATE_FIELDS = [
+    "incident_id", "service_name", "error_time", "effect", "symptom",
+    "error_date", "week", "daynight", "root_cause", "incident_repair",
+    "cause_type", "done_type", "incident_grade", "owner_depart", "year", "month"
+]
+# 2단계(최종 문서 본문 조회)에서 가져오는 필드 - 답변 생성/화면 표시에만 사용
+SEARCH_BODY_FIELDS = ["incident_plan", "repair_notice"]
+SEARCH_ALL_FIELDS = SEARCH_CANDIDATE_FIELDS + SEARCH_BODY_FIELDS
+
+# 질문 유형별 2단계 조회 필드 (통계는 건수/분포만 사용하므로 본문 조회 생략)
+QUERY_TYPE_BODY_FIELDS = {
+    'statistics': []
+}
+
+# 2단계 조회 사용 여부 (false면 기존처럼 모든 필드를 한 번에 조회)
+SEARCH_TWO_PHASE_FETCH = os.getenv("SEARCH_TWO_PHASE_FETCH", "true").lower() == "true"
+
+# 대체 검색 헤지 실행용 (대체 검색은 streamlit 세션 상태를 사용하지 않으므로 워커 스레드에서 실행 가능)
+_hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedged_search")
 
 class SearchManagerLocal:
     """Vector 하이브리드 검색 관리 클래스 - 두 개의 인덱스 지원"""
@@ -45,6 +79,7 @@ class SearchManagerLocal:
         self._service_file_cache_loaded = False
         
         self.rrf_k = getattr(config, 'rrf_k', 60)
+        self.two_phase_fetch = SEARCH_TWO_PHASE_FETCH
         
         # 통계 쿼리 동의어 매핑
         self.statistics_synonyms = {
@@ -53,11 +88,10 @@ class SearchManagerLocal:
         }
         
         # 텍스트 정규화 매핑
-        self.text_replacements = {
-            'ㄱ': 'ㄱ', 'ㄴ': 'ㄴ', 'ㄷ': 'ㄷ', 'ㄹ': 'ㄹ', 'ㅁ': 'ㅁ',
-            'ㅂ': 'ㅂ', 'ㅅ': 'ㅅ', 'ㅇ': 'ㅇ', 'ㅈ': 'ㅈ', 'ㅊ': 'ㅊ',
-            'ㅋ': 'ㅋ', 'ㅌ': 'ㅌ', 'ㅍ': 'ㅍ', 'ㅎ': 'ㅎ'
-        }
+        self.text_replacements = TEXT_REPLACEMENTS
+        
+        # 재정렬용 문서/질문 특징 저장소 (프로세스 공용)
+        self.feature_store = get_incident_feature_store()
         
         # 일반 용어 서비스 정의
         self.COMMON_TERM_SERVICES = {
@@ -71,10 +105,13 @@ class SearchManagerLocal:
             'URL': ['url', 'link', '링크', 'Uniform Resource Locator']
         }
 
-    def semantic_search_with_adaptive_filtering_dual_index(self, query, target_service_name=None, query_type="default"):
+    def semantic_search_with_adaptive_filtering_dual_index(self, query, target_service_name=None, query_type="default",
+                                                           on_incidents_empty=None):
         """
         두 개의 인덱스(장애내역 + 이상징후내역)를 검색하여 결과를 병합
         
+        Args:
+            on_incidents_empty: 장애내역 검색 결과가 비었을 때 이상징후 검색 전에 호출할 함수
         Returns:
             dict: {'incidents': [...], 'anomalies': [...]}
         """
@@ -83,6 +120,9 @@ class SearchManagerLocal:
                 query, target_service_name, query_type
             ) or []
             
+            if not incidents and on_incidents_empty:
+                on_incidents_empty()
+            
             anomalies = self._search_from_client(
                 self.search_client_2, query, target_service_name, query_type
             ) or []
@@ -101,6 +141,59 @@ class SearchManagerLocal:
             traceback.print_exc()
             return {'incidents': [], 'anomalies': []}
     
+    def semantic_search_with_hedged_fallback(self, query, target_service_name=None, query_type="default"):
+        """
+        두 인덱스 검색 + 대체 검색(search_documents_fallback) 헤지 실행
+        
+        주 검색이 최근 지연시간 p90 안에 끝나지 않거나 장애내역 검색 결과가 비면 대체 검색을 병렬로 시작한다.
+        주 검색 결과가 있으면 대체 검색은 취소(미시작 시)하거나 결과를 버리고, 없을 때만 대체 검색 결과를 사용한다.
+        
+        Returns:
+            dict: {'incidents': [...], 'anomalies': [...], 'fallback': [...]}
+        """
+        scheduler = get_retrieval_scheduler()
+        latency_key = f"dual_index:{query_type}"
+        launch = threading.Event()
+        cancelled = threading.Event()
+        
+        def run_fallback(delay):
+            # 지연 시간이 지나거나 launch 신호를 받으면 시작 (그 전에 주 검색이 성공하면 시작하지 않음)
+            if not launch.wait(delay):
+                print(f"DEBUG: [HEDGE] Primary search exceeded {delay:.2f}s, starting fallback search in parallel")
+            if cancelled.is_set():
+                return None
+            return self.search_documents_fallback(query, target_service_name)
+        
+        fallback_future = None
+        if SEARCH_HEDGED_FALLBACK:
+            fallback_future = _hedge_executor.submit(run_fallback, scheduler.hedge_delay(latency_key))
+        
+        start_time = time.time()
+        # 장애내역 결과가 비면 이상징후 검색과 동시에 대체 검색 시작
+        search_results = self.semantic_search_with_adaptive_filtering_dual_index(
+            query, target_service_name, query_type, on_incidents_empty=launch.set
+        )
+        incidents = search_results.get('incidents', [])
+        anomalies = search_results.get('anomalies', [])
+        
+        scheduler.record_latency(latency_key, time.time() - start_time)
+        
+        if incidents or anomalies:
+            cancelled.set()
+            launch.set()
+            return {'incidents': incidents, 'anomalies': anomalies, 'fallback': []}
+        
+        if fallback_future is None:
+            return {'incidents': [], 'anomalies': [], 'fallback': self.search_documents_fallback(query, target_service_name)}
+        
+        launch.set()
+        try:
+            fallback = fallback_future.result() or []
+        except Exception as e:
+            print(f"ERROR: hedged fallback search failed: {e}")
+            fallback = []
+        return {'incidents': [], 'anomalies': [], 'fallback': fallback}
+    
     def _search_from_client(self, client, query, target_service_name=None, query_type="default", top_k=15):
         """특정 search client를 사용하여 검색 수행"""
         try:
@@ -121,28 +214,36 @@ class SearchManagerLocal:
                 enhanced_query = self._add_service_conditions(enhanced_query, target_service_name)
             
             actual_top_k = 10 if is_anomaly else top_k
-            
-            results = client.search(
-                search_text=enhanced_query, top=actual_top_k, include_total_count=True,
-                select=["incident_id", "service_name", "error_time", "effect", "symptom", "repair_notice",
-                       "error_date", "week", "daynight", "root_cause", "incident_repair", "incident_plan",
-                       "cause_type", "done_type", "incident_grade", "owner_depart", "year", "month"]
-            )
-            
-            # ★★★ 수정: None 필터링 추가 (incident_id 누락 문서 제외) ★★★
-            documents = []
-            none_count = 0
-            for result in results:
-                doc = self._convert_search_result_to_document(result)
-                if doc is not None:
-                    documents.append(doc)
-                else:
-                    none_count += 1
-            
-            if none_count > 0:
-                print(f"⚠️ WARNING: incident_id 누락으로 {none_count}개 문서 제외됨")
-            
-            print(f"✅ 검색 완료: {len(documents)}개 문서 변환 성공")
+            full_depth = not is_anomaly or query_type in RETRIEVAL_FULL_DEPTH_QUERY_TYPES
+            
+            two_phase = self.two_phase_fetch
+            
+            def fetch_page(page_size, skip):
+                search_params = {
+                    "search_text": enhanced_query, "top": page_size, "include_total_count": True,
+                    "select": SEARCH_CANDIDATE_FIELDS if two_phase else SEARCH_ALL_FIELDS
+                }
+                if skip:
+                    search_params["skip"] = skip
+                results = client.search(**search_params)
+                
+                # ★★★ 수정: None 필터링 추가 (incident_id 누락 문서 제외) ★★★
+                documents = []
+                none_count = 0
+                for result in results:
+                    doc = self._convert_search_result_to_document(result)
+                    if doc is not None:
+                        if two_phase:
+                            doc['_body_pending'] = True
+                        documents.append(doc)
+                    else:
+                        none_count += 1
+                
+                if none_count > 0:
+                    print(f"⚠️ WARNING: incident_id 누락으로 {none_count}개 문서 제외됨")
+                
+                print(f"✅ 검색 완료: {len(documents)}개 문서 변환 성공")
+                return documents
             
             if is_anomaly:
                 thresholds = self.config.get_dynamic_thresholds(query_type, query, is_anomaly=True)
@@ -150,6 +251,16 @@ class SearchManagerLocal:
                 reranker_threshold = thresholds.get('reranker_threshold', 2.5)
                 
                 print(f"DEBUG: [ANOMALY] Applying strict thresholds - search: {search_threshold}, reranker: {reranker_threshold}")
+            
+            query_type_enum = self._convert_to_query_type_enum(query_type)
+            enable_llm = is_anomaly
+            
+            def filter_documents(documents):
+                if not is_anomaly:
+                    filtered_docs, _ = self.filter_manager.apply_comprehensive_filtering(
+                        documents, query, query_type_enum, enable_llm_validation=enable_llm
+                    )
+                    return filtered_docs
                 
                 filtered_by_score = []
                 for doc in documents:
@@ -163,20 +274,22 @@ class SearchManagerLocal:
                     elif self.debug_mode:
                         print(f"DEBUG: [ANOMALY] Filtered out - search_score: {search_score:.3f}, reranker_score: {reranker_score:.3f}")
                 
-                documents = filtered_by_score
-                print(f"DEBUG: [ANOMALY] After score filtering: {len(documents)} documents")
-            
-            query_type_enum = self._convert_to_query_type_enum(query_type)
-            enable_llm = is_anomaly
+                print(f"DEBUG: [ANOMALY] After score filtering: {len(filtered_by_score)} documents")
+                
+                filtered_docs, _ = self.filter_manager.apply_comprehensive_filtering(
+                    filtered_by_score, query, query_type_enum, enable_llm_validation=enable_llm
+                )
+                print(f"DEBUG: [ANOMALY] After comprehensive filtering: {len(filtered_docs)} documents")
+                return filtered_docs
             
-            filtered_docs, _ = self.filter_manager.apply_comprehensive_filtering(
-                documents, query, query_type_enum, enable_llm_validation=enable_llm
+            # 이상징후 인덱스는 필터 통과 건수가 부족할 때만 다음 페이지 조회 (최대 RETRIEVAL_ANOMALY_MAX_RESULTS건)
+            _, filtered_docs = self._progressive_retrieve(
+                f"{'anomaly' if is_anomaly else 'client'}:{query_type}", fetch_page, filter_documents,
+                max_results=actual_top_k if full_depth else RETRIEVAL_ANOMALY_MAX_RESULTS,
+                target=RETRIEVAL_ANOMALY_TARGET_RESULTS, default_page=actual_top_k, full_depth=full_depth
             )
             
-            if is_anomaly:
-                print(f"DEBUG: [ANOMALY] After comprehensive filtering: {len(filtered_docs)} documents")
-            
-            return filtered_docs
+            return self._fetch_document_bodies(client, filtered_docs, query_type)
         except Exception as e:
             print(f"ERROR: _search_from_client failed: {e}")
             import traceback
@@ -365,13 +478,6 @@ class SearchManagerLocal:
                 except Exception as e:
                     print(f"[LLM_EXPANSION] ❌ Expansion failed: {e}, using original query")
             
-            # expanded_query를 사용하여 검색 (기존 query 대신)
-            documents = self._execute_vector_hybrid_search(expanded_query, target_service_name, query_type, top_k)
-            
-            
-            if not documents:
-                return []
-            
             query_type_enum = self._convert_to_query_type_enum(query_type)
             conditions = self.filter_manager.extract_all_conditions(query, query_type_enum)
             
@@ -383,30 +489,86 @@ class SearchManagerLocal:
                 conditions.service_name = target_service_name
                 conditions.is_common_service = self.is_common_term_service(target_service_name)[0]
             
-            filtered_documents, filter_history = self.filter_manager.apply_comprehensive_filtering(
-                documents, query, query_type_enum, conditions=conditions
+            # expanded_query를 사용하여 검색 (기존 query 대신)
+            # 필터 통과 건수가 목표에 못 미칠 때만 다음 페이지 조회 (목록/통계 질문은 top_k 전체를 한 번에 조회)
+            documents, filtered_documents = self._progressive_retrieve(
+                f"hybrid:{query_type}",
+                lambda page_size, skip: self._execute_vector_hybrid_search(
+                    expanded_query, target_service_name, query_type, top_k, page_size, skip
+                ),
+                lambda docs: self.filter_manager.apply_comprehensive_filtering(
+                    docs, query, query_type_enum, conditions=conditions
+                )[0],
+                max_results=top_k, target=RETRIEVAL_TARGET_RESULTS, default_page=top_k,
+                full_depth=query_type in RETRIEVAL_FULL_DEPTH_QUERY_TYPES
             )
             
+            if not documents:
+                return []
+            
             if len(filtered_documents) == 0 and len(documents) > 0:
                 print(f"WARNING: Vector filtering removed all documents! Returning top results")
                 sorted_docs = sorted(documents, key=lambda d: d.get('hybrid_score', 0) or 0, reverse=True)
                 filtered_documents = sorted_docs[:15]
             
-            return filtered_documents
+            return self._fetch_document_bodies(self.search_client, filtered_documents, query_type)
             
         except Exception as e:
             print(f"DEBUG: Vector hybrid search error: {e}")
             return self._fallback_to_original_search(query, target_service_name, query_type, top_k//2)
 
-    def _execute_vector_hybrid_search(self, query, target_service_name, query_type, top_k):
-        """벡터 하이브리드 검색 실행 - RAG 데이터 무결성 보장"""
+    def _progressive_retrieve(self, policy_key, fetch_page, filter_documents, max_results, target, default_page, full_depth=False):
+        """점진적 검색 - 필터 통과 건수가 목표에 못 미칠 때만 다음 페이지(skip) 조회
+        
+        Args:
+            policy_key: 통과율 학습 단위 (검색 경로:질문 유형)
+            fetch_page: (page_size, skip) -> 문서 목록
+            filter_documents: 지금까지 조회한 문서 목록 -> 필터 통과 문서 목록
+            full_depth: True면 max_results 만큼 한 번에 조회
+        Returns:
+            (조회한 전체 문서 목록, 필터 통과 문서 목록)
+        """
+        scheduler = get_retrieval_scheduler()
+        page_size = max_results if full_depth else scheduler.first_page_size(policy_key, max_results, target, default_page)
+        
+        documents = []
+        filtered_documents = []
+        fetched = 0
+        pages = 0
+        
+        while page_size > 0:
+            page = fetch_page(page_size, fetched)
+            pages += 1
+            fetched += len(page)
+            
+            # 페이지별 RRF 점수는 전체 순위 기준으로 계산되므로 합친 뒤 다시 정렬하면 한 번에 조회한 결과와 같은 순서
+            documents.extend(page)
+            if pages > 1:
+                documents.sort(key=lambda d: d.get('hybrid_score', 0), reverse=True)
+            
+            filtered_documents = filter_documents(documents) if documents else []
+            
+            if full_depth or len(page) < page_size:
+                break
+            page_size = scheduler.next_page_size(policy_key, fetched, len(filtered_documents), max_results, target)
+        
+        scheduler.record(policy_key, fetched, len(filtered_documents), pages)
+        print(f"DEBUG: [PROGRESSIVE] {policy_key} - {pages} page(s), fetched {fetched}, qualified {len(filtered_documents)}")
+        
+        return documents, filtered_documents
+    
+    def _execute_vector_hybrid_search(self, query, target_service_name, query_type, top_k, page_size=None, skip=0):
+        """벡터 하이브리드 검색 실행 - RAG 데이터 무결성 보장
+        
+        top_k는 전체 검색 깊이(벡터 k 계산용), page_size/skip은 이번에 조회할 페이지
+        """
         try:
             vector_config = self.config.get_vector_search_config(query_type)
             search_mode = self.config.get_search_mode_for_query(query_type, query)
             
             query_vector = self.embedding_client.get_embedding(query)
             if not query_vector:
-                return self._execute_text_only_search(query, target_service_name, query_type, top_k)
+                return self._execute_text_only_search(query, target_service_name, query_type, top_k, page_size, skip)
             
             search_methods = {
                 "vector_primary": self._execute_vector_primary_search,
@@ -415,17 +577,19 @@ class SearchManagerLocal:
             }
             
             search_method = search_methods.get(search_mode, self._execute_balanced_hybrid_search)
-            documents = search_method(query, query_vector, target_service_name, vector_config, top_k)
+            documents = search_method(query, query_vector, target_service_name, vector_config, top_k, page_size, skip)
             
-            documents = self._apply_rrf_scoring_and_normalization(documents, vector_config)
+            documents = self._apply_rrf_scoring_and_normalization(documents, vector_config, rank_offset=skip)
             
             return documents
             
         except Exception as e:
             print(f"ERROR: Vector hybrid search execution failed: {e}")
+            if skip:
+                return []
             return self._fallback_to_original_search(query, target_service_name, query_type, top_k)
 
-    def _execute_balanced_hybrid_search(self, query, query_vector, target_service_name, vector_config, top_k):
+    def _execute_balanced_hybrid_search(self, query, query_vector, target_service_name, vector_config, top_k, page_size=None, skip=0):
         """균형잡힌 하이브리드 검색"""
         try:
             enhanced_query = self._build_enhanced_query(query, target_service_name)
@@ -440,7 +604,7 @@ class SearchManagerLocal:
             results = self._execute_search_with_params(
                 enhanced_query, vector_queries, 
                 "semantic" if vector_config.get('use_semantic_reranker', True) else "simple",
-                top_k, "any"
+                page_size or top_k, "any", skip
             )
             
             return self._process_search_results(results, "Hybrid")
@@ -449,7 +613,7 @@ class SearchManagerLocal:
             print(f"ERROR: Balanced hybrid search failed: {e}")
             return []
     
-    def _execute_vector_primary_search(self, query, query_vector, target_service_name, vector_config, top_k):
+    def _execute_vector_primary_search(self, query, query_vector, target_service_name, vector_config, top_k, page_size=None, skip=0):
         """벡터 검색 우선 모드"""
         try:
             vector_queries = [{
@@ -462,7 +626,7 @@ class SearchManagerLocal:
             basic_query = self._build_basic_query(query, target_service_name)
             
             results = self._execute_search_with_params(
-                basic_query if basic_query else "*", vector_queries, "semantic", top_k, "any"
+                basic_query if basic_query else "*", vector_queries, "semantic", page_size or top_k, "any", skip
             )
             
             return self._process_search_results(results, "Vector Primary")
@@ -471,7 +635,7 @@ class SearchManagerLocal:
             print(f"ERROR: Vector primary search failed: {e}")
             return []
     
-    def _execute_text_primary_search(self, query, query_vector, target_service_name, vector_config, top_k):
+    def _execute_text_primary_search(self, query, query_vector, target_service_name, vector_config, top_k, page_size=None, skip=0):
         """텍스트 검색 우선 모드"""
         try:
             enhanced_query = self._build_enhanced_query(query, target_service_name)
@@ -484,8 +648,8 @@ class SearchManagerLocal:
             }] if query_vector else None
             
             results = self._execute_search_with_params(
-                enhanced_query, vector_queries, "simple", top_k, 
-                "any" if vector_queries else "all"
+                enhanced_query, vector_queries, "simple", page_size or top_k, 
+                "any" if vector_queries else "all", skip
             )
             
             return self._process_search_results(results, "Text Primary")
@@ -494,13 +658,13 @@ class SearchManagerLocal:
             print(f"ERROR: Text primary search failed: {e}")
             return []
     
-    def _execute_text_only_search(self, query, target_service_name, query_type, top_k):
+    def _execute_text_only_search(self, query, target_service_name, query_type, top_k, page_size=None, skip=0):
         """텍스트 전용 검색"""
         try:
             enhanced_query = self._build_enhanced_query(query, target_service_name)
             
             results = self._execute_search_with_params(
-                enhanced_query, None, "semantic", top_k, "all"
+                enhanced_query, None, "semantic", page_size or top_k, "all", skip
             )
             
             return self._process_search_results(results, "Text-only fallback")
@@ -509,21 +673,19 @@ class SearchManagerLocal:
             print(f"ERROR: Text-only search failed: {e}")
             return []
     
-    def _execute_search_with_params(self, search_text, vector_queries, query_type, top_k, search_mode="any"):
+    def _execute_search_with_params(self, search_text, vector_queries, query_type, top_k, search_mode="any", skip=0):
         """공통 검색 실행 로직"""
         search_params = {
             "search_text": search_text,
             "top": top_k,
             "search_mode": search_mode,
             "include_total_count": True,
-            "select": [
-                "incident_id", "service_name", "error_time", "effect", "symptom", 
-                "repair_notice", "error_date", "week", "daynight", "root_cause", 
-                "incident_repair", "incident_plan", "cause_type", "done_type", 
-                "incident_grade", "owner_depart", "year", "month"
-            ]
+            "select": SEARCH_CANDIDATE_FIELDS if self.two_phase_fetch else SEARCH_ALL_FIELDS
         }
         
+        if skip:
+            search_params["skip"] = skip
+        
         if vector_queries:
             search_params["vector_queries"] = vector_queries
             
@@ -541,6 +703,7 @@ class SearchManagerLocal:
         """검색 결과 처리 (incident_id 검증 강화)"""
         documents = []
         none_count = 0
+        two_phase = self.two_phase_fetch
         for i, result in enumerate(results):
             if i < 5:
                 print(f"DEBUG: {search_type} Result {i+1}: ID={result.get('incident_id')}, "
@@ -549,6 +712,8 @@ class SearchManagerLocal:
             
             doc = self._convert_search_result_to_document(result)
             if doc is not None:
+                if two_phase:
+                    doc['_body_pending'] = True
                 documents.append(doc)
             else:
                 none_count += 1
@@ -558,6 +723,67 @@ class SearchManagerLocal:
         
         return documents
     
+    def _fetch_document_bodies(self, client, documents, query_type="default"):
+        """2단계: 최종 선택된 문서의 본문 필드를 incident_id 기준 한 번의 조회로 채움"""
+        pending = [doc for doc in documents if doc.get('_body_pending')]
+        if not pending:
+            return documents
+        
+        fields = QUERY_TYPE_BODY_FIELDS.get(query_type, SEARCH_BODY_FIELDS)
+        if not fields:
+            return documents
+        
+        incident_ids = list(dict.fromkeys(str(doc['incident_id']) for doc in pending))
+        id_list = '|'.join(incident_id.replace("'", "''") for incident_id in incident_ids)
+        
+        try:
+            results = client.search(
+                search_text="*", filter=f"search.in(incident_id, '{id_list}', '|')",
+                select=["incident_id"] + fields, top=len(incident_ids)
+            )
+            bodies = {str(result.get("incident_id")): result for result in results}
+        except Exception as e:
+            # 키 조회를 지원하지 않는 인덱스 - 이번 문서는 건별로 조회하고, 이후 검색은 모든 필드를 한 번에 조회
+            print(f"⚠️ WARNING: 문서 본문 일괄 조회 실패, 전체 필드 조회로 전환: {e}")
+            self.two_phase_fetch = False
+            bodies = self._fetch_document_bodies_individually(client, incident_ids)
+        
+        for doc in pending:
+            body = bodies.get(str(doc['incident_id']))
+            if body is not None:
+                for field in fields:
+                    value = body.get(field)
+                    doc[field] = value if value is not None else ""
+            doc.pop('_body_pending', None)
+        
+        if self.debug_mode:
+            print(f"DEBUG: 문서 본문 조회 완료 - {len(bodies)}/{len(incident_ids)}건, 필드: {fields}")
+        
+        return documents
+    
+    def _fetch_document_bodies_individually(self, client, incident_ids):
+        """일괄 조회 실패 시 문서 본문을 건별로 조회 (문서 키 조회 → incident_id 검색, 전체 필드)"""
+        bodies = {}
+        for incident_id in incident_ids:
+            try:
+                result = client.get_document(key=incident_id, selected_fields=SEARCH_ALL_FIELDS)
+                if str(result.get("incident_id")) != incident_id:
+                    raise LookupError("incident_id is not the document key")
+            except Exception:
+                try:
+                    results = client.search(
+                        search_text=f'"{incident_id}"', search_fields=["incident_id"],
+                        select=SEARCH_ALL_FIELDS, top=5
+                    )
+                    result = next((r for r in results if str(r.get("incident_id")) == incident_id), None)
+                except Exception as e:
+                    print(f"⚠️ WARNING: 문서 본문 조회 실패 (incident_id: {incident_id}): {e}")
+                    result = None
+            
+            if result is not None:
+                bodies[incident_id] = result
+        return bodies
+    
     def _convert_search_result_to_document(self, result):
         """RAG 원본 데이터 절대 보존 - 단일 구현 (incident_id 검증 강화)"""
         
@@ -579,7 +805,7 @@ class SearchManagerLocal:
             "owner_depart", "year", "month"
         ]
         
-        doc = {}
+        doc = IncidentRecord()
         for field in base_fields:
             value = result.get(field)
             if value is not None:
@@ -626,8 +852,8 @@ class SearchManagerLocal:
             print(f"WARNING: Failed to parse error_time: {error_time_raw}, using 0")
             return 0
     
-    def _apply_rrf_scoring_and_normalization(self, documents, vector_config):
-        """RRF 스코어링 및 정규화"""
+    def _apply_rrf_scoring_and_normalization(self, documents, vector_config, rank_offset=0):
+        """RRF 스코어링 및 정규화 (rank_offset: 페이지 조회 시 앞 페이지까지의 문서 수)"""
         if not documents:
             return documents
         
@@ -636,7 +862,7 @@ class SearchManagerLocal:
                 search_score = doc.get('score', 0) or 0
                 reranker_score = doc.get('reranker_score', 0) or 0
                 
-                rrf_score = 1.0 / (self.rrf_k + i + 1)
+                rrf_score = 1.0 / (self.rrf_k + rank_offset + i + 1)
                 
                 vector_weight = vector_config.get('vector_weight', 0.5)
                 text_weight = vector_config.get('text_weight', 0.5)
@@ -872,17 +1098,16 @@ class SearchManagerLocal:
         return keywords
     
     def calculate_keyword_relevance_score(self, query, document):
-        """키워드 기반 관련성 점수 계산"""
-        query_keywords = self.extract_query_keywords(query)
-        doc_text = ' '.join([document.get(f, '') for f in 
-                           ['service_name', 'symptom', 'effect', 'root_cause', 'incident_repair']]).lower()
+        """키워드 기반 관련성 점수 계산 (질문 키워드/문서 텍스트는 특징 저장소에서 재사용)"""
+        query_keywords = self.feature_store.get_query_features(query, self.extract_query_keywords)['query_keywords']
+        doc_text = self.feature_store.get_document_features(document)['relevance_text']
         
         score = 0
         keyword_weights = [('service_keywords', 40), ('symptom_keywords', 35), 
                           ('action_keywords', 15), ('time_keywords', 10)]
         
         for key, weight in keyword_weights:
-            if any(k.lower() in doc_text for k in query_keywords[key]):
+            if any(k in doc_text for k in query_keywords[key]):
                 score += weight
         
         return min(score, 100)
@@ -911,45 +1136,11 @@ class SearchManagerLocal:
     
     def _normalize_text_for_similarity(self, text):
         """텍스트를 의미적 유사성 비교를 위해 정규화"""
-        if not text:
-            return ""
-        
-        normalized = re.sub(r'\s+', '', text.lower())
-        
-        for old, new in self.text_replacements.items():
-            normalized = normalized.replace(old, new)
-        
-        return normalized
+        return normalize_text_for_similarity(text)
     
     def _extract_semantic_keywords(self, text):
         """텍스트에서 의미적 키워드 추출"""
-        if not text:
-            return []
-        
-        keyword_patterns = [
-            r'(\w+)(불가|실패|에러|오류|지연|느림)', r'(\w+)(가입|등록|신청)',
-            r'(\w+)(결제|구매|주문)', r'(\w+)(접속|연결|로그인)',
-            r'(\w+)(조회|검색|확인)', r'(\w+)(발송|전송|송신)',
-            r'(보험|가입|결제|접속|로그인|조회|검색|주문|구매|발송|전송|문자|SMS|OTP|API)(\w*)',
-            r'(앱|웹|사이트|페이지|시스템|서비스)(\w*)',
-            r'\b(보험|가입|불가|실패|에러|오류|지연|접속|로그인|결제|구매|주문|조회|검색|발송|전송|문자|SMS|OTP|API)\b'
-        ]
-        
-        keywords = set()
-        text_normalized = self._normalize_text_for_similarity(text)
-        
-        for pattern in keyword_patterns:
-            matches = re.findall(pattern, text_normalized, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    keywords.update([m for m in match if m and len(m) >= 2])
-                elif match and len(match) >= 2:
-                    keywords.add(match)
-        
-        nouns = re.findall(r'[가-힣]{2,}', text)
-        keywords.update([self._normalize_text_for_similarity(n) for n in nouns if len(n) >= 2])
-        
-        return list(keywords)
+        return extract_semantic_keywords(text)
     
     def get_effect_patterns_from_rag(self):
         """RAG 데이터에서 effect 패턴 목록 가져오기 (캐시 활용)"""
@@ -1025,39 +1216,27 @@ class SearchManagerLocal:
         if not text1 or not text2:
             return 0
         
-        bigrams1 = set([text1[i:i+2] for i in range(len(text1)-1)])
-        bigrams2 = set([text2[i:i+2] for i in range(len(text2)-1)])
-        
-        if not bigrams1 or not bigrams2:
-            return 0
-        
-        intersection = len(bigrams1.intersection(bigrams2))
-        union = len(bigrams1.union(bigrams2))
-        
-        return intersection / union if union > 0 else 0
+        return jaccard_similarity(text_bigrams(text1), text_bigrams(text2))
     
     def _boost_semantic_documents(self, documents, query):
-        """의미적 유사성이 높은 문서들의 점수 부스팅"""
-        query_normalized = self._normalize_text_for_similarity(query)
-        query_keywords = set(self._extract_semantic_keywords(query))
+        """의미적 유사성이 높은 문서들의 점수 부스팅 (사전 계산된 특징으로 집합 연산만 수행)"""
+        query_features = self.feature_store.get_query_features(query)
+        query_bigrams = query_features['bigrams']
+        query_keywords = query_features['semantic_keywords']
         
         for doc in documents:
-            effect = doc.get('effect', '')
-            symptom = doc.get('symptom', '')
+            features = self.feature_store.get_document_features(doc)
             
             max_similarity = 0
             
-            if effect:
-                effect_normalized = self._normalize_text_for_similarity(effect)
-                effect_similarity = self._calculate_text_similarity(query_normalized, effect_normalized)
-                effect_keywords = set(self._extract_semantic_keywords(effect))
-                keyword_overlap = len(query_keywords.intersection(effect_keywords))
+            if features['has_effect']:
+                effect_similarity = jaccard_similarity(query_bigrams, features['effect_bigrams'])
+                keyword_overlap = len(query_keywords & features['effect_keywords'])
                 effect_similarity += keyword_overlap * 0.1
                 max_similarity = max(max_similarity, effect_similarity)
             
-            if symptom:
-                symptom_normalized = self._normalize_text_for_similarity(symptom)
-                symptom_similarity = self._calculate_text_similarity(query_normalized, symptom_normalized)
+            if features['has_symptom']:
+                symptom_similarity = jaccard_similarity(query_bigrams, features['symptom_bigrams'])
                 max_similarity = max(max_similarity, symptom_similarity)
             
             if max_similarity > 0.3:
@@ -1417,9 +1596,7 @@ class SearchManagerLocal:
             
             results = self.search_client.search(
                 search_text=enhanced_query, top=top_k, include_total_count=True,
-                select=["incident_id", "service_name", "error_time", "effect", "symptom", "repair_notice",
-                       "error_date", "week", "daynight", "root_cause", "incident_repair", "incident_plan",
-                       "cause_type", "done_type", "incident_grade", "owner_depart", "year", "month"]
+                select=SEARCH_ALL_FIELDS
             )
             
             # ★★★ 수정: None 필터링 추가 ★★★
@@ -1457,9 +1634,7 @@ class SearchManagerLocal:
             
             results = self.search_client.search(
                 search_text=search_query, top=top_k, include_total_count=True,
-                select=["incident_id", "service_name", "error_time", "effect", "symptom", "repair_notice",
-                       "error_date", "week", "daynight", "root_cause", "incident_repair", "incident_plan",
-                       "cause_type", "done_type", "incident_grade", "owner_depart", "year", "month"]
+                select=SEARCH_ALL_FIELDS
             )
             
             documents = []
@@ -1603,7 +1778,9 @@ class SearchManagerLocal:
 이제 위 질의에 대해 분석해주세요:'''
 
         try:
-            response = azure_openai_client.chat.completions.create(
+            response = get_llm_gateway().chat_completion(
+                azure_openai_client,
+                caller="semantic_expansion",
                 model=model_name,
                 messages=[
                     {
@@ -0,0 +1,250 @@
+# utils/seasonality_data.py - 시즌성 분석 데이터 계층 (CSV → 컬럼형 캐시)
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+SEASONALITY_CSV_PATH = "./data/csv/seasonality.csv"
+SEASONALITY_CACHE_DIR = os.getenv("SEASONALITY_CACHE_DIR", "./data/cache/seasonality")
+
+# 캐시 형식이 바뀌면 올려서 기존 캐시를 무효화
+SEASONALITY_CACHE_VERSION = 1
+
+WEEKDAY_LABELS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 숫자 컬럼: 컬럼명 → dtype
+NUMERIC_COLUMNS = {
+    'error_date': 'int32',   # 1970-01-01 기준 일수
+    'year': 'int16',
+    'month': 'int8',
+    'day': 'int8',
+    'weekday': 'int8',       # 0=월요일, 6=일요일
+    'service_code': 'int32',
+    'daynight_code': 'int8',
+}
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class SeasonalityDataStore:
+    """시즌성 CSV의 컬럼형 캐시
+    
+    - 원본 CSV를 한 번 파싱하여 컬럼별 .npy(서비스/주야는 코드 + 카테고리 목록)로 저장
+    - 원본의 수정시각/크기가 같으면 해시 계산 없이 캐시 사용, 수정시각만 바뀐 경우 SHA-256으로 내용 비교
+    - 컬럼은 mmap으로 로드하므로 재실행 시 파싱 비용이 없다
+    """
+    
+    def __init__(self, csv_path: str = SEASONALITY_CSV_PATH, cache_dir: str = SEASONALITY_CACHE_DIR):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir
+        self.meta_path = os.path.join(cache_dir, "meta.json")
+        self._lock = threading.Lock()
+    
+    def get_source_signature(self) -> Dict[str, int]:
+        """원본 파일 시그니처 (캐시 키 확인용, 해시 계산 없음)"""
+        stat = os.stat(self.csv_path)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_meta(self, meta: Dict[str, Any], target_dir: str = None):
+        meta_path = os.path.join(target_dir or self.cache_dir, "meta.json")
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    
+    def ensure_cache(self) -> Dict[str, Any]:
+        """캐시가 최신인지 확인하고 필요하면 재생성, 메타 정보 반환"""
+        with self._lock:
+            signature = self.get_source_signature()
+            meta = self._read_meta()
+            
+            if meta and meta.get('version') == SEASONALITY_CACHE_VERSION:
+                if meta['source_mtime_ns'] == signature['mtime_ns'] and meta['source_size'] == signature['size']:
+                    return meta
+                
+                # 수정시각만 바뀌고 내용이 같으면 시그니처만 갱신
+                if meta['source_size'] == signature['size'] and meta['source_sha256'] == file_sha256(self.csv_path):
+                    meta['source_mtime_ns'] = signature['mtime_ns']
+                    self._write_meta(meta)
+                    return meta
+            
+            return self._build_cache(signature)
+    
+    def _build_cache(self, signature: Dict[str, int]) -> Dict[str, Any]:
+        """CSV 파싱 후 컬럼형 캐시 생성 (임시 디렉토리에 쓰고 교체)"""
+        source_sha256 = file_sha256(self.csv_path)
+        raw = pd.read_csv(self.csv_path, dtype={'service': str, 'daynight': str})
+        error_date = pd.to_datetime(raw['error_date'], errors='coerce')
+        
+        valid = error_date.notna().to_numpy()
+        dropped_rows = int((~valid).sum())
+        if dropped_rows:
+            print(f"[SEASONALITY] 날짜를 해석할 수 없는 {dropped_rows}개 행 제외")
+        raw = raw[valid]
+        error_date = error_date[valid]
+        
+        if 'daynight' not in raw.columns:
+            raw['daynight'] = ''
+        service_codes, services = pd.factorize(raw['service'].fillna('').str.strip(), sort=True)
+        daynight_codes, daynights = pd.factorize(raw['daynight'].fillna('').str.strip(), sort=True)
+        
+        columns = {
+            'error_date': error_date.to_numpy(dtype='datetime64[D]').astype('int64'),
+            'year': error_date.dt.year.to_numpy(),
+            'month': error_date.dt.month.to_numpy(),
+            'day': error_date.dt.day.to_numpy(),
+            'weekday': error_date.dt.weekday.to_numpy(),
+            'service_code': service_codes,
+            'daynight_code': daynight_codes,
+        }
+        
+        temp_dir = f"{self.cache_dir}.tmp"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+        for name, dtype in NUMERIC_COLUMNS.items():
+            np.save(os.path.join(temp_dir, f"{name}.npy"), np.ascontiguousarray(columns[name], dtype=dtype))
+        
+        meta = {
+            'version': SEASONALITY_CACHE_VERSION,
+            'source_path': os.path.abspath(self.csv_path),
+            'source_mtime_ns': signature['mtime_ns'],
+            'source_size': signature['size'],
+            'source_sha256': source_sha256,
+            'row_count': int(len(raw)),
+            'services': [str(service) for service in services],
+            'daynights': [str(daynight) for daynight in daynights],
+        }
+        self._write_meta(meta, temp_dir)
+        
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_dir)), exist_ok=True)
+        os.replace(temp_dir, self.cache_dir)
+        print(f"[SEASONALITY] 컬럼형 캐시 생성: {meta['row_count']}행, 서비스 {len(services)}개 ({source_sha256[:12]})")
+        return meta
+    
+    def load_columns(self) -> Dict[str, Any]:
+        """컬럼 배열(mmap, 읽기 전용)과 카테고리 목록 반환"""
+        meta = self.ensure_cache()
+        columns = {
+            name: np.load(os.path.join(self.cache_dir, f"{name}.npy"), mmap_mode='r')
+            for name in NUMERIC_COLUMNS
+        }
+        columns['services'] = meta['services']
+        columns['daynights'] = meta['daynights']
+        columns['source_sha256'] = meta['source_sha256']
+        return columns
+
+
+class SeasonalityCube:
+    """서비스 × 월 × 일 오류 건수 큐브
+    
+    - counts[년도, 서비스, 월, 일], weekday_counts[년도, 서비스, 요일], daynight_counts[년도, 서비스, 주야]
+    - 한 번 집계해 두면 서비스/년도 선택 변경은 배열 슬라이싱과 합계로 처리 (데이터프레임 재필터링 없음)
+    - 년도/서비스 인자가 None이면 해당 축 전체 합계
+    """
+    
+    def __init__(self, columns: Dict[str, Any]):
+        self.services: List[str] = list(columns['services'])
+        self.daynights: List[str] = list(columns['daynights'])
+        self.source_sha256 = columns.get('source_sha256', '')
+        self._service_index = {service: idx for idx, service in enumerate(self.services)}
+        
+        year = np.asarray(columns['year'], dtype='int64')
+        self.years: List[int] = [int(value) for value in np.unique(year)]
+        year_idx = np.searchsorted(np.asarray(self.years, dtype='int64'), year)
+        service_idx = np.asarray(columns['service_code'], dtype='int64')
+        month_idx = np.asarray(columns['month'], dtype='int64') - 1
+        day_idx = np.asarray(columns['day'], dtype='int64') - 1
+        weekday = np.asarray(columns['weekday'], dtype='int64')
+        daynight_idx = np.asarray(columns['daynight_code'], dtype='int64')
+        
+        n_years, n_services, n_daynights = len(self.years), len(self.services), len(self.daynights)
+        year_service = year_idx * n_services + service_idx
+        
+        self.counts = np.bincount((year_service * 12 + month_idx) * 31 + day_idx,
+                                  minlength=n_years * n_services * 12 * 31
+                                  ).reshape(n_years, n_services, 12, 31).astype(np.int32)
+        self.weekday_counts_by_year = np.bincount(year_service * 7 + weekday,
+                                                  minlength=n_years * n_services * 7
+                                                  ).reshape(n_years, n_services, 7).astype(np.int32)
+        self.daynight_counts_by_year = np.bincount(year_service * n_daynights + daynight_idx,
+                                                   minlength=n_years * n_services * n_daynights
+                                                   ).reshape(n_years, n_services, n_daynights).astype(np.int32)
+        
+        # 자주 쓰는 전체 기간 합계는 미리 계산
+        self.all_years = self.counts.sum(axis=0)                      # [서비스, 월, 일]
+        self.service_month = self.all_years.sum(axis=2)               # [서비스, 월]
+        self.total = int(self.service_month.sum())
+    
+    @classmethod
+    def from_store(cls, store: SeasonalityDataStore) -> 'SeasonalityCube':
+        return cls(store.load_columns())
+    
+    @property
+    def has_daynight(self) -> bool:
+        return any(self.daynights)
+    
+    def service_index(self, service: str) -> int:
+        return self._service_index[service]
+    
+    def _year_slice(self, array: np.ndarray, year: Optional[int]) -> np.ndarray:
+        if year is None:
+            return array.sum(axis=0)
+        if year not in self.years:
+            return np.zeros(array.shape[1:], dtype=np.int32)
+        return array[self.years.index(year)]
+    
+    def month_day_counts(self, service: Optional[str] = None, year: Optional[int] = None) -> np.ndarray:
+        """월 × 일 건수 (12 × 31)"""
+        cube = self.all_years if year is None else self._year_slice(self.counts, year)
+        if service is None:
+            return cube.sum(axis=0)
+        return cube[self.service_index(service)]
+    
+    def monthly_counts(self, service: Optional[str] = None, year: Optional[int] = None) -> np.ndarray:
+        """월별 건수 (12)"""
+        if year is None:
+            service_month = self.service_month
+            return service_month.sum(axis=0) if service is None else service_month[self.service_index(service)]
+        return self.month_day_counts(service, year).sum(axis=1)
+    
+    def daily_counts(self, service: Optional[str] = None, month: Optional[int] = None) -> np.ndarray:
+        """일별 건수 (31), month가 없으면 전체 월 합계"""
+        month_day = self.month_day_counts(service)
+        return month_day.sum(axis=0) if month is None else month_day[month - 1]
+    
+    def weekday_counts(self, service: Optional[str] = None, year: Optional[int] = None) -> np.ndarray:
+        """요일별 건수 (7, 0=월요일)"""
+        counts = self._year_slice(self.weekday_counts_by_year, year)
+        return counts.sum(axis=0) if service is None else counts[self.service_index(service)]
+    
+    def daynight_counts(self, service: Optional[str] = None, year: Optional[int] = None) -> Dict[str, int]:
+        """주간/야간 구분별 건수"""
+        counts = self._year_slice(self.daynight_counts_by_year, year)
+        counts = counts.sum(axis=0) if service is None else counts[self.service_index(service)]
+        return {label: int(count) for label, count in zip(self.daynights, counts)}
+    
+    def service_month_counts(self, month: int) -> np.ndarray:
+        """특정 월의 서비스별 건수 (전체 기간)"""
+        return self.service_month[:, month - 1]
+    
+    def service_day_counts(self, month: int, day: int) -> np.ndarray:
+        """특정 월-일의 서비스별 건수 (전체 기간)"""
+        return self.all_years[:, month - 1, day - 1]
+    
+    def service_totals(self) -> np.ndarray:
+        """서비스별 전체 건수"""
+        return self.service_month.sum(axis=1)
@@ -0,0 +1,315 @@
+# utils/seasonality_forecast.py - 서비스별 시즌성 예측 엔진 (전체 서비스 일괄 NumPy 연산)
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+MODEL_NAMES = ["seasonal_naive", "decomposition", "holt_winters"]
+
+# Holt-Winters 파라미터 후보 (alpha, beta, gamma) - 서비스별로 학습 오차가 가장 작은 조합 선택
+HOLT_WINTERS_GRID = [
+    (alpha, beta, gamma)
+    for alpha in (0.2, 0.5)
+    for beta in (0.0, 0.1)
+    for gamma in (0.1, 0.3)
+]
+
+# 신뢰수준별 정규분포 양측 z값
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600}
+
+def _moving_average(series: np.ndarray, window: int) -> np.ndarray:
+    """축 1 방향 중심 이동평균 (짝수 창은 2×창 이동평균), 양 끝은 NaN"""
+    n_series, length = series.shape
+    result = np.full((n_series, length), np.nan)
+    if window <= 1:
+        return series.astype(float)
+    
+    weights = np.ones(window) / window
+    if window % 2 == 0:
+        weights = np.convolve(weights, [0.5, 0.5])
+    span = len(weights)
+    if length < span:
+        return result
+    
+    offset = span // 2
+    cumulative = np.zeros((n_series, length - span + 1))
+    for k, weight in enumerate(weights):
+        cumulative += weight * series[:, k:length - span + 1 + k]
+    result[:, offset:offset + cumulative.shape[1]] = cumulative
+    return result
+
+class SeasonalForecaster:
+    """여러 서비스의 시계열을 한 번에 학습/예측하는 시즌성 예측기
+    
+    - 계절 나이브, 고전적 가법 분해, Holt-Winters(가법) 3가지 모델을 [서비스, 시점] 배열 단위로 계산
+    - 마지막 구간(한 주기 이내)을 떼어 낸 백테스트에서 MAE가 가장 작은 모델을 서비스별로 선택
+    - 예측구간은 선택 모델의 오차 RMSE(학습 잔차/백테스트 중 큰 값) × √(예측 시점 거리)로 계산
+    - 시계열이 두 주기보다 짧으면 계절 성분 없이(주기 1) 예측
+    """
+    
+    def __init__(self, period: int, confidence: float = 0.9):
+        self.period = period
+        self.z_score = Z_SCORES.get(confidence, 1.6449)
+    
+    def _seasonal_naive(self, y: np.ndarray, period: int, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_series, length = y.shape
+        fitted = np.full((n_series, length), np.nan)
+        fitted[:, period:] = y[:, :-period]
+        steps = np.arange(horizon)
+        forecast = y[:, length - period + (steps % period)]
+        return fitted, forecast.astype(float)
+    
+    def _decomposition(self, y: np.ndarray, period: int, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_series, length = y.shape
+        window = period if period > 1 else min(3, length)
+        trend = _moving_average(y, window)
+        
+        seasonal = np.zeros((n_series, length))
+        if period > 1:
+            detrended = y - trend
+            valid = ~np.isnan(detrended)
+            position = np.arange(length) % period
+            indices = np.zeros((n_series, period))
+            for p in range(period):
+                mask = valid[:, position == p]
+                values = np.where(mask, detrended[:, position == p], 0.0)
+                indices[:, p] = values.sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+            indices -= indices.mean(axis=1, keepdims=True)
+            seasonal = indices[:, position]
+        
+        # 마지막 추세값과 최근 기울기로 추세 외삽
+        valid_trend = ~np.isnan(trend[0]) if n_series else np.zeros(length, dtype=bool)
+        trend_positions = np.flatnonzero(valid_trend)
+        if len(trend_positions) == 0:
+            level = y.mean(axis=1)
+            slope = np.zeros(n_series)
+            last_position = length - 1
+        else:
+            last_position = trend_positions[-1]
+            level = trend[:, last_position]
+            lookback = trend_positions[-min(len(trend_positions), max(period, 2)):]
+            if len(lookback) > 1:
+                slope = (trend[:, lookback[-1]] - trend[:, lookback[0]]) / (lookback[-1] - lookback[0])
+            else:
+                slope = np.zeros(n_series)
+        
+        fitted = trend + seasonal
+        steps = np.arange(1, horizon + 1)
+        future_positions = (length - 1 + steps) % period if period > 1 else np.zeros(horizon, dtype=int)
+        future_seasonal = (indices[:, future_positions] if period > 1 else np.zeros((n_series, horizon)))
+        forecast = level[:, None] + slope[:, None] * (length - 1 - last_position + steps) + future_seasonal
+        return fitted, forecast
+    
+    def _holt_winters(self, y: np.ndarray, period: int, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_series, length = y.shape
+        grid = np.array(HOLT_WINTERS_GRID)
+        if period == 1:
+            grid[:, 2] = 0.0
+        n_grid = len(grid)
+        
+        # [파라미터 조합 × 서비스] 배치로 동시 계산
+        batch = np.tile(y.astype(float), (n_grid, 1))
+        alpha = np.repeat(grid[:, 0], n_series)
+        beta = np.repeat(grid[:, 1], n_series)
+        gamma = np.repeat(grid[:, 2], n_series)
+        
+        init_span = period if period > 1 else 1
+        level = batch[:, :init_span].mean(axis=1)
+        if length >= 2 * init_span:
+            trend = (batch[:, init_span:2 * init_span].mean(axis=1) - level) / init_span
+        else:
+            trend = np.zeros(len(batch))
+        season = batch[:, :init_span] - level[:, None] if period > 1 else np.zeros((len(batch), 1))
+        
+        fitted = np.full(batch.shape, np.nan)
+        for t in range(length):
+            s = t % period
+            fitted[:, t] = level + trend + season[:, s]
+            new_level = alpha * (batch[:, t] - season[:, s]) + (1 - alpha) * (level + trend)
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            season[:, s] = gamma * (batch[:, t] - new_level) + (1 - gamma) * season[:, s]
+            level = new_level
+        
+        # 초기화 구간을 제외한 학습 오차로 서비스별 파라미터 선택
+        warmup = min(init_span, length - 1)
+        errors = ((fitted[:, warmup:] - batch[:, warmup:]) ** 2).sum(axis=1).reshape(n_grid, n_series)
+        best = errors.argmin(axis=0)
+        rows = best * n_series + np.arange(n_series)
+        
+        steps = np.arange(1, horizon + 1)
+        future_positions = (length - 1 + steps) % period
+        forecast = (level[rows, None] + trend[rows, None] * steps
+                    + season[rows][:, future_positions])
+        fitted = fitted[rows]
+        fitted[:, :warmup] = np.nan
+        return fitted, forecast
+    
+    def _run_models(self, y: np.ndarray, period: int, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        """전체 모델 적합값 [모델, 서비스, 시점]과 예측값 [모델, 서비스, horizon]"""
+        results = [
+            self._seasonal_naive(y, period, horizon),
+            self._decomposition(y, period, horizon),
+            self._holt_winters(y, period, horizon),
+        ]
+        return np.stack([result[0] for result in results]), np.stack([result[1] for result in results])
+    
+    def fit_predict(self, series: np.ndarray, horizon: int) -> Dict[str, np.ndarray]:
+        """
+        전체 서비스 시계열 학습 및 예측
+        
+        Args:
+            series: [서비스, 시점] 건수 배열
+            horizon: 예측할 시점 수 (마지막 관측 이후)
+        
+        Returns:
+            dict: point/lower/upper [서비스, horizon], model [서비스], sigma [서비스]
+        """
+        y = np.asarray(series, dtype=float)
+        n_series, length = y.shape
+        horizon = max(int(horizon), 1)
+        
+        if n_series == 0 or length == 0:
+            empty = np.zeros((n_series, horizon))
+            return {'point': empty, 'lower': empty, 'upper': empty,
+                    'model': np.full(n_series, 'seasonal_naive', dtype=object), 'sigma': np.zeros(n_series)}
+        
+        period = self.period if length >= 2 * self.period else 1
+        if length < 2:
+            point = np.repeat(y[:, -1:], horizon, axis=1)
+            return {'point': point, 'lower': np.zeros_like(point), 'upper': point * 2,
+                    'model': np.full(n_series, 'seasonal_naive', dtype=object), 'sigma': np.zeros(n_series)}
+        
+        fitted, forecasts = self._run_models(y, period, horizon)    # [모델, 서비스, 시점/horizon]
+        
+        # 마지막 구간을 떼어 낸 백테스트로 서비스별 모델 선택 (표본 외 MAE)
+        holdout = max(1, min(period if period > 1 else 4, length // 4))
+        train = y[:, :-holdout]
+        train_period = period if train.shape[1] >= 2 * period else 1
+        if train.shape[1] >= 2:
+            _, backtest = self._run_models(train, train_period, holdout)
+            backtest_errors = np.clip(backtest, 0, None) - y[None, :, -holdout:]
+            mae = np.abs(backtest_errors).mean(axis=2)
+        else:
+            backtest_errors = np.zeros((len(MODEL_NAMES), n_series, 1))
+            mae = np.zeros((len(MODEL_NAMES), n_series))
+        best = mae.argmin(axis=0)
+        service_idx = np.arange(n_series)
+        
+        # 예측구간: 학습 잔차와 백테스트 오차 중 큰 쪽의 RMSE
+        point = np.clip(forecasts[best, service_idx], 0, None)
+        residuals = fitted[best, service_idx] - y
+        residual_count = np.maximum((~np.isnan(residuals)).sum(axis=1), 1)
+        residuals = np.where(np.isnan(residuals), 0.0, residuals)
+        sigma = np.maximum(np.sqrt((residuals ** 2).sum(axis=1) / residual_count),
+                           np.sqrt((backtest_errors[best, service_idx] ** 2).mean(axis=1)))
+        
+        spread = self.z_score * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))[None, :]
+        return {
+            'point': point,
+            'lower': np.clip(point - spread, 0, None),
+            'upper': point + spread,
+            'model': np.array(MODEL_NAMES, dtype=object)[best],
+            'sigma': sigma,
+        }
+
+def build_monthly_series(columns: Dict[str, Any], as_of: date) -> Tuple[np.ndarray, int]:
+    """서비스별 월 건수 시계열 [서비스, 월]과 마지막 관측 월 인덱스(년*12+월-1)
+    
+    기준일이 속한 달은 진행 중이므로 제외 (데이터가 그 이전에 끝나면 데이터 마지막 달까지)
+    """
+    month_index = np.asarray(columns['year'], dtype='int64') * 12 + np.asarray(columns['month'], dtype='int64') - 1
+    service_code = np.asarray(columns['service_code'], dtype='int64')
+    n_services = len(columns['services'])
+    if len(month_index) == 0:
+        return np.zeros((n_services, 0)), as_of.year * 12 + as_of.month - 2
+    
+    start = int(month_index.min())
+    end = min(as_of.year * 12 + as_of.month - 2, int(month_index.max()))
+    end = max(end, start)
+    length = end - start + 1
+    
+    mask = month_index <= end
+    series = np.bincount(service_code[mask] * length + (month_index[mask] - start),
+                         minlength=n_services * length).reshape(n_services, length)
+    return series, end
+
+def build_weekly_series(columns: Dict[str, Any], as_of: date) -> Tuple[np.ndarray, int]:
+    """서비스별 주(월요일 시작) 건수 시계열 [서비스, 주]과 마지막 관측 주 인덱스"""
+    # 1970-01-01은 목요일이므로 +3일 하면 월요일 기준 주 인덱스
+    week_index = (np.asarray(columns['error_date'], dtype='int64') + 3) // 7
+    service_code = np.asarray(columns['service_code'], dtype='int64')
+    n_services = len(columns['services'])
+    current_week = ((as_of - date(1970, 1, 1)).days + 3) // 7
+    if len(week_index) == 0:
+        return np.zeros((n_services, 0)), current_week - 1
+    
+    start = int(week_index.min())
+    end = max(min(current_week - 1, int(week_index.max())), start)
+    length = end - start + 1
+    
+    mask = week_index <= end
+    series = np.bincount(service_code[mask] * length + (week_index[mask] - start),
+                         minlength=n_services * length).reshape(n_services, length)
+    return series, end
+
+def _week_start(week_index: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=week_index * 7 - 3)
+
+def _ranking_frame(services: List[str], result: Dict[str, np.ndarray], step: int,
+                   same_period_last_season: np.ndarray) -> pd.DataFrame:
+    column = step - 1
+    ranking = pd.DataFrame({
+        'service': services,
+        'forecast': np.round(result['point'][:, column], 1),
+        'lower': np.round(result['lower'][:, column], 1),
+        'upper': np.round(result['upper'][:, column], 1),
+        'last_season': same_period_last_season.astype(int),
+        'model': result['model'],
+    })
+    ranking = ranking.sort_values(['forecast', 'upper'], ascending=False, kind='stable')
+    return ranking[ranking['upper'] > 0].reset_index(drop=True)
+
+def forecast_risk_rankings(columns: Dict[str, Any], as_of: date, confidence: float = 0.9) -> Dict[str, Dict[str, Any]]:
+    """
+    이번 달 / 다음 달 / 다음 주 서비스별 오류 예측 순위
+    
+    Args:
+        columns: SeasonalityDataStore.load_columns() 결과
+        as_of: 기준일 (보통 오늘)
+        confidence: 예측구간 신뢰수준 (0.8, 0.9, 0.95)
+    
+    Returns:
+        dict: {'this_month' | 'next_month' | 'next_week': {'label', 'horizon', 'ranking'(DataFrame)}}
+    """
+    services = list(columns['services'])
+    rankings = {}
+    
+    monthly, last_month = build_monthly_series(columns, as_of)
+    this_month = as_of.year * 12 + as_of.month - 1
+    month_horizon = this_month + 1 - last_month
+    monthly_result = SeasonalForecaster(12, confidence).fit_predict(monthly, month_horizon)
+    for key, target in (('this_month', this_month), ('next_month', this_month + 1)):
+        step = target - last_month
+        last_season_position = monthly.shape[1] - 1 + step - 12
+        last_season = (monthly[:, last_season_position] if 0 <= last_season_position < monthly.shape[1]
+                       else np.zeros(len(services)))
+        rankings[key] = {
+            'label': f"{target // 12}년 {target % 12 + 1}월",
+            'horizon': step,
+            'ranking': _ranking_frame(services, monthly_result, step, last_season),
+        }
+    
+    weekly, last_week = build_weekly_series(columns, as_of)
+    next_week = ((as_of - date(1970, 1, 1)).days + 3) // 7 + 1
+    week_step = next_week - last_week
+    weekly_result = SeasonalForecaster(52, confidence).fit_predict(weekly, week_step)
+    last_season_position = weekly.shape[1] - 1 + week_step - 52
+    last_season = (weekly[:, last_season_position] if 0 <= last_season_position < weekly.shape[1]
+                   else np.zeros(len(services)))
+    week_start = _week_start(next_week)
+    rankings['next_week'] = {
+        'label': f"{week_start:%m/%d} ~ {week_start + timedelta(days=6):%m/%d}",
+        'horizon': week_step,
+        'ranking': _ranking_frame(services, weekly_result, week_step, last_season),
+    }
+    return rankings
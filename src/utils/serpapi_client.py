@@ -0,0 +1,293 @@
+# utils/serpapi_client.py - SerpApi 공용 HTTP 세션 및 검색 결과 캐시
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from utils.db_utils import get_serpapi_cache_db_path
+
+SERPAPI_SEARCH_URL = "https://serpapi.com/search"
+SERPAPI_ACCOUNT_URL = "https://serpapi.com/account"
+
+# 캐시 설정 (환경변수로 조정)
+SERPAPI_CACHE_TTL = int(os.getenv("SERPAPI_CACHE_TTL", "21600"))           # 결과가 있는 검색: 6시간
+SERPAPI_NEGATIVE_CACHE_TTL = int(os.getenv("SERPAPI_NEGATIVE_CACHE_TTL", "1800"))  # 결과 없는 검색: 30분
+SERPAPI_CACHE_MAX_ENTRIES = int(os.getenv("SERPAPI_CACHE_MAX_ENTRIES", "5000"))
+SERPAPI_POOL_MAXSIZE = int(os.getenv("SERPAPI_POOL_MAXSIZE", "8"))
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_serpapi_session() -> requests.Session:
+    """프로세스 공용 HTTP 세션 (keep-alive 커넥션 재사용)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SERPAPI_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+def normalize_search_query(query: str) -> str:
+    """캐시 키용 검색어 정규화 (유니코드 정규화, 소문자, 공백 정리)"""
+    normalized = unicodedata.normalize('NFKC', query or '').lower()
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+class SerpApiSearchCache:
+    """SerpApi 검색 결과 캐시 (SQLite)
+    
+    캐시 키는 (정규화된 검색어, 언어, 지역, 결과 수)이며,
+    결과가 없는 검색도 짧은 TTL로 저장해 같은 검색어의 반복 호출을 막는다.
+    일별 API 호출/캐시 적중 수를 기록해 절약된 할당량을 계산한다.
+    """
+    
+    def __init__(self, db_path: str = None, ttl_seconds: int = SERPAPI_CACHE_TTL,
+                 negative_ttl_seconds: int = SERPAPI_NEGATIVE_CACHE_TTL,
+                 max_entries: int = SERPAPI_CACHE_MAX_ENTRIES):
+        self.db_path = db_path or get_serpapi_cache_db_path()
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+    
+    def init_database(self):
+        """캐시/사용량 테이블 초기화"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS serpapi_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    hl TEXT NOT NULL,
+                    gl TEXT NOT NULL,
+                    num INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    is_negative INTEGER DEFAULT 0,
+                    hit_count INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_hit_at REAL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS serpapi_usage_daily (
+                    usage_date TEXT PRIMARY KEY,
+                    api_calls INTEGER DEFAULT 0,
+                    cache_hits INTEGER DEFAULT 0
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_serpapi_cache_expires ON serpapi_cache(expires_at)')
+            conn.commit()
+    
+    @staticmethod
+    def build_cache_key(query: str, hl: str, gl: str, num: int) -> str:
+        payload = json.dumps([normalize_search_query(query), hl, gl, int(num)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, query: str, hl: str, gl: str, num: int) -> Optional[List[Dict[str, Any]]]:
+        """캐시된 검색 결과 조회 (없거나 만료되면 None, 결과 없는 검색은 빈 리스트)"""
+        cache_key = self.build_cache_key(query, hl, gl, num)
+        now = time.time()
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT results, expires_at FROM serpapi_cache WHERE cache_key = ?', (cache_key,))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                
+                results, expires_at = row
+                if expires_at <= now:
+                    cursor.execute('DELETE FROM serpapi_cache WHERE cache_key = ?', (cache_key,))
+                    conn.commit()
+                    return None
+                
+                cursor.execute('''
+                    UPDATE serpapi_cache SET hit_count = hit_count + 1, last_hit_at = ?
+                    WHERE cache_key = ?
+                ''', (now, cache_key))
+                self._record_usage(cursor, cache_hits=1)
+                conn.commit()
+                return json.loads(results)
+        
+        except Exception as e:
+            print(f"SerpApi 캐시 조회 실패: {str(e)}")
+            return None
+    
+    def put(self, query: str, hl: str, gl: str, num: int, results: List[Dict[str, Any]]):
+        """검색 결과 저장 (빈 결과는 negative TTL 적용)"""
+        cache_key = self.build_cache_key(query, hl, gl, num)
+        now = time.time()
+        is_negative = not results
+        ttl = self.negative_ttl_seconds if is_negative else self.ttl_seconds
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO serpapi_cache
+                    (cache_key, query, hl, gl, num, results, is_negative, created_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (cache_key, normalize_search_query(query), hl, gl, int(num),
+                      json.dumps(results, ensure_ascii=False), int(is_negative), now, now + ttl))
+                self._evict(cursor, now)
+                conn.commit()
+        
+        except Exception as e:
+            print(f"SerpApi 캐시 저장 실패: {str(e)}")
+    
+    def record_api_call(self):
+        """실제 SerpApi 호출 1회 기록"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._record_usage(conn.cursor(), api_calls=1)
+                conn.commit()
+        except Exception as e:
+            print(f"SerpApi 사용량 기록 실패: {str(e)}")
+    
+    @staticmethod
+    def _record_usage(cursor, api_calls: int = 0, cache_hits: int = 0):
+        usage_date = datetime.date.today().isoformat()
+        cursor.execute('''
+            INSERT INTO serpapi_usage_daily (usage_date, api_calls, cache_hits) VALUES (?, ?, ?)
+            ON CONFLICT(usage_date) DO UPDATE SET
+                api_calls = api_calls + excluded.api_calls,
+                cache_hits = cache_hits + excluded.cache_hits
+        ''', (usage_date, api_calls, cache_hits))
+    
+    def _evict(self, cursor, now: float):
+        """만료 항목 삭제 후 최대 항목 수 초과분은 가장 오래 사용되지 않은 항목부터 삭제"""
+        cursor.execute('DELETE FROM serpapi_cache WHERE expires_at <= ?', (now,))
+        cursor.execute('SELECT COUNT(*) FROM serpapi_cache')
+        overflow = cursor.fetchone()[0] - self.max_entries
+        if overflow > 0:
+            cursor.execute('''
+                DELETE FROM serpapi_cache WHERE cache_key IN (
+                    SELECT cache_key FROM serpapi_cache
+                    ORDER BY COALESCE(last_hit_at, created_at) ASC
+                    LIMIT ?
+                )
+            ''', (overflow,))
+    
+    def clear(self):
+        """캐시 전체 삭제 (사용량 기록은 유지)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM serpapi_cache')
+            conn.commit()
+        return True
+    
+    def get_cache_stats(self, since_date: str = None) -> Dict[str, Any]:
+        """
+        캐시 통계 반환
+        
+        Args:
+            since_date: 사용량 집계 시작일 (YYYY-MM-DD, 기본값: 이번 달 1일)
+        """
+        since_date = since_date or datetime.date.today().replace(day=1).isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*), COALESCE(SUM(is_negative), 0) FROM serpapi_cache WHERE expires_at > ?
+            ''', (time.time(),))
+            total_entries, negative_entries = cursor.fetchone()
+            cursor.execute('''
+                SELECT COALESCE(SUM(api_calls), 0), COALESCE(SUM(cache_hits), 0)
+                FROM serpapi_usage_daily WHERE usage_date >= ?
+            ''', (since_date,))
+            api_calls, cache_hits = cursor.fetchone()
+        
+        total_requests = api_calls + cache_hits
+        return {
+            "total_entries": total_entries,
+            "negative_entries": negative_entries,
+            "api_calls": api_calls,
+            "cache_hits": cache_hits,
+            "hit_rate": (cache_hits / total_requests * 100) if total_requests else 0.0,
+            "since_date": since_date,
+            "ttl_hours": self.ttl_seconds / 3600,
+            "negative_ttl_minutes": self.negative_ttl_seconds / 60
+        }
+
+
+class SerpApiClient:
+    """캐시를 거쳐 SerpApi Google 검색을 호출하는 클라이언트"""
+    
+    def __init__(self, api_key: str, cache: SerpApiSearchCache = None):
+        self.api_key = api_key
+        self.cache = cache or get_serpapi_cache()
+        self.session = get_serpapi_session()
+    
+    def search_google(self, query: str, num_results: int, hl: str = 'ko', gl: str = 'kr',
+                      timeout: float = 10) -> List[Dict[str, Any]]:
+        """
+        Google 검색 결과 (organic) 반환 - 캐시 적중 시 API를 호출하지 않음
+        
+        요청 실패(requests.exceptions.RequestException)는 호출자에게 그대로 전달되며 캐시하지 않는다.
+        """
+        cached = self.cache.get(query, hl, gl, num_results)
+        if cached is not None:
+            return cached
+        
+        params = {
+            'api_key': self.api_key,
+            'engine': 'google',
+            'q': query,
+            'num': num_results,
+            'hl': hl,  # 한국어 결과 우선
+            'gl': gl,  # 한국 지역 결과 우선
+            'safe': 'active'  # 안전 검색 활성화
+        }
+        
+        response = self.session.get(SERPAPI_SEARCH_URL, params=params, timeout=timeout)
+        self.cache.record_api_call()
+        response.raise_for_status()
+        
+        search_results = response.json()
+        organic_results = search_results.get('organic_results', [])
+        
+        formatted_results = []
+        for result in organic_results[:num_results]:
+            formatted_results.append({
+                'title': result.get('title', ''),
+                'link': result.get('link', ''),
+                'snippet': result.get('snippet', ''),
+                'source': result.get('source', ''),
+                'position': result.get('position', 0)
+            })
+        
+        # 결과 없음은 negative 캐시, 그 외 오류 응답(키 오류, 할당량 초과 등)은 캐시하지 않음
+        error_message = search_results.get('error', '')
+        if formatted_results or not error_message or "hasn't returned any results" in error_message:
+            self.cache.put(query, hl, gl, num_results, formatted_results)
+        
+        return formatted_results
+    
+    def get_account_usage(self, timeout: float = 10) -> Dict[str, Any]:
+        """SerpApi 계정 정보 (이번 달 할당량/잔여 검색 수) 조회"""
+        response = self.session.get(SERPAPI_ACCOUNT_URL, params={'api_key': self.api_key}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_serpapi_cache() -> SerpApiSearchCache:
+    """프로세스 공용 SerpApi 검색 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SerpApiSearchCache()
+        return _cache
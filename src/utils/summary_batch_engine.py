@@ -0,0 +1,200 @@
+# utils/summary_batch_engine.py - 대량 요약 배치 엔진 (동시 처리 + 체크포인트)
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.db_utils import get_summary_checkpoint_db_path
+
+class SummaryBatchEngine:
+    """요약 작업을 워커 풀로 동시 실행하는 배치 엔진
+    
+    - 동일한 원문(요약 유형/토큰 수/모델/프롬프트 버전 포함)은 한 번만 요약
+    - 완료된 요약은 SQLite 체크포인트에 즉시 기록되어, 중단 후 재실행 시 이어서 처리
+    - 속도 제한은 LLM 게이트웨이의 RPM/TPM 버킷이 담당하므로 처리량은 API 할당량에 맞춰진다
+    """
+    
+    EMPTY_SUMMARY = "정보 없음"
+    
+    def __init__(self, summarize_fn: Callable[[str, str, int], str], max_workers: int = 8,
+                 db_path: str = None, model_name: str = "", prompt_version: str = ""):
+        """
+        Args:
+            summarize_fn: (text, summary_type, max_tokens) -> 요약문. 실패 시 예외 발생
+            max_workers: 동시 요청 워커 수
+            db_path: 체크포인트 DB 경로
+            model_name: 요약 모델명 (바뀌면 체크포인트를 재사용하지 않음)
+            prompt_version: 요약 프롬프트 버전 (바뀌면 체크포인트를 재사용하지 않음)
+        """
+        self.summarize_fn = summarize_fn
+        self.max_workers = max_workers
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.db_path = db_path or get_summary_checkpoint_db_path()
+        self._lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+    
+    def init_database(self):
+        """체크포인트 테이블 초기화"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summary_checkpoint (
+                    text_hash TEXT PRIMARY KEY,
+                    summary_type TEXT NOT NULL,
+                    max_tokens INTEGER NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summary_runs (
+                    run_id TEXT PRIMARY KEY,
+                    file_name TEXT,
+                    total_rows INTEGER,
+                    total_jobs INTEGER,
+                    completed_jobs INTEGER DEFAULT 0,
+                    failed_jobs INTEGER DEFAULT 0,
+                    status TEXT,
+                    started_at REAL,
+                    updated_at REAL
+                )
+            ''')
+            conn.commit()
+    
+    @staticmethod
+    def clean_text(text) -> str:
+        """요약 입력 정리 (공백/개행 정규화)"""
+        if text is None:
+            return ""
+        text = str(text)
+        if text.strip().lower() in ("", "nan", "none"):
+            return ""
+        return re.sub(r'\s+', ' ', text.strip())
+    
+    @staticmethod
+    def make_text_hash(text: str, summary_type: str, max_tokens: int,
+                       model_name: str = "", prompt_version: str = "") -> str:
+        key = f"{model_name}|{prompt_version}|{summary_type}|{max_tokens}|{text}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
+    def _load_checkpoints(self, text_hashes: List[str]) -> Dict[str, str]:
+        """이미 완료된 요약 조회"""
+        done = {}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(text_hashes), 500):
+                chunk = text_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f'SELECT text_hash, summary FROM summary_checkpoint WHERE text_hash IN ({placeholders})', chunk)
+                done.update(dict(cursor.fetchall()))
+        return done
+    
+    def _save_checkpoint(self, text_hash: str, summary_type: str, max_tokens: int, summary: str):
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO summary_checkpoint (text_hash, summary_type, max_tokens, summary, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (text_hash, summary_type, max_tokens, summary, time.time()))
+            conn.commit()
+    
+    def _update_run(self, run_id: str, **fields):
+        fields['updated_at'] = time.time()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f'UPDATE summary_runs SET {columns} WHERE run_id = ?', list(fields.values()) + [run_id])
+            conn.commit()
+    
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """실행 이력 조회 (재개 여부 안내용)"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM summary_runs WHERE run_id = ?', (run_id,)).fetchone()
+            return dict(row) if row else None
+    
+    def run(self, rows: List[Dict[str, str]], fields: List[Tuple[str, str, str]], max_tokens: int,
+            run_id: str, file_name: str = None,
+            progress_callback: Callable[[int, int, str], None] = None) -> List[Dict[str, str]]:
+        """
+        행 단위 요약 실행
+        
+        Args:
+            rows: 원본 행 목록 (dict)
+            fields: (원본 컬럼, 요약 유형, 결과 컬럼) 목록
+            max_tokens: 요약 최대 토큰 수
+            run_id: 실행 식별자 (같은 파일/옵션이면 같은 값 → 재개)
+            progress_callback: (완료 작업 수, 전체 작업 수, 메시지) 콜백. 호출 스레드에서 실행됨
+        
+        Returns:
+            list: 행별 {결과 컬럼: 요약문}
+        """
+        results = [{} for _ in rows]
+        pending = {}  # text_hash -> (text, summary_type, [(row_idx, result_col), ...])
+        
+        for row_idx, row in enumerate(rows):
+            for source_col, summary_type, result_col in fields:
+                text = self.clean_text(row.get(source_col))
+                if not text:
+                    results[row_idx][result_col] = self.EMPTY_SUMMARY
+                    continue
+                text_hash = self.make_text_hash(text, summary_type, max_tokens, self.model_name, self.prompt_version)
+                pending.setdefault(text_hash, (text, summary_type, []))[2].append((row_idx, result_col))
+        
+        # 체크포인트에서 이미 완료된 요약 복원
+        checkpoints = self._load_checkpoints(list(pending.keys()))
+        for text_hash, summary in checkpoints.items():
+            for row_idx, result_col in pending.pop(text_hash)[2]:
+                results[row_idx][result_col] = summary
+        
+        total_jobs = len(pending) + len(checkpoints)
+        completed = len(checkpoints)
+        failed = 0
+        
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO summary_runs (run_id, file_name, total_rows, total_jobs, completed_jobs, status, started_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 'running', ?, ?)
+                ON CONFLICT(run_id) DO UPDATE SET total_jobs = excluded.total_jobs,
+                    completed_jobs = excluded.completed_jobs, failed_jobs = 0, status = 'running', updated_at = excluded.updated_at
+            ''', (run_id, file_name, len(rows), total_jobs, completed, now, now))
+            conn.commit()
+        
+        if progress_callback:
+            progress_callback(completed, total_jobs, f"체크포인트 복원 {completed}건, 중복 제거 후 남은 요약 {len(pending)}건")
+        
+        def work(text_hash, text, summary_type):
+            summary = self.summarize_fn(text, summary_type, max_tokens)
+            self._save_checkpoint(text_hash, summary_type, max_tokens, summary)
+            return summary
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(work, text_hash, text, summary_type): text_hash
+                for text_hash, (text, summary_type, _) in pending.items()
+            }
+            for future in as_completed(futures):
+                text_hash = futures[future]
+                try:
+                    summary = future.result()
+                    completed += 1
+                except Exception as e:
+                    summary = f"요약 실패: {str(e)}"
+                    failed += 1
+                
+                for row_idx, result_col in pending[text_hash][2]:
+                    results[row_idx][result_col] = summary
+                
+                if progress_callback:
+                    progress_callback(completed + failed, total_jobs, f"완료 {completed}건 / 실패 {failed}건")
+                
+                if (completed + failed) % 20 == 0:
+                    self._update_run(run_id, completed_jobs=completed, failed_jobs=failed)
+        
+        self._update_run(run_id, completed_jobs=completed, failed_jobs=failed,
+                         status='completed' if failed == 0 else 'partial')
+        return results
@@ -2,6 +2,14 @@ import streamlit as st
 import re
 import html as html_module
 import time
+import hashlib
+from collections import OrderedDict
+from utils.response_renderer import parse_response, parse_cause_content, create_info_box
+
+# 채팅 기록 표시 설정
+CHAT_HISTORY_WINDOW = 20          # 화면에 그리는 최근 메시지 수 ("이전 대화 더보기"로 확장)
+CHAT_HISTORY_MAX_MESSAGES = 200   # 세션에 보관하는 최대 메시지 수
+CHAT_RENDER_CACHE_SIZE = 256      # 메시지별 변환 결과 캐시 크기
 
 class UIComponentsLocal:
     """UI 컴포넌트 관리 클래스"""
@@ -21,175 +29,19 @@ class UIComponentsLocal:
 
     def _parse_cause_content(self, cause_content):
         """원인 컨텐츠 파싱"""
-        cause_pattern = r'원인(\d+):\s*([^\n원]*(?:\n(?!원인\d+:)[^\n]*)*)'
-        matches = re.findall(cause_pattern, cause_content, re.MULTILINE)
-        
-        if matches:
-            return [(num, re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', content.strip()))
-                    for num, content in matches[:3] if content.strip()]
-        
-        lines = [line.strip() for line in cause_content.split('\n') if line.strip()]
-        bullet_lines = [line[1:].strip() if line.startswith(('•', '-', '*')) else line 
-                       for line in lines if line][:3]
-        
-        return [(str(i+1), re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', content))
-                for i, content in enumerate(bullet_lines or [cause_content])]
+        return parse_cause_content(cause_content)
     
     def _create_info_box(self, content, title, emoji, icon):
         """정보 박스 HTML 생성"""
-        return f"""<div style="background:#e8f5e8;border:1px solid #10b981;border-radius:8px;padding:15px;margin:15px 0;display:flex;align-items:flex-start;gap:12px;">
-<div style="background:#10b981;border-radius:50%;width:32px;height:32px;display:flex;align-items:center;justify-content:center;color:white;font-size:16px;flex-shrink:0;margin-top:2px;">{icon}</div>
-<div style="flex:1;"><h4 style="color:#065f46;margin:0 0 8px 0;font-size:16px;font-weight:bold;">{title}</h4>
-<div style="color:#065f46;line-height:1.5;font-size:14px;">{content}</div></div></div>"""
+        return create_info_box(content, title, icon)
     
     def convert_cause_box_to_html(self, text):
-        """장애원인 마커를 HTML로 변환"""
-        return self._convert_box_to_html(text, 'CAUSE_BOX', '장애원인', '📋', True)
-    
-    
-    def _convert_box_to_html(self, text, box_type, title, icon, parse_causes):
-        """박스 마커를 HTML로 변환하는 공통 로직"""
-        start_marker, end_marker = f'[{box_type}_START]', f'[{box_type}_END]'
-        if start_marker not in text or end_marker not in text: 
-            return text, False
-        
-        start_idx, end_idx = text.find(start_marker), text.find(end_marker)
-        if start_idx == -1 or end_idx == -1: 
-            return text, False
-        
-        content = text[start_idx + len(start_marker):end_idx].strip()
-        
-        if parse_causes:
-            parsed = self._parse_cause_content(content)
-            formatted = ''.join([f'<li key="cause-{num}" style="margin-bottom:8px;line-height:1.5;"><strong>원인{num}:</strong> {c}</li>' 
-                               for num, c in parsed])
-            content = f'<ul style="margin:0;padding-left:20px;list-style-type:none;">{formatted}</ul>'
-        else:
-            content = content.replace('**', '<strong>').replace('**', '</strong>')
-        
-        html_box = self._create_info_box(content, title, '', icon)
-        return text[:start_idx] + html_box + text[end_idx + len(end_marker):], True
-    
-    def _remove_patterns(self, text, patterns):
-        """패턴 목록을 사용한 텍스트 제거"""
-        for pattern in patterns:
-            old_text = text
-            text = re.sub(pattern, '', text, flags=re.DOTALL | re.IGNORECASE)
-            if old_text != text and self.debug_mode:
-                print(f"UI_DEBUG: 패턴 제거됨: {pattern}")
-        return text
-
-    def _remove_box_markers_enhanced(self, text):
-        """강화된 박스 마커 제거 - REPAIR_BOX 제거"""
-        patterns = [
-            r'\[CAUSE_BOX_START\].*?\[CAUSE_BOX_END\]',
-            r'\[.*?_BOX_START\].*?\[.*?_BOX_END\]', 
-            r'\[CAUSE_BOX_START\].*', r'.*\[CAUSE_BOX_END\]'
-        ]
-        return self._remove_patterns(text, patterns)
-
-    def _remove_html_boxes_enhanced(self, text):
-        """HTML 형태의 모든 박스 제거"""
-        patterns = [
-            r'<div style="background:#e8f5e8;.*?</div>', r'<div[^>]*>.*?복구방법.*?</div>',
-            r'<div[^>]*>.*?장애원인.*?</div>', r'<div[^>]*>.*?🔧.*?</div>',
-            r'<div[^>]*>.*?📋.*?</div>', r'<div[^>]*class=".*?repair.*?".*?</div>',
-            r'<div[^>]*class=".*?cause.*?".*?</div>'
-        ]
-        return self._remove_patterns(text, patterns)
-
-    def _remove_repair_text_sections(self, text):
-        """복구방법 관련 텍스트 섹션 제거"""
-        lines = text.split('\n')
-        cleaned_lines = []
-        skip_mode = False
-        skip_keywords = ['복구방법', '복구절차', '조치방법', '해결방법', '대응방법', '복구', '조치', 
-                        '해결', '대응', '수정', '개선', 'repair', 'recovery', 'solution', 'fix']
-        
-        for line in lines:
-            line_stripped = line.strip()
-            line_lower = line_stripped.lower()
-            
-            # 복구방법 섹션 시작 감지
-            if any(keyword in line_lower for keyword in skip_keywords):
-                if (line_stripped.startswith(('**', '#')) or line_stripped.endswith(':') or
-                    '복구방법:' in line_lower or '조치방법:' in line_lower):
-                    skip_mode = True
-                    if self.debug_mode: print(f"UI_DEBUG: 복구방법 섹션 시작 감지: {line_stripped}")
-                    continue
-            
-            # 새로운 섹션이나 표 시작되면 스킵 모드 해제
-            if (line_stripped.startswith(('#', '##', 'Case', '|', '1.')) or 
-                (line_stripped.startswith('**') and not any(kw in line_lower for kw in skip_keywords))):
-                skip_mode = False
-            
-            if not skip_mode:
-                cleaned_lines.append(line)
-            elif self.debug_mode:
-                print(f"UI_DEBUG: 라인 스킵됨: {line_stripped[:50]}...")
-        
-        return '\n'.join(cleaned_lines)
-
-    def _clean_inquiry_response(self, text):
-        """INQUIRY 응답 최종 정리"""
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        lines = [line for line in text.split('\n') 
-                if line.strip() not in ['복구방법', '복구방법:', '**복구방법**', '**복구방법:**']]
-        
-        # 마지막 빈 줄들 제거
-        while lines and not lines[-1].strip():
-            lines.pop()
-        
-        result = '\n'.join(lines).strip()
-        if self.debug_mode: print(f"UI_DEBUG: 최종 정리 완료. 결과 길이: {len(result)}")
-        return result
-
-    def _emergency_remove_green_boxes(self, text, query_type):
-        """긴급 해결책 - INQUIRY 타입에서 모든 녹색박스 관련 요소 강제 제거"""
-        if query_type.lower() != 'inquiry':
-            return text
-            
-        # HTML div 태그 제거
-        patterns = [
-            r'<div[^>]*style[^>]*background[^>]*#e8f5e8[^>]*>.*?</div>',
-            r'<div[^>]*style[^>]*녹색[^>]*>.*?</div>'
-        ]
-        text = self._remove_patterns(text, patterns)
-        
-        # 복구방법 관련 텍스트 섹션 제거
-        lines = text.split('\n')
-        filtered_lines = []
-        skip_until_next_section = False
-        
-        for line in lines:
-            line_clean = line.strip()
-            
-            if any(keyword in line_clean.lower() for keyword in ['복구방법', '조치방법', '해결방법']):
-                if line_clean.endswith(':') or '**' in line_clean:
-                    skip_until_next_section = True
-                    if self.debug_mode: print(f"EMERGENCY: 복구방법 섹션 시작 - 스킵: {line_clean}")
-                    continue
-            
-            if (line_clean.startswith(('1.', '2.', '3.', 'Case', '|')) or '장애 ID' in line_clean):
-                skip_until_next_section = False
-            
-            if not skip_until_next_section:
-                filtered_lines.append(line)
-            elif self.debug_mode:
-                print(f"EMERGENCY: 라인 스킵됨: {line_clean[:30]}...")
-        
-        result = '\n'.join(filtered_lines)
-        result = re.sub(r'\[.*?BOX.*?\]', '', result, flags=re.IGNORECASE)
-        result = re.sub(r'\n{3,}', '\n\n', result)
-        
-        if self.debug_mode: print(f"EMERGENCY: 최종 결과 길이: {len(result)}")
-        return result.strip()
-    
-    def _remove_box_markers(self, text):
-        """박스 마커들을 제거하는 헬퍼 메서드 - 강화된 버전으로 대체"""
-        return self._remove_box_markers_enhanced(text)
+        """장애원인 마커를 HTML로 변환 (응답 파싱 결과 재사용)"""
+        return parse_response(text).cause_box_html()
     
+    def _convert_inquiry_content(self, text):
+        """조회(inquiry) 응답에서 박스/HTML 박스/복구방법 섹션 제거 (응답 파싱 결과 재사용)"""
+        return parse_response(text).inquiry_text()
 
     # ============== 새로 추가된 메서드들 (repair 디자인용) ==============
 
@@ -646,15 +498,22 @@ class UIComponentsLocal:
         return text.strip()
     
     def _parse_repair_response_to_incidents_data(self, response_text):
+        """repair 응답 텍스트를 incidents_data 구조로 파싱 (동일 응답은 파싱 결과 재사용)"""
+        parsed = parse_response(response_text)
+        return parsed.memoize('repair_incidents_data', lambda: self._parse_repair_incidents(parsed))
+    
+    def _parse_repair_incidents(self, parsed):
         """repair 응답 텍스트를 incidents_data 구조로 파싱 - 실제 응답 형식에 맞춤"""
+        response_text = parsed.text
         try:
             # ★★★ 디버그: LLM 응답 출력 ★★★
-            print("="*80)
-            print("DEBUG: LLM 응답 (처음 1500자)")
-            print("="*80)
-            print(response_text[:1500])
-            print("="*80)
-            print(f"DEBUG: 파싱 시작 - 전체 라인 수: {len(response_text.split(chr(10)))}")
+            if self.debug_mode:
+                print("="*80)
+                print("DEBUG: LLM 응답 (처음 1500자)")
+                print("="*80)
+                print(response_text[:1500])
+                print("="*80)
+                print(f"DEBUG: 파싱 시작 - 전체 라인 수: {len(parsed.lines)}")
             
             incidents_data = {
                 'summary': {
@@ -669,7 +528,7 @@ class UIComponentsLocal:
             date_matches = re.findall(r'(\d{4}[-./]\d{1,2}[-./]\d{1,2}(?:\s+\d{1,2}:\d{1,2})?)', response_text)
             extracted_dates = [self._extract_and_format_timestamp(match) for match in date_matches]
             
-            lines = response_text.split('\n')
+            lines = parsed.lines
             overall_lines = []
             recovery_methods = []
             current_incident = None
@@ -699,7 +558,8 @@ class UIComponentsLocal:
                         current_section_type = 'anomaly'
                     else:
                         current_section_type = 'incident'
-                    print(f"DEBUG: ✅ 섹션 감지됨: {line} (type: {current_section_type})")
+                    if self.debug_mode:
+                        print(f"DEBUG: ✅ 섹션 감지됨: {line} (type: {current_section_type})")
                     i += 1
                     continue
                 
@@ -736,9 +596,11 @@ class UIComponentsLocal:
                 if is_incident_start:
                     if current_incident and any(current_incident.values()):
                         incidents.append(current_incident)
-                        print(f"DEBUG: ✅ Incident 추가됨: {current_incident.get('incident_id')}")
+                        if self.debug_mode:
+                            print(f"DEBUG: ✅ Incident 추가됨: {current_incident.get('incident_id')}")
                     
-                    print(f"DEBUG: 🆕 새 Incident 시작: {line} (type: {source_type})")
+                    if self.debug_mode:
+                        print(f"DEBUG: 🆕 새 Incident 시작: {line} (type: {source_type})")
                     
                     current_incident = {
                         'incident_id': '',
@@ -926,16 +788,17 @@ class UIComponentsLocal:
                 print(f"복구방법 개수: {len(recovery_methods)}")
             
             # 최소한 incidents가 있어야 성공
-            print(f"DEBUG: 파싱 완료 - incidents 개수: {len(incidents)}")
-            print(f"DEBUG: in_incident_section 최종 상태: {in_incident_section}")
-            if incidents:
-                for inc in incidents[:3]:  # 처음 3개만 출력
-                    print(f"  - {inc.get('incident_id')}: symptom='{inc.get('symptom')[:50] if inc.get('symptom') else 'N/A'}...', failure_status='{inc.get('failure_status')[:50] if inc.get('failure_status') else 'N/A'}...'")
-            else:
-                print("DEBUG: ❌ incidents가 비어있음 - None 반환!")
-                print(f"DEBUG: in_incident_section이 True로 설정되었는가? {in_incident_section}")
-                print(f"DEBUG: overall_lines 개수: {len(overall_lines)}")
-                print(f"DEBUG: recovery_methods 개수: {len(recovery_methods)}")
+            if self.debug_mode:
+                print(f"DEBUG: 파싱 완료 - incidents 개수: {len(incidents)}")
+                print(f"DEBUG: in_incident_section 최종 상태: {in_incident_section}")
+                if incidents:
+                    for inc in incidents[:3]:  # 처음 3개만 출력
+                        print(f"  - {inc.get('incident_id')}: symptom='{inc.get('symptom')[:50] if inc.get('symptom') else 'N/A'}...', failure_status='{inc.get('failure_status')[:50] if inc.get('failure_status') else 'N/A'}...'")
+                else:
+                    print("DEBUG: ❌ incidents가 비어있음 - None 반환!")
+                    print(f"DEBUG: in_incident_section이 True로 설정되었는가? {in_incident_section}")
+                    print(f"DEBUG: overall_lines 개수: {len(overall_lines)}")
+                    print(f"DEBUG: recovery_methods 개수: {len(recovery_methods)}")
             return incidents_data if incidents else None
             
         except Exception as e:
@@ -979,11 +842,7 @@ class UIComponentsLocal:
             if query_type.lower() == 'inquiry':
                 if self.debug_mode: print("UI_DEBUG: INQUIRY 타입 감지 - 모든 박스 제거 시작")
                 
-                converted_content = self._remove_box_markers_enhanced(converted_content)
-                converted_content = self._remove_html_boxes_enhanced(converted_content)
-                converted_content = self._remove_repair_text_sections(converted_content)
-                converted_content = self._clean_inquiry_response(converted_content)
-                converted_content = self._emergency_remove_green_boxes(converted_content, query_type)
+                converted_content = self._convert_inquiry_content(converted_content)
                 
                 if self.debug_mode:
                     print(f"UI_DEBUG: 박스 제거 완료. 최종 길이: {len(converted_content)}")
@@ -1030,7 +889,9 @@ class UIComponentsLocal:
                     excel_manager = ExcelDownloadManager()
                     
                     # 엑셀 다운로드 버튼 표시 시도
-                    success = excel_manager.display_download_button(converted_content, query_type)
+                    success = excel_manager.display_download_button(
+                        converted_content, query_type, table_data=parse_response(response_text).inquiry_table_data()
+                    )
                     
                     if not success:
                         # 표가 없는 경우 사용자에게 안내
@@ -1161,82 +1022,139 @@ INDEX_REBUILD_NAME=your-index-name
 - INDEX_REBUILD_NAME: 검색 인덱스명""")
     
     def display_chat_messages(self):
-        """채팅 메시지 표시 - 디자인 템플릿 유지 (후진 호환성 보장)"""
+        """채팅 메시지 표시 - 최근 메시지만 그리고, 메시지별 변환 결과는 캐시에서 재사용 (후진 호환성 보장)"""
+        messages = st.session_state.messages
+        
+        # 세션 메모리 제한 - 오래된 메시지부터 삭제
+        if len(messages) > CHAT_HISTORY_MAX_MESSAGES:
+            del messages[:len(messages) - CHAT_HISTORY_MAX_MESSAGES]
+        
+        window = st.session_state.get('chat_history_window', CHAT_HISTORY_WINDOW)
+        start_index = max(len(messages) - window, 0)
+        
         with st.container():
-            for msg_idx, message in enumerate(st.session_state.messages):
+            if start_index > 0:
+                if st.button(f"⬆️ 이전 대화 더보기 ({start_index}개)", key="load_earlier_messages"):
+                    st.session_state['chat_history_window'] = window + CHAT_HISTORY_WINDOW
+                    st.rerun()
+            
+            for msg_idx in range(start_index, len(messages)):
+                message = messages[msg_idx]
                 with st.chat_message(message["role"]):
                     if message["role"] == "assistant":
-                        # 새로운 메시지 구조 확인 (후진 호환성 유지)
-                        query_type = message.get("query_type", "general")
-                        rendered_content = message.get("rendered_content")
-                        content = message["content"]
-                        
-                        # 새로운 구조의 메시지인 경우
-                        if rendered_content and isinstance(rendered_content, dict):
-                            if rendered_content.get("type") == "repair":
-                                # repair 타입은 전용 디자인으로 표시
-                                incidents_data = rendered_content.get("data")
-                                if incidents_data:
-                                    try:
-                                        self.display_repair_report_with_tabs(incidents_data, use_typewriter=False, message_index=msg_idx)
-                                        continue
-                                    except Exception as e:
-                                        # 오류 시 기본 표시로 폴백
-                                        print(f"repair 디스플레이 오류: {e}")
-                            elif rendered_content.get("type") == "text":
-                                # 기타 텍스트 타입
-                                content = rendered_content.get("content", content)
-                                query_type = rendered_content.get("query_type", query_type)
-                        
-                        # repair 응답인지 확인 (기존 메시지 처리)
-                        if query_type == "repair" and not rendered_content:
-                            # 기존 repair 메시지를 파싱해서 디자인 적용
-                            try:
-                                incidents_data = self._parse_repair_response_to_incidents_data(content)
-                                if incidents_data:
-                                    self.display_repair_report_with_tabs(incidents_data, use_typewriter=False, message_index=msg_idx)
-                                    continue
-                            except Exception as e:
-                                print(f"기존 repair 메시지 파싱 오류: {e}")
-                        
-                        # 기본 처리 (CAUSE_BOX 등)
-                        self._display_content_with_markers(content, query_type)
+                        self._render_content_artifact(self._get_message_artifact(message), message_index=msg_idx)
                     else: 
                         st.write(message["content"])
     
-    def _display_content_with_markers(self, content, query_type):
-        """컨텐츠를 마커에 따라 적절히 표시 + INQUIRY 타입의 경우 엑셀 다운로드 버튼 추가"""
+    def _get_render_cache(self):
+        """세션별 메시지 변환 결과 캐시 (LRU)"""
+        if '_chat_render_cache' not in st.session_state:
+            st.session_state['_chat_render_cache'] = OrderedDict()
+        return st.session_state['_chat_render_cache']
+    
+    def _get_message_artifact(self, message):
+        """메시지의 표시용 변환 결과 (메시지 내용당 한 번만 계산)"""
+        rendered_content = message.get("rendered_content")
+        cache_key = hashlib.sha1(repr((
+            message.get("query_type", "general"), message["content"],
+            rendered_content.get("type") if isinstance(rendered_content, dict) else None
+        )).encode('utf-8')).hexdigest()
+        
+        cache = self._get_render_cache()
+        artifact = cache.get(cache_key)
+        if artifact is not None:
+            cache.move_to_end(cache_key)
+            return artifact
+        
+        artifact = self._build_message_artifact(message)
+        cache[cache_key] = artifact
+        while len(cache) > CHAT_RENDER_CACHE_SIZE:
+            cache.popitem(last=False)
+        return artifact
+    
+    def _build_message_artifact(self, message):
+        """저장된 assistant 메시지를 표시용 결과로 변환"""
+        # 새로운 메시지 구조 확인 (후진 호환성 유지)
+        query_type = message.get("query_type", "general")
+        rendered_content = message.get("rendered_content")
+        content = message["content"]
+        
+        # 새로운 구조의 메시지인 경우
+        if rendered_content and isinstance(rendered_content, dict):
+            if rendered_content.get("type") == "repair":
+                # repair 타입은 전용 디자인으로 표시
+                incidents_data = rendered_content.get("data")
+                if incidents_data:
+                    return {'kind': 'repair', 'incidents_data': incidents_data, 'fallback': self._build_content_artifact(content, query_type, detect_repair=False)}
+            elif rendered_content.get("type") == "text":
+                # 기타 텍스트 타입
+                content = rendered_content.get("content", content)
+                query_type = rendered_content.get("query_type", query_type)
+        
+        # repair 응답인지 확인 (기존 메시지 처리)
+        if query_type == "repair" and not rendered_content:
+            # 기존 repair 메시지를 파싱해서 디자인 적용
+            try:
+                incidents_data = self._parse_repair_response_to_incidents_data(content)
+                if incidents_data:
+                    return {'kind': 'repair', 'incidents_data': incidents_data, 'fallback': self._build_content_artifact(content, query_type, detect_repair=False)}
+            except Exception as e:
+                print(f"기존 repair 메시지 파싱 오류: {e}")
+        
+        # 기본 처리 (CAUSE_BOX 등)
+        return self._build_content_artifact(content, query_type)
+    
+    def _build_content_artifact(self, content, query_type, detect_repair=True):
+        """마커 변환/박스 제거를 적용한 표시용 결과 계산 (화면 출력 없음)"""
         html_converted = False
         converted_content = content
         
-        if not query_type or query_type == "general":
+        if detect_repair and (not query_type or query_type == "general"):
             if self._is_repair_response(content):
                 query_type = "repair"
                 # repair 응답을 파싱해서 전용 디자인으로 표시
                 try:
                     incidents_data = self._parse_repair_response_to_incidents_data(content)
                     if incidents_data:
-                        self.display_repair_report_with_tabs(incidents_data, use_typewriter=False)
-                        return
+                        return {'kind': 'repair', 'incidents_data': incidents_data, 'fallback': self._build_content_artifact(content, query_type, detect_repair=False)}
                 except Exception as e:
                     print(f"repair 응답 파싱 실패: {e}")
         
+        query_type = query_type or "general"
+        
         # INQUIRY 타입인 경우 박스 제거
         if query_type.lower() == 'inquiry':
-            converted_content = self._remove_box_markers_enhanced(converted_content)
-            converted_content = self._remove_html_boxes_enhanced(converted_content)
-            converted_content = self._remove_repair_text_sections(converted_content)
-            converted_content = self._clean_inquiry_response(converted_content)
-            converted_content = self._emergency_remove_green_boxes(converted_content, query_type)
+            converted_content = self._convert_inquiry_content(converted_content)
         else:
             # INQUIRY가 아닌 경우에만 박스 변환 적용
             if '[CAUSE_BOX_START]' in converted_content:
                 converted_content, has_html = self.convert_cause_box_to_html(converted_content)
                 html_converted = html_converted or has_html
         
-        
         # HTML이 포함된 경우 또는 특수 디자인이 필요한 경우
-        if html_converted or ('<div style=' in converted_content and ('장애원인' in converted_content or '복구방법' in converted_content)):
+        unsafe_html = html_converted or ('<div style=' in converted_content and ('장애원인' in converted_content or '복구방법' in converted_content))
+        
+        # 조회 응답의 엑셀용 표 데이터도 함께 계산해 재표시 시 재파싱 방지
+        table_data = parse_response(content).inquiry_table_data() if query_type.lower() == 'inquiry' else None
+        
+        return {'kind': 'content', 'content': converted_content, 'unsafe_html': unsafe_html, 'query_type': query_type,
+                'table_data': table_data}
+    
+    def _render_content_artifact(self, artifact, message_index=None):
+        """변환 결과 표시"""
+        if artifact['kind'] == 'repair':
+            try:
+                self.display_repair_report_with_tabs(artifact['incidents_data'], use_typewriter=False, message_index=message_index)
+                return
+            except Exception as e:
+                # 오류 시 기본 표시로 폴백
+                print(f"repair 디스플레이 오류: {e}")
+                artifact = artifact['fallback']
+        
+        converted_content = artifact['content']
+        query_type = artifact['query_type']
+        
+        if artifact['unsafe_html']:
             st.markdown(converted_content, unsafe_allow_html=True)
         else: 
             st.write(converted_content)
@@ -1248,7 +1166,7 @@ INDEX_REBUILD_NAME=your-index-name
                 excel_manager = ExcelDownloadManager()
                 
                 # 엑셀 다운로드 버튼 표시 시도
-                excel_manager.display_download_button(converted_content, query_type)
+                excel_manager.display_download_button(converted_content, query_type, table_data=artifact.get('table_data'))
                 
             except ImportError as e:
                 if self.debug_mode:
@@ -1257,6 +1175,10 @@ INDEX_REBUILD_NAME=your-index-name
                 if self.debug_mode:
                     print(f"UI_DEBUG: 엑셀 다운로드 버튼 표시 오류 (이전 대화): {e}")
     
+    def _display_content_with_markers(self, content, query_type):
+        """컨텐츠를 마커에 따라 적절히 표시 + INQUIRY 타입의 경우 엑셀 다운로드 버튼 추가"""
+        self._render_content_artifact(self._build_content_artifact(content, query_type))
+    
     def _is_repair_response(self, content):
         """repair 타입 응답인지 감지"""
         if not content:
@@ -0,0 +1,14 @@
+# tests/conftest.py - utils 패키지 __init__(Azure/streamlit 의존성)을 거치지 않고 모듈을 직접 로드
+import importlib.util
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def load_module(name, relative_path):
+    """src 기준 경로의 모듈을 단독으로 로드"""
+    spec = importlib.util.spec_from_file_location(name, SRC_DIR / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
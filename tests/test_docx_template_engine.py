@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from conftest import DATA_DIR, load_module
+
+docx = pytest.importorskip("docx")
+engine = load_module("docx_template_engine", "utils/docx_template_engine.py")
+
+TEMPLATE_PATH = DATA_DIR / "docx" / "iap-report-sample1(#).docx"
+
+
+def _all_cell_placeholders(doc):
+    found = set()
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                found.update(engine.PLACEHOLDER_PATTERN.findall(cell.text))
+    return found
+
+
+def _to_bytes(doc):
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_shipped_template_indexes_every_placeholder_cell():
+    template = engine.CompiledDocxTemplate(TEMPLATE_PATH.read_bytes())
+    doc = template.new_document()
+    
+    expected = _all_cell_placeholders(doc)
+    indexed = {p for _, placeholders in template.cell_slots for p in placeholders}
+    assert expected
+    assert indexed == expected
+    
+    replacements = {placeholder: f"값{i}" for i, placeholder in enumerate(sorted(expected))}
+    counts = template.replace_placeholders(doc, replacements)
+    assert all(counts[p] > 0 for p in expected)
+    assert not _all_cell_placeholders(doc)
+
+
+def test_large_table_indexes_all_cells_and_merged_cells_once():
+    doc = docx.Document()
+    table = doc.add_table(rows=30, cols=4)
+    for row_idx, row in enumerate(table.rows):
+        for col_idx, cell in enumerate(row.cells):
+            cell.text = f"(#r{row_idx}c{col_idx})"
+    merged = table.cell(0, 0).merge(table.cell(0, 1))
+    merged.text = "(#merged)"
+    
+    template = engine.CompiledDocxTemplate(_to_bytes(doc))
+    indexed = [p for _, placeholders in template.cell_slots for p in placeholders]
+    
+    assert len(indexed) == 30 * 4 - 1
+    assert indexed.count("(#merged)") == 1
@@ -0,0 +1,108 @@
+import re
+
+import pytest
+
+from conftest import load_module
+
+renderer = load_module("response_renderer", "utils/response_renderer.py")
+
+
+def _remove_patterns(text, patterns):
+    for pattern in patterns:
+        text = re.sub(pattern, '', text, flags=re.DOTALL | re.IGNORECASE)
+    return text
+
+
+def legacy_inquiry_text(text):
+    """기존 ui_components_local 조회 응답 정리 체인 (정규식 순차 적용) - 비교 기준"""
+    text = _remove_patterns(text, [
+        r'\[CAUSE_BOX_START\].*?\[CAUSE_BOX_END\]',
+        r'\[.*?_BOX_START\].*?\[.*?_BOX_END\]',
+        r'\[CAUSE_BOX_START\].*', r'.*\[CAUSE_BOX_END\]'
+    ])
+    text = _remove_patterns(text, [
+        r'<div style="background:#e8f5e8;.*?</div>', r'<div[^>]*>.*?복구방법.*?</div>',
+        r'<div[^>]*>.*?장애원인.*?</div>', r'<div[^>]*>.*?🔧.*?</div>',
+        r'<div[^>]*>.*?📋.*?</div>', r'<div[^>]*class=".*?repair.*?".*?</div>',
+        r'<div[^>]*class=".*?cause.*?".*?</div>'
+    ])
+    
+    skip_keywords = ['복구방법', '복구절차', '조치방법', '해결방법', '대응방법', '복구', '조치',
+                     '해결', '대응', '수정', '개선', 'repair', 'recovery', 'solution', 'fix']
+    cleaned_lines = []
+    skip_mode = False
+    for line in text.split('\n'):
+        line_stripped = line.strip()
+        line_lower = line_stripped.lower()
+        if any(keyword in line_lower for keyword in skip_keywords):
+            if (line_stripped.startswith(('**', '#')) or line_stripped.endswith(':') or
+                    '복구방법:' in line_lower or '조치방법:' in line_lower):
+                skip_mode = True
+                continue
+        if (line_stripped.startswith(('#', '##', 'Case', '|', '1.')) or
+                (line_stripped.startswith('**') and not any(kw in line_lower for kw in skip_keywords))):
+            skip_mode = False
+        if not skip_mode:
+            cleaned_lines.append(line)
+    text = '\n'.join(cleaned_lines)
+    
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    lines = [line for line in text.split('\n')
+             if line.strip() not in ['복구방법', '복구방법:', '**복구방법**', '**복구방법:**']]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    text = '\n'.join(lines).strip()
+    
+    text = _remove_patterns(text, [
+        r'<div[^>]*style[^>]*background[^>]*#e8f5e8[^>]*>.*?</div>',
+        r'<div[^>]*style[^>]*녹색[^>]*>.*?</div>'
+    ])
+    filtered_lines = []
+    skip_until_next_section = False
+    for line in text.split('\n'):
+        line_clean = line.strip()
+        if any(keyword in line_clean.lower() for keyword in ['복구방법', '조치방법', '해결방법']):
+            if line_clean.endswith(':') or '**' in line_clean:
+                skip_until_next_section = True
+                continue
+        if line_clean.startswith(('1.', '2.', '3.', 'Case', '|')) or '장애 ID' in line_clean:
+            skip_until_next_section = False
+        if not skip_until_next_section:
+            filtered_lines.append(line)
+    result = '\n'.join(filtered_lines)
+    result = re.sub(r'\[.*?BOX.*?\]', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'\n{3,}', '\n\n', result)
+    return result.strip()
+
+
+TABLE = "| 장애 ID | 서비스명 | 발생일 |\n|---|---|---|\n| INM1 | ERP | 2024-01-01 |\n| INM2 | CRM | 2024-02-03 |"
+
+SAMPLES = [
+    "## 조회 결과\n" + TABLE + "\n위 표 참고[REPAIR_BOX_END]\n추가 설명",
+    "## 조회 결과\n" + TABLE + "\n[SIMILAR_BOX_END]\n\n\n\n끝",
+    "원인 요약 문단\n[CAUSE_BOX_END]\n## 조회 결과\n" + TABLE,
+    "앞부분\n[CAUSE_BOX_START]\n원인1: 설정 오류\n[CAUSE_BOX_END]\n## 결과\n" + TABLE,
+    "## 결과\n" + TABLE + "\n[REPAIR_BOX_START]\n**복구방법:** 재기동\n[REPAIR_BOX_END]\n끝",
+    "## 결과\n" + TABLE + "\n[CAUSE_BOX_START]\n원인1: 닫히지 않은 박스",
+    "## 결과\n" + TABLE + '\n<div style="background:#e8f5e8;padding:4px">복구방법 안내</div>\n끝',
+    "## 결과\n" + TABLE + "\n\n**복구방법:**\n- 서버 재기동\n- 캐시 초기화\n\n**참고**\n추가 설명",
+    "총 2건이 조회되었습니다.\n\n" + TABLE + "\n\n조치방법:\n재시작\n1. 다음 항목",
+    "## 결과\n" + TABLE + "\n[REPAIR_BOX_END] 중간 [CAUSE_BOX_END]\n뒷부분",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES, ids=[f"sample{i}" for i in range(len(SAMPLES))])
+def test_inquiry_text_matches_legacy_chain(text):
+    assert renderer.ParsedResponse(text).inquiry_text() == legacy_inquiry_text(text)
+
+
+def test_orphan_non_cause_end_marker_keeps_table_data():
+    parsed = renderer.ParsedResponse(SAMPLES[0])
+    
+    assert parsed.inquiry_text().startswith("## 조회 결과")
+    assert "추가 설명" in parsed.inquiry_text()
+    assert "[REPAIR_BOX_END]" not in parsed.inquiry_text()
+    assert parsed.inquiry_table_data() == {
+        'headers': ['장애 ID', '서비스명', '발생일'],
+        'data': [['INM1', 'ERP', '2024-01-01'], ['INM2', 'CRM', '2024-02-03']],
+    }